@@ -1,7 +1,7 @@
 from django.contrib import admin
 # Register your models here.
 from django.contrib import admin
-from .models import Approval
+from .models import Approval, ApprovalPolicy
 
 @admin.register(Approval)
 class ApprovalAdmin(admin.ModelAdmin):
@@ -14,3 +14,9 @@ class ApprovalAdmin(admin.ModelAdmin):
         if obj:  # Editing existing object - make most fields readonly
             return self.readonly_fields + ['request', 'approver', 'level', 'action']
         return self.readonly_fields
+
+@admin.register(ApprovalPolicy)
+class ApprovalPolicyAdmin(admin.ModelAdmin):
+    list_display = ['min_amount', 'required_levels', 'description', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at']
+
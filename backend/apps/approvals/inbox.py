@@ -0,0 +1,81 @@
+from django.db.models import Case, F, When
+from apps.requests.models import PurchaseRequest
+from .models import ApprovalInboxEntry
+
+
+def _entry_fields(purchase_request):
+    return {
+        'level': purchase_request.current_approval_level,
+        'title': purchase_request.title,
+        'total_amount': purchase_request.total_amount,
+        'created_at': purchase_request.created_at,
+    }
+
+
+def sync_inbox_entry(purchase_request):
+    """
+    Bring the inbox row for a request in line with its workflow state.
+    Runs from post_save, so it shares the transaction that changed the request.
+    """
+    if purchase_request.status == PurchaseRequest.Status.PENDING:
+        fields = _entry_fields(purchase_request)
+        # A pool claim is for one level; moving to the next level frees the request for that level's approvers
+        same_level = When(level=fields['level'], then=F('claimed_by'))
+        updated = ApprovalInboxEntry.objects.filter(request=purchase_request).update(
+            claimed_by=Case(same_level, default=None),
+            claim_expires_at=Case(When(level=fields['level'], then=F('claim_expires_at')), default=None),
+            **fields
+        )
+        if not updated:
+            ApprovalInboxEntry.objects.create(request=purchase_request, **fields)
+    else:
+        ApprovalInboxEntry.objects.filter(request=purchase_request).delete()
+
+
+def rebuild_inbox():
+    """Recreate every inbox row from pending requests, returns the number of rows written"""
+    ApprovalInboxEntry.objects.all().delete()
+    pending = PurchaseRequest.objects.filter(status=PurchaseRequest.Status.PENDING).only(
+        'id', 'current_approval_level', 'title', 'total_amount', 'created_at'
+    )
+    entries = ApprovalInboxEntry.objects.bulk_create(
+        (ApprovalInboxEntry(request=purchase_request, **_entry_fields(purchase_request))
+         for purchase_request in pending.iterator()),
+        batch_size=1000
+    )
+    return len(entries)
+
+
+def find_inbox_inconsistencies():
+    """
+    Compare the inbox with PurchaseRequest and return a list of problems:
+    pending requests without a row, rows for requests that are no longer
+    pending, and rows whose copied fields drifted from the request.
+    """
+    problems = []
+    entries = {
+        entry.request_id: entry for entry in ApprovalInboxEntry.objects.all()
+    }
+    pending = PurchaseRequest.objects.filter(status=PurchaseRequest.Status.PENDING).only(
+        'id', 'current_approval_level', 'title', 'total_amount', 'created_at'
+    )
+
+    for purchase_request in pending.iterator():
+        entry = entries.pop(purchase_request.id, None)
+        if entry is None:
+            problems.append({'request_id': str(purchase_request.id), 'problem': 'missing'})
+            continue
+        for field, expected in _entry_fields(purchase_request).items():
+            if getattr(entry, field) != expected:
+                problems.append({
+                    'request_id': str(purchase_request.id),
+                    'problem': 'stale',
+                    'field': field,
+                    'expected': str(expected),
+                    'actual': str(getattr(entry, field)),
+                })
+
+    for request_id in entries:
+        problems.append({'request_id': str(request_id), 'problem': 'not_pending'})
+
+    return problems
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from apps.approvals.inbox import rebuild_inbox, find_inbox_inconsistencies
+
+class Command(BaseCommand):
+    help = 'Rebuild the approver inbox from purchase requests, or check it with --check'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report inconsistencies, exit with an error if any are found'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            problems = find_inbox_inconsistencies()
+            for problem in problems:
+                self.stdout.write(self.style.WARNING(str(problem)))
+            if problems:
+                raise CommandError(f'Approver inbox has {len(problems)} inconsistencies')
+            self.stdout.write(self.style.SUCCESS('Approver inbox is consistent'))
+            return
+
+        with transaction.atomic():
+            count = rebuild_inbox()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt approver inbox with {count} entries'))
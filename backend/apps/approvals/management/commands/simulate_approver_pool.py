@@ -0,0 +1,149 @@
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.approvals.policy import get_approval_policy
+from apps.notifications.models import OutboxMessage
+from apps.requests.models import PurchaseRequest
+from apps.requests.views import PurchaseRequestViewSet
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'pool-simulation-'
+MODES = ['shared', 'pool']
+
+
+class Command(BaseCommand):
+    help = (
+        'Drain one approval level with many concurrent approvers, first with everyone '
+        'working the shared list and then with claims from the approver pool, and report '
+        'throughput and conflicts. Creates and deletes its own rows; run it against a '
+        'scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Pending requests to drain')
+        parser.add_argument('--approvers', type=int, default=8, help='Concurrent approvers')
+        parser.add_argument('--claim', type=int, default=5, help='Requests per claim in pool mode')
+        parser.add_argument('--mode', choices=MODES, help='Only run one mode')
+
+    def handle(self, *args, **options):
+        approver_count = options['approvers']
+        if approver_count > 1 and not connection.features.has_select_for_update:
+            raise CommandError(
+                f'{connection.vendor} has no row locks and serializes writers; '
+                'run the simulation on PostgreSQL or with --approvers 1'
+            )
+
+        amount = Decimal('1000.00')
+        level = get_approval_policy().first_level(amount)
+        if PurchaseRequest.objects.filter(status='pending', current_approval_level=level).exists():
+            # The simulated approvers would decide these too
+            raise CommandError(
+                f'Level {level} already has pending requests; run the simulation against a scratch database'
+            )
+
+        first_outbox_id = OutboxMessage.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        staff_user = User.objects.create_user(username=f'{USERNAME_PREFIX}staff', role='staff')
+        approvers = [
+            User.objects.create_user(
+                username=f'{USERNAME_PREFIX}approver{i}',
+                role=f'approver_level_{level}',
+                approver_level=level
+            )
+            for i in range(approver_count)
+        ]
+        try:
+            for mode in [options['mode']] if options['mode'] else MODES:
+                PurchaseRequest.objects.filter(created_by=staff_user).delete()
+                for i in range(options['requests']):
+                    PurchaseRequest.objects.create(
+                        title=f'Simulated request {i}',
+                        description='Approver pool simulation',
+                        total_amount=amount,
+                        created_by=staff_user,
+                        current_approval_level=level
+                    )
+                with override_settings(APPROVAL_POOL_MODE=(mode == 'pool')):
+                    elapsed, outcomes = self._drain(mode, approvers, options['claim'])
+                self._report(mode, elapsed, outcomes)
+        finally:
+            PurchaseRequest.objects.filter(created_by=staff_user).delete()
+            User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+            OutboxMessage.objects.filter(id__gt=first_outbox_id).delete()
+
+    def _call(self, view, request, user, **kwargs):
+        force_authenticate(request, user=user)
+        return view(request, **kwargs)
+
+    def _next_batch(self, mode, user, claim_size):
+        """Requests this approver will try next: the head of the shared list, or a fresh claim"""
+        factory = APIRequestFactory()
+        if mode == 'pool':
+            view = PurchaseRequestViewSet.as_view({'post': 'claim'})
+            request = factory.post('/api/requests/claim/', {'count': claim_size}, format='json')
+        else:
+            view = PurchaseRequestViewSet.as_view({'get': 'list'})
+            request = factory.get('/api/requests/', {'page_size': 1})
+        response = self._call(view, request, user)
+        return [row['id'] for row in response.data['results']]
+
+    def _drain(self, mode, approvers, claim_size):
+        """Run every approver until their level is empty; returns (seconds, Counter of approve status codes)"""
+        approve = PurchaseRequestViewSet.as_view({'patch': 'approve'})
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(len(approvers))
+        outcomes = Counter()
+        lock = threading.Lock()
+
+        def worker(user):
+            seen = Counter()
+            try:
+                barrier.wait()
+                failed = None
+                while True:
+                    batch = self._next_batch(mode, user, claim_size)
+                    # Stop on an empty level, or when the same requests keep failing for this approver
+                    if not batch or batch == failed:
+                        break
+                    codes = []
+                    for request_id in batch:
+                        request = factory.patch(f'/api/requests/{request_id}/approve/', {}, format='json')
+                        codes.append(self._call(approve, request, user, pk=str(request_id)).status_code)
+                    seen.update(codes)
+                    failed = None if 200 in codes else batch
+            finally:
+                with lock:
+                    outcomes.update(seen)
+                if len(approvers) > 1:
+                    connection.close()
+
+        started = time.perf_counter()
+        if len(approvers) == 1:
+            # A lone approver runs on this thread and its connection
+            worker(approvers[0])
+            return time.perf_counter() - started, outcomes
+        workers = [threading.Thread(target=worker, args=(user,)) for user in approvers]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started, outcomes
+
+    def _report(self, mode, elapsed, outcomes):
+        approved = outcomes.pop(200, 0)
+        conflicts = sum(outcomes.values())
+        self.stdout.write(self.style.SUCCESS(f'{mode}:'))
+        self.stdout.write(
+            f'  {approved} approvals in {elapsed:.2f}s ({approved / elapsed:.0f} approvals/s)'
+        )
+        self.stdout.write(
+            f'  {conflicts} conflicts in {approved + conflicts} attempts'
+            + ''.join(f', {code}: {count}' for code, count in sorted(outcomes.items()))
+        )
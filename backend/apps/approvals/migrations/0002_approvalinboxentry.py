@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_inbox(apps, schema_editor):
+    PurchaseRequest = apps.get_model('requests', 'PurchaseRequest')
+    ApprovalInboxEntry = apps.get_model('approvals', 'ApprovalInboxEntry')
+    ApprovalInboxEntry.objects.bulk_create(
+        (
+            ApprovalInboxEntry(
+                request_id=purchase_request.id,
+                level=purchase_request.current_approval_level,
+                title=purchase_request.title,
+                total_amount=purchase_request.total_amount,
+                created_at=purchase_request.created_at,
+            )
+            for purchase_request in PurchaseRequest.objects.filter(status='pending').iterator()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0004_purchaserequest_access_path_indexes'),
+        ('approvals', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalInboxEntry',
+            fields=[
+                ('request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inbox_entry', serialize=False, to='requests.purchaserequest')),
+                ('level', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=200)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['level', '-created_at'], name='inbox_level_created_idx')],
+            },
+        ),
+        migrations.RunPython(populate_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0002_approvalinboxentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalPolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_amount', models.DecimalField(decimal_places=2, max_digits=12, unique=True)),
+                ('required_levels', models.JSONField(default=list)),
+                ('description', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'approval policies',
+                'ordering': ['min_amount'],
+            },
+        ),
+    ]
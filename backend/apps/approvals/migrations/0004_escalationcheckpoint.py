@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0003_approvalpolicy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EscalationCheckpoint',
+            fields=[
+                ('level', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('last_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('last_request_id', models.UUIDField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['level'],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0005_approvalinboxentry_claims'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='approvalinboxentry',
+            name='inbox_level_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='approvalinboxentry',
+            index=models.Index(fields=['level', '-created_at', 'request'], name='inbox_level_created_req_idx'),
+        ),
+    ]
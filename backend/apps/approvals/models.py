@@ -1,5 +1,6 @@
 import uuid
 from django.db import models
+from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -27,3 +28,83 @@ class Approval(models.Model):
 
     def __str__(self):
         return f"{self.request.title} - Level {self.level} - {self.get_action_display()}"
+
+class ApprovalInboxEntry(models.Model):
+    """
+    Denormalized approver queue: one row per pending request at its current level.
+    Kept in step with the workflow by apps.approvals.inbox.sync_inbox_entry.
+    """
+    request = models.OneToOneField(
+        'requests.PurchaseRequest',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='inbox_entry'
+    )
+    level = models.PositiveIntegerField()
+    title = models.CharField(max_length=200)
+    total_amount = models.DecimalField(max_digits=12, decimal_places=2)
+    created_at = models.DateTimeField()
+    # Pool mode: the approver leasing this request, until claim_expires_at (apps.approvals.pool)
+    claimed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Matches ApproverInboxCursorPagination, so approver list pages need no sort
+            models.Index(fields=['level', '-created_at', 'request'], name='inbox_level_created_req_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} - Level {self.level}"
+
+class ApprovalPolicy(models.Model):
+    """
+    Amount-based routing rule: requests from min_amount up to the next rule's
+    threshold need required_levels. Compiled into memory by apps.approvals.policy.
+    """
+    APPROVAL_LEVELS = [1, 2]
+
+    min_amount = models.DecimalField(max_digits=12, decimal_places=2, unique=True)
+    required_levels = models.JSONField(default=list)
+    description = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['min_amount']
+        verbose_name_plural = 'approval policies'
+
+    def clean(self):
+        levels = self.required_levels
+        if not isinstance(levels, list) or not levels or not set(levels) <= set(self.APPROVAL_LEVELS):
+            raise ValidationError({
+                'required_levels': f'Choose one or more of the levels {self.APPROVAL_LEVELS}'
+            })
+
+    def __str__(self):
+        return f"From {self.min_amount}: levels {self.required_levels}"
+
+
+class EscalationCheckpoint(models.Model):
+    """
+    Keyset position of the SLA escalation job for one approval level: every
+    pending request at or before (last_updated_at, last_request_id) has been
+    escalated. A request that changes again moves past the checkpoint.
+    """
+    level = models.PositiveIntegerField(primary_key=True)
+    last_updated_at = models.DateTimeField(null=True, blank=True)
+    last_request_id = models.UUIDField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['level']
+
+    def __str__(self):
+        return f"Level {self.level} escalated through {self.last_updated_at}"
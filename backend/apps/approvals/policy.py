@@ -0,0 +1,94 @@
+import bisect
+import time
+from django.core.cache import cache
+from django.db import models
+
+# Routing when no policy row covers an amount: the original two-level chain
+DEFAULT_LEVELS = (1, 2)
+
+GENERATION_CACHE_KEY = 'approval-policy:generation'
+
+# How often a process asks the shared cache whether another process changed the policy
+RECHECK_SECONDS = 5
+
+
+def _as_csv(levels):
+    return ','.join(str(level) for level in levels)
+
+
+class CompiledApprovalPolicy:
+    """Policy rows as parallel sorted arrays, so routing an amount is one bisect"""
+
+    def __init__(self, rules):
+        rules = sorted(rules)
+        self.thresholds = [min_amount for min_amount, _ in rules]
+        self.levels = [tuple(sorted(set(levels))) for _, levels in rules]
+
+    def levels_for(self, amount):
+        """Required approval levels for an amount, in approval order"""
+        index = bisect.bisect_right(self.thresholds, amount) - 1
+        if index < 0:
+            return DEFAULT_LEVELS
+        return self.levels[index]
+
+    def first_level(self, amount):
+        return self.levels_for(amount)[0]
+
+    def as_expression(self, field='total_amount'):
+        """The same routing as a SQL CASE, yielding comma separated levels for list annotations"""
+        whens = [
+            models.When(**{f'{field}__gte': threshold}, then=models.Value(_as_csv(levels)))
+            for threshold, levels in reversed(list(zip(self.thresholds, self.levels)))
+        ]
+        default = models.Value(_as_csv(DEFAULT_LEVELS), output_field=models.CharField())
+        if not whens:
+            return default
+        return models.Case(*whens, default=default, output_field=models.CharField())
+
+
+def compile_approval_policy():
+    from .models import ApprovalPolicy
+
+    return CompiledApprovalPolicy(
+        ApprovalPolicy.objects.values_list('min_amount', 'required_levels')
+    )
+
+
+_compiled = None
+_generation = None
+_checked_at = 0.0
+
+
+def get_approval_policy():
+    """
+    The compiled policy for this process. Built on first use and rebuilt when
+    the shared generation counter shows the table changed.
+    """
+    global _compiled, _generation, _checked_at
+
+    now = time.monotonic()
+    if _compiled is not None and now - _checked_at < RECHECK_SECONDS:
+        return _compiled
+
+    # Read the generation before the rows, so a change landing in between triggers another rebuild
+    generation = cache.get(GENERATION_CACHE_KEY, 0)
+    if _compiled is None or generation != _generation:
+        _compiled = compile_approval_policy()
+        _generation = generation
+    _checked_at = now
+    return _compiled
+
+
+def invalidate_approval_policy(local_only=False):
+    """Forget the compiled policy here and, unless local_only, in every other process"""
+    global _compiled
+
+    _compiled = None
+    if local_only:
+        return
+    cache.add(GENERATION_CACHE_KEY, 0, timeout=None)
+    try:
+        cache.incr(GENERATION_CACHE_KEY)
+    except ValueError:
+        # Evicted between add and incr; any new value still differs from what processes hold
+        cache.set(GENERATION_CACHE_KEY, time.time_ns(), timeout=None)
@@ -0,0 +1,58 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import ApprovalInboxEntry
+
+
+def live_claims(now=None):
+    """Inbox rows under an unexpired claim"""
+    return ApprovalInboxEntry.objects.filter(
+        claimed_by__isnull=False, claim_expires_at__gt=now or timezone.now()
+    )
+
+
+def claim_requests(user, level, count, now=None):
+    """
+    Lease up to count pending requests at a level to user, oldest first, and
+    return their ids. Claims the user already holds are renewed and count toward
+    the total. Unclaimed rows that a concurrent caller is claiming are skipped
+    (SKIP LOCKED) rather than waited on, so concurrent approvers get disjoint sets.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        held = list(
+            live_claims(now).filter(level=level, claimed_by=user)
+            .order_by('created_at').values_list('request_id', flat=True)[:count]
+        )
+        claimed = []
+        if len(held) < count:
+            claimed = list(
+                ApprovalInboxEntry.objects.select_for_update(skip_locked=True)
+                .filter(level=level)
+                .filter(Q(claimed_by__isnull=True) | Q(claim_expires_at__lte=now))
+                .order_by('created_at').values_list('request_id', flat=True)[:count - len(held)]
+            )
+        request_ids = held + claimed
+        ApprovalInboxEntry.objects.filter(request_id__in=request_ids).update(
+            claimed_by=user,
+            claim_expires_at=now + timedelta(seconds=settings.APPROVAL_CLAIM_LEASE_SECONDS)
+        )
+    return request_ids
+
+
+def release_claims(user, request_ids=None):
+    """Hand the user's claims (or just request_ids) back to the pool, returns the number released"""
+    entries = ApprovalInboxEntry.objects.filter(claimed_by=user)
+    if request_ids is not None:
+        entries = entries.filter(request_id__in=request_ids)
+    return entries.update(claimed_by=None, claim_expires_at=None)
+
+
+def claimed_by_others(user, request_ids, now=None):
+    """Ids among request_ids that another approver holds a live claim on"""
+    return set(
+        live_claims(now).filter(request_id__in=request_ids)
+        .exclude(claimed_by=user).values_list('request_id', flat=True)
+    )
@@ -16,3 +16,21 @@ class ApprovalSerializer(serializers.ModelSerializer):
 class ApprovalActionSerializer(serializers.Serializer):
     action = serializers.ChoiceField(choices=Approval.Action.choices)
     comment = serializers.CharField(required=False, allow_blank=True)
+
+class BulkApprovalActionSerializer(serializers.Serializer):
+    MAX_BATCH_SIZE = 100
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=MAX_BATCH_SIZE
+    )
+    comment = serializers.CharField(required=False, allow_blank=True)
+
+class ClaimRequestsSerializer(serializers.Serializer):
+    MAX_CLAIM = 50
+
+    count = serializers.IntegerField(min_value=1, max_value=MAX_CLAIM, default=10)
+
+class ReleaseClaimsSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False)
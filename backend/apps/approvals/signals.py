@@ -0,0 +1,24 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from apps.requests.models import PurchaseRequest
+from .inbox import sync_inbox_entry
+from .models import ApprovalPolicy
+from .policy import invalidate_approval_policy
+
+
+@receiver(post_save, sender=PurchaseRequest)
+def update_approval_inbox(sender, instance, raw=False, **kwargs):
+    """Every workflow transition saves the request, so the inbox follows it here"""
+    if raw:
+        return
+    sync_inbox_entry(instance)
+
+
+@receiver(post_save, sender=ApprovalPolicy)
+@receiver(post_delete, sender=ApprovalPolicy)
+def reload_approval_policy(sender, **kwargs):
+    # Drop this process's copy now; tell the others once the change is visible to them
+    invalidate_approval_policy(local_only=True)
+    transaction.on_commit(invalidate_approval_policy)
+
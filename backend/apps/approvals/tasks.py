@@ -0,0 +1,9 @@
+from celery import shared_task
+
+
+@shared_task
+def escalate_stale_approvals():
+    """Periodic SLA sweep, scheduled in CELERY_BEAT_SCHEDULE"""
+    from .escalation import escalate_stale_requests
+
+    return escalate_stale_requests()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ProformaMetadata
+from .models import ExtractedDocument, ProformaMetadata
 
 @admin.register(ProformaMetadata)
 class ProformaMetadataAdmin(admin.ModelAdmin):
@@ -38,3 +38,16 @@ class ProformaMetadataAdmin(admin.ModelAdmin):
         if obj:  # Editing existing object
             return self.readonly_fields + ['request']
         return self.readonly_fields
+
+@admin.register(ExtractedDocument)
+class ExtractedDocumentAdmin(admin.ModelAdmin):
+    list_display = [
+        'sha256', 'extraction_method', 'page_count', 'truncated', 'peak_memory_kb',
+        'confidence_score', 'hit_count', 'last_used_at'
+    ]
+    search_fields = ['sha256']
+    readonly_fields = [
+        'sha256', 'raw_text', 'extraction_method', 'page_count', 'truncated', 'peak_memory_kb',
+        'ai_data', 'ai_response',
+        'confidence_score', 'hit_count', 'created_at', 'last_used_at'
+    ]
@@ -0,0 +1,50 @@
+import hashlib
+from django.db.models import F
+from django.core.files.uploadhandler import FileUploadHandler
+from django.utils import timezone
+from .models import ExtractedDocument
+
+
+class ContentHashUploadHandler(FileUploadHandler):
+    """
+    SHA-256 each uploaded file as its chunks stream in, then pass the chunks on
+    to the regular handlers, so fingerprinting costs no extra read of the file.
+    Install it before request.data is first touched.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.digests = {}
+        self._hash = None
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self._hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hash.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        self.digests[self.field_name] = self._hash.hexdigest()
+        # Let the next handler build the file object
+        return None
+
+
+def fingerprint_file(file):
+    """SHA-256 of a Django File, read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def reusable_extraction(content_hash):
+    """The cached extraction for these bytes if it has AI output, counting the hit; otherwise None"""
+    extraction = ExtractedDocument.objects.filter(sha256=content_hash, ai_data__isnull=False).first()
+    if extraction is not None:
+        ExtractedDocument.objects.filter(pk=content_hash).update(
+            hit_count=F('hit_count') + 1, last_used_at=timezone.now()
+        )
+    return extraction
@@ -0,0 +1,99 @@
+import difflib
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from PIL import Image, ImageDraw, ImageFont
+from apps.documents.utils import DocumentProcessor
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.tif', '.tiff'}
+EXIF_ORIENTATION = 0x0112
+
+
+def receipt_lines(number):
+    lines = ['ACME OFFICE SUPPLIES', f'Receipt {1000 + number}', 'Date 2026-03-14']
+    lines += [f'{item + 1} x Widget model {number * 10 + item} 12.50' for item in range(8)]
+    return lines + ['Subtotal 100.00', 'VAT 18.00', 'TOTAL 118.00']
+
+
+def build_phone_photo(path, lines, size=(4000, 3000)):
+    """
+    A phone-camera style shot of a printed receipt: 12 megapixels of grey
+    table around a small receipt, stored sideways with an EXIF orientation tag
+    """
+    receipt = Image.new('L', (945, 60 * len(lines) + 120), 250)
+    draw = ImageDraw.Draw(receipt)
+    font = ImageFont.load_default(size=36)
+    for number, line in enumerate(lines):
+        draw.text((60, 60 + 60 * number), line, fill=30, font=font)
+    receipt = receipt.resize((receipt.width * 2, receipt.height * 2), Image.Resampling.BICUBIC)
+
+    photo = Image.new('L', size, 120)
+    photo.paste(receipt, ((size[0] - receipt.width) // 2, (size[1] - receipt.height) // 2))
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6  # viewers turn it 90 degrees clockwise
+    photo.rotate(90, expand=True).save(path, format='JPEG', quality=90, exif=exif)
+
+
+def character_accuracy(expected, actual):
+    """Similarity of two texts with whitespace normalised, 0 to 1"""
+    return difflib.SequenceMatcher(None, ' '.join(expected.split()), ' '.join(actual.split())).ratio()
+
+
+class Command(BaseCommand):
+    help = (
+        'OCR a receipt corpus with and without the image preprocessing stage and '
+        'report latency and character accuracy. A corpus is a directory of images, '
+        'each with an optional same-named .txt transcript; without --corpus a few '
+        'synthetic phone photos are generated. Needs tesseract.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', help='Directory of receipt images and .txt transcripts')
+        parser.add_argument('--samples', type=int, default=3, help='Synthetic receipts without --corpus')
+
+    def handle(self, *args, **options):
+        if shutil.which('tesseract') is None:
+            raise CommandError('tesseract not found; install tesseract-ocr')
+
+        if options['corpus']:
+            self._run(Path(options['corpus']))
+            return
+        with tempfile.TemporaryDirectory() as directory:
+            corpus = Path(directory)
+            for number in range(options['samples']):
+                lines = receipt_lines(number)
+                build_phone_photo(corpus / f'receipt-{number}.jpg', lines)
+                (corpus / f'receipt-{number}.txt').write_text('\n'.join(lines))
+            self._run(corpus)
+
+    def _run(self, corpus):
+        images = sorted(path for path in corpus.iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+        if not images:
+            raise CommandError(f'No images in {corpus}')
+        self.stdout.write(f'{len(images)} images, {os.cpu_count()} CPUs')
+
+        for label, preprocess in [('raw', False), ('preprocessed', True)]:
+            config = {**settings.DOCUMENT_PROCESSING, 'OCR_PREPROCESS': preprocess, 'MAX_TEXT_CHARS': None}
+            timings, accuracies = [], []
+            with override_settings(DOCUMENT_PROCESSING=config):
+                for path in images:
+                    started = time.perf_counter()
+                    result = DocumentProcessor._extract_from_image(str(path))
+                    timings.append(time.perf_counter() - started)
+                    if not result['success']:
+                        raise CommandError(f'{path.name}: {result["error"]}')
+                    transcript = path.with_suffix('.txt')
+                    if transcript.exists():
+                        accuracies.append(character_accuracy(transcript.read_text(), result['text']))
+
+            accuracy = f'{statistics.mean(accuracies):.1%} accuracy' if accuracies else 'no transcripts'
+            self.stdout.write(
+                f'  {label}: {statistics.median(timings):.2f}s median, '
+                f'{max(timings):.2f}s max per image, {accuracy}'
+            )
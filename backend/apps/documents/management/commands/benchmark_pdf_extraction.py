@@ -0,0 +1,152 @@
+import os
+import statistics
+import tempfile
+import time
+from io import BytesIO
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from PIL import Image, ImageDraw, ImageFont
+from apps.documents.utils import DocumentProcessor
+
+
+def build_text_pdf(pages, lines_per_page=40):
+    """A plain multi-page PDF with a catalogue-like line of text per row, for benchmarks and tests"""
+    return build_catalogue_pdf(pages, lines_per_page)
+
+
+def build_catalogue_pdf(pages, lines_per_page=40, scanned_pages=(), dpi=150):
+    """
+    The build_text_pdf catalogue, except that pages whose index is in scanned_pages
+    are a grayscale JPEG of the same lines rendered at dpi, with no text layer
+    """
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in once the page ids are known
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [
+            f'Item {page + 1}-{line + 1}: widget model {page * lines_per_page + line} at 12.50 each'
+            for line in range(lines_per_page)
+        ]
+        if page in scanned_pages:
+            image = _scan_page(lines, dpi)
+            objects.append(b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray '
+                           b'/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n%s\nendstream'
+                           % (*_page_pixels(dpi), len(image), image))
+            stream = b'q 595 0 0 842 0 0 cm /Im0 Do Q'
+            resources = b'<< /XObject << /Im0 %d 0 R >> >>' % len(objects)
+        else:
+            stream = b'BT /F1 9 Tf 40 800 Td 12 TL ' + b' T* '.join(
+                f'({line}) Tj'.encode() for line in lines
+            ) + b' ET'
+            resources = b'<< /Font << /F1 3 0 R >> >>'
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources %s /Contents %d 0 R >>' % (resources, len(objects))
+        )
+        page_ids.append(len(objects))
+    return write_pdf(objects, page_ids)
+
+
+def _page_pixels(dpi):
+    """(width, height) of an A4 page at dpi"""
+    return round(595 * dpi / 72), round(842 * dpi / 72)
+
+
+def _scan_page(lines, dpi):
+    """JPEG bytes of lines laid out as on a text page, as a scanner would produce them"""
+    scale = dpi / 72
+    image = Image.new('L', _page_pixels(dpi), 255)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=round(9 * scale))
+    for number, line in enumerate(lines):
+        draw.text((40 * scale, (42 - 9 + 12 * number) * scale), line, fill=0, font=font)
+    output = BytesIO()
+    image.save(output, format='JPEG', quality=75)
+    return output.getvalue()
+
+
+def write_pdf(objects, page_ids):
+    """Serialize PDF objects (1 the catalog, 2 a placeholder for the page tree) with their xref table"""
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in page_ids), len(page_ids)
+    )
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    output += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+class Command(BaseCommand):
+    help = (
+        'Time PDF text extraction serially and with process pools of several sizes '
+        'on a long PDF (a generated catalogue unless --file is given), with the peak '
+        'RSS of the busiest process. Budgets are lifted unless --max-pages or '
+        '--max-chars is given.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='PDF to extract instead of a generated one')
+        parser.add_argument('--pages', type=int, default=300, help='Pages in the generated PDF')
+        parser.add_argument('--workers', default='1,2,4', help='Comma-separated pool sizes; 1 is serial')
+        parser.add_argument('--chunk', type=int, default=25, help='Pages per pool task')
+        parser.add_argument('--rounds', type=int, default=3)
+        parser.add_argument('--max-pages', type=int, help='PDF_MAX_PAGES budget')
+        parser.add_argument('--max-chars', type=int, help='MAX_TEXT_CHARS budget')
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if path is None:
+            handle, path = tempfile.mkstemp(suffix='.pdf')
+            with os.fdopen(handle, 'wb') as file:
+                file.write(build_text_pdf(options['pages']))
+        try:
+            self._run(path, options)
+        finally:
+            if options['file'] is None:
+                os.remove(path)
+
+    def _run(self, path, options):
+        page_count = DocumentProcessor._pdf_page_count(path)
+        self.stdout.write(f'{page_count} pages, {os.cpu_count()} CPUs')
+
+        baseline = expected_text = None
+        for workers in [int(value) for value in options['workers'].split(',')]:
+            config = {
+                **settings.DOCUMENT_PROCESSING,
+                'PDF_WORKERS': workers,
+                'PDF_PAGES_PER_CHUNK': options['chunk'],
+                'PDF_PARALLEL_MIN_PAGES': 0,
+                'PDF_MAX_PAGES': options['max_pages'],
+                'MAX_TEXT_CHARS': options['max_chars'],
+            }
+            timings = []
+            with override_settings(DOCUMENT_PROCESSING=config):
+                for _ in range(options['rounds']):
+                    started = time.perf_counter()
+                    result = DocumentProcessor._extract_from_pdf(path)
+                    timings.append(time.perf_counter() - started)
+            if not result['success']:
+                raise CommandError(result['error'])
+            if expected_text is None:
+                expected_text = result['text']
+            elif result['text'] != expected_text:
+                raise CommandError(f'{workers} workers produced different text than the first run')
+
+            seconds = statistics.median(timings)
+            baseline = baseline or seconds
+            self.stdout.write(
+                f'  {workers} worker(s): {seconds:.2f}s median, {result["pages_extracted"] / seconds:.0f} pages/s, '
+                f'{baseline / seconds:.1f}x, peak RSS {result["peak_memory_kb"] / 1024:.0f} MiB'
+            )
@@ -0,0 +1,71 @@
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from apps.documents.management.commands.benchmark_pdf_extraction import build_catalogue_pdf
+from apps.documents.utils import DocumentProcessor
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the OCR stage for scanned PDFs at several rasterization DPIs and OCR pool '
+        'sizes, and report seconds per page and the peak RSS of the busiest process '
+        '(a generated scanned catalogue unless --file is given). Needs pdftoppm and tesseract.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Scanned PDF to OCR instead of a generated one')
+        parser.add_argument('--pages', type=int, default=8, help='Pages in the generated PDF')
+        parser.add_argument('--dpi', default='150,200,300', help='Comma-separated OCR_DPI values')
+        parser.add_argument('--workers', default='1,2', help='Comma-separated OCR_WORKERS values')
+        parser.add_argument('--threads', type=int, default=1, help='OCR_THREADS_PER_PROCESS')
+        parser.add_argument('--rounds', type=int, default=1)
+
+    def handle(self, *args, **options):
+        missing = [tool for tool in ['pdftoppm', 'tesseract'] if shutil.which(tool) is None]
+        if missing:
+            raise CommandError(f'{", ".join(missing)} not found; install poppler-utils and tesseract-ocr')
+
+        path = options['file']
+        if path is None:
+            handle, path = tempfile.mkstemp(suffix='.pdf')
+            with os.fdopen(handle, 'wb') as file:
+                file.write(build_catalogue_pdf(options['pages'], scanned_pages=range(options['pages'])))
+        try:
+            self._run(path, options)
+        finally:
+            if options['file'] is None:
+                os.remove(path)
+
+    def _run(self, path, options):
+        self.stdout.write(f'{DocumentProcessor._pdf_page_count(path)} pages, {os.cpu_count()} CPUs')
+        for dpi in [int(value) for value in options['dpi'].split(',')]:
+            for workers in [int(value) for value in options['workers'].split(',')]:
+                config = {
+                    **settings.DOCUMENT_PROCESSING,
+                    'OCR_DPI': dpi,
+                    'OCR_WORKERS': workers,
+                    'OCR_THREADS_PER_PROCESS': options['threads'],
+                    'PDF_MAX_PAGES': None,
+                    'MAX_TEXT_CHARS': None,
+                }
+                timings = []
+                with override_settings(DOCUMENT_PROCESSING=config):
+                    for _ in range(options['rounds']):
+                        started = time.perf_counter()
+                        result = DocumentProcessor._extract_from_pdf(path)
+                        timings.append(time.perf_counter() - started)
+                if not result['success']:
+                    raise CommandError(result['error'])
+
+                seconds = statistics.median(timings)
+                ocred = result['pages_ocred'] or 1
+                self.stdout.write(
+                    f'  {dpi} dpi, {workers} worker(s): {seconds:.2f}s median, '
+                    f'{seconds / ocred:.2f}s per OCRed page ({result["pages_ocred"]}), '
+                    f'{len(result["text"])} chars, peak RSS {result["peak_memory_kb"] / 1024:.0f} MiB'
+                )
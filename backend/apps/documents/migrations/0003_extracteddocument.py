@@ -0,0 +1,30 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_receiptmetadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedDocument',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('raw_text', models.TextField()),
+                ('extraction_method', models.CharField(blank=True, max_length=30)),
+                ('ai_data', models.JSONField(blank=True, null=True)),
+                ('ai_response', models.JSONField(blank=True, default=dict)),
+                ('confidence_score', models.FloatField(blank=True, null=True)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-last_used_at'],
+            },
+        ),
+    ]
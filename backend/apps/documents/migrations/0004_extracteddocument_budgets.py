@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_extracteddocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='extracteddocument',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='extracteddocument',
+            name='peak_memory_kb',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='extracteddocument',
+            name='truncated',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -1,10 +1,11 @@
 import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
+from apps.requests.models import NestedInRequestMixin
 
 User = get_user_model()
 
-class ProformaMetadata(models.Model):
+class ProformaMetadata(NestedInRequestMixin, models.Model):
     class ExtractionStatus(models.TextChoices):
         PENDING = 'pending', 'Pending'
         SUCCESS = 'success', 'Success'
@@ -47,8 +48,59 @@ class ProformaMetadata(models.Model):
 
     def __str__(self):
         return f"Metadata for {self.request.title} - {self.get_extraction_status_display()}"
-    
-class ReceiptMetadata(models.Model):
+
+    def apply_extraction(self, data, confidence, raw_response):
+        """Copy validated AI output onto this record and grade it by confidence; the caller saves"""
+        self.vendor_name = data.get('vendor_name', '')
+        self.vendor_address = data.get('vendor_address', '')
+        self.total_amount = data.get('total_amount')
+        self.currency = data.get('currency', '')
+        self.payment_terms = data.get('payment_terms', '')
+        self.items = data.get('items', [])
+        self.confidence_score = confidence or 0.0
+        self.ai_response = raw_response
+        
+        # Determine status based on confidence
+        if self.confidence_score >= 0.7:
+            self.extraction_status = self.ExtractionStatus.SUCCESS
+        elif self.confidence_score >= 0.3:
+            self.extraction_status = self.ExtractionStatus.PARTIAL
+        else:
+            self.extraction_status = self.ExtractionStatus.FAILED
+            self.error_message = "Low confidence in extracted data"
+
+class ExtractedDocument(models.Model):
+    """
+    Content-addressed extraction cache: the text and validated AI output of a
+    document, keyed on the SHA-256 of its bytes, so re-uploads of the same file
+    skip OCR and the AI call. ai_data stays null until an AI call has succeeded.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    raw_text = models.TextField()
+    extraction_method = models.CharField(max_length=30, blank=True)
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    truncated = models.BooleanField(default=False)  # raw_text stopped at a page or character budget
+    peak_memory_kb = models.PositiveIntegerField(null=True, blank=True)
+    ai_data = models.JSONField(null=True, blank=True)
+    ai_response = models.JSONField(default=dict, blank=True)
+    confidence_score = models.FloatField(null=True, blank=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-last_used_at']
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.hit_count} hits)"
+
+    def apply_to(self, metadata):
+        """Fill a ProformaMetadata from the cached text and AI output; the caller saves"""
+        metadata.raw_text = self.raw_text
+        metadata.error_message = ''
+        metadata.apply_extraction(self.ai_data, self.confidence_score, self.ai_response)
+
+class ReceiptMetadata(NestedInRequestMixin, models.Model):
     class ValidationStatus(models.TextChoices):
         PENDING = 'pending', 'Pending'
         VALID = 'valid', 'Valid'
@@ -79,4 +131,3 @@ class ReceiptMetadata(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-
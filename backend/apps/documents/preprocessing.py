@@ -0,0 +1,112 @@
+import logging
+import math
+import pytesseract
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Share of the cropped size kept around the ink as a quiet zone for tesseract
+MARGIN_PADDING = 0.02
+
+
+def preprocess_for_ocr(image, target_dpi=300, max_pixels=None, binarize=True,
+                       crop_margins=True, detect_orientation=False):
+    """
+    An OCR-ready grayscale copy of an uploaded image: decoded at reduced size
+    where the format allows it, turned upright from its EXIF orientation (and
+    tesseract's orientation detection if asked), downsampled to target_dpi and
+    max_pixels, cropped to the paper and then its inked area, and binarized at the Otsu threshold.
+    OCR time grows with pixel count, so phone photos shrink by an order of magnitude.
+    """
+    scale = _downsample_scale(image, target_dpi, max_pixels)
+    # Rotation keeps the long side, so it fixes the target size whatever the orientation
+    long_side = max(round(max(image.size) * scale), 1)
+    if scale < 1:
+        # JPEG decodes straight to grayscale at 1/2, 1/4 or 1/8 size; other formats ignore this
+        image.draft('L', (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+
+    image = ImageOps.exif_transpose(image).convert('L')
+    if max(image.size) > long_side:
+        factor = long_side / max(image.size)
+        image = image.resize(
+            (max(round(image.width * factor), 1), max(round(image.height * factor), 1)),
+            Image.Resampling.LANCZOS, reducing_gap=2.0
+        )
+
+    if crop_margins:
+        # A photo's darker surroundings split from the paper first; ink is then measured on the paper
+        image = crop_to_paper(image, otsu_threshold(image))
+    threshold = otsu_threshold(image)
+    if crop_margins:
+        image = crop_to_ink(image, threshold)
+    if detect_orientation:
+        image = _rotate_upright(image)
+    if binarize:
+        image = image.point([0] * (threshold + 1) + [255] * (255 - threshold))
+    return image
+
+
+def _downsample_scale(image, target_dpi, max_pixels):
+    """Factor (at most 1) that brings the image to target_dpi and under max_pixels"""
+    scale = 1.0
+    dpi = image.info.get('dpi', (0, 0))[0]
+    if target_dpi and dpi and dpi > target_dpi:
+        scale = target_dpi / dpi
+    pixels = image.width * image.height
+    if max_pixels and pixels * scale * scale > max_pixels:
+        scale = math.sqrt(max_pixels / pixels)
+    return scale
+
+
+def otsu_threshold(image):
+    """Gray level that best separates ink from paper in a grayscale image"""
+    histogram = image.histogram()[:256]
+    total = sum(histogram)
+    total_sum = sum(level * count for level, count in enumerate(histogram))
+    background_weight = background_sum = 0
+    best_variance, threshold = 0, 127
+    for level, count in enumerate(histogram):
+        background_weight += count
+        foreground_weight = total - background_weight
+        if not background_weight:
+            continue
+        if not foreground_weight:
+            break
+        background_sum += level * count
+        background_mean = background_sum / background_weight
+        foreground_mean = (total_sum - background_sum) / foreground_weight
+        variance = background_weight * foreground_weight * (background_mean - foreground_mean) ** 2
+        if variance > best_variance:
+            best_variance, threshold = variance, level
+    return threshold
+
+
+def crop_to_paper(image, threshold):
+    """Crop to the box holding every pixel lighter than threshold; a scan's full page is kept"""
+    box = image.point([0] * (threshold + 1) + [255] * (255 - threshold)).getbbox()
+    return image.crop(box) if box else image
+
+
+def crop_to_ink(image, threshold):
+    """Crop to the box holding every pixel darker than threshold, plus a little padding"""
+    box = image.point([255] * (threshold + 1) + [0] * (255 - threshold)).getbbox()
+    if box is None:
+        return image
+    left, top, right, bottom = box
+    pad_x = round((right - left) * MARGIN_PADDING)
+    pad_y = round((bottom - top) * MARGIN_PADDING)
+    return image.crop((
+        max(left - pad_x, 0), max(top - pad_y, 0),
+        min(right + pad_x, image.width), min(bottom + pad_y, image.height)
+    ))
+
+
+def _rotate_upright(image):
+    """Rotate by tesseract's orientation estimate; needs the osd traineddata"""
+    try:
+        rotate = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)['rotate']
+    except pytesseract.TesseractError as e:
+        logger.warning(f"Orientation detection failed: {str(e)}")
+        return image
+    # OSD reports the clockwise rotation that makes the text upright; PIL rotates counter-clockwise
+    return image.rotate(-rotate, expand=True, fillcolor=255) if rotate else image
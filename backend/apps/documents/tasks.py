@@ -2,19 +2,31 @@ import os
 import logging
 from celery import shared_task
 from django.core.files.storage import default_storage
-from .models import ProformaMetadata
+from .models import ExtractedDocument, ProformaMetadata
+from .fingerprints import fingerprint_file, reusable_extraction
 from .utils import DocumentProcessor
 from .ai_service import AIExtractionService
 
 logger = logging.getLogger(__name__)
 
+def _proforma_result(metadata, cached=False):
+    return {
+        'success': True,
+        'extraction_status': metadata.extraction_status,
+        'confidence_score': metadata.confidence_score,
+        'vendor_name': metadata.vendor_name,
+        'total_amount': str(metadata.total_amount) if metadata.total_amount else None,
+        'cached': cached
+    }
+
 @shared_task(bind=True, max_retries=3)
-def process_proforma_document(self, request_id: str, file_path: str):
+def process_proforma_document(self, request_id: str, file_path: str, content_hash: str = None):
     """
     Celery task to process uploaded proforma document
     1. Extract text from document
     2. Use AI to extract structured metadata
     3. Save results to ProformaMetadata model
+    Documents already in the extraction cache (by content_hash) skip steps 1 and 2.
     """
     try:
         from apps.requests.models import PurchaseRequest
@@ -45,17 +57,50 @@ def process_proforma_document(self, request_id: str, file_path: str):
             metadata.save()
             return {'success': False, 'error': 'File not found'}
         
-        # Extract text
-        extraction_result = DocumentProcessor.extract_text_from_document(full_path)
+        if content_hash is None:
+            with default_storage.open(file_path, 'rb') as stored_file:
+                content_hash = fingerprint_file(stored_file)
         
-        if not extraction_result['success']:
-            logger.error(f"Text extraction failed: {extraction_result['error']}")
-            metadata.extraction_status = ProformaMetadata.ExtractionStatus.FAILED
-            metadata.error_message = extraction_result['error']
+        # A document seen before reuses its text and AI output
+        cached = reusable_extraction(content_hash)
+        if cached is not None:
+            logger.info(f"Reusing extraction {content_hash[:12]} for request {request_id}")
+            cached.apply_to(metadata)
             metadata.save()
-            return {'success': False, 'error': extraction_result['error']}
+            return _proforma_result(metadata, cached=True)
         
-        extracted_text = extraction_result['text']
+        # Text from a previous upload whose AI call failed is still good
+        cached = ExtractedDocument.objects.filter(sha256=content_hash).first()
+        if cached is not None:
+            extracted_text = cached.raw_text
+        else:
+            extraction_result = DocumentProcessor.extract_text_from_document(full_path)
+            
+            if not extraction_result['success']:
+                logger.error(f"Text extraction failed: {extraction_result['error']}")
+                metadata.extraction_status = ProformaMetadata.ExtractionStatus.FAILED
+                metadata.error_message = extraction_result['error']
+                metadata.save()
+                return {'success': False, 'error': extraction_result['error']}
+            
+            extracted_text = extraction_result['text']
+            if 'page_count' in extraction_result:
+                logger.info(
+                    f"Extracted {extraction_result['pages_extracted']}/{extraction_result['page_count']} pages "
+                    f"({extraction_result['pages_ocred']} OCRed), "
+                    f"{len(extracted_text)} chars, peak RSS {extraction_result['peak_memory_kb']} KiB"
+                    + (' (truncated at budget)' if extraction_result['truncated'] else '')
+                )
+            ExtractedDocument.objects.get_or_create(
+                sha256=content_hash,
+                defaults={
+                    'raw_text': extracted_text,
+                    'extraction_method': extraction_result.get('method', ''),
+                    'page_count': extraction_result.get('page_count'),
+                    'truncated': extraction_result.get('truncated', False),
+                    'peak_memory_kb': extraction_result.get('peak_memory_kb'),
+                }
+            )
         metadata.raw_text = extracted_text
         
         # Step 2: AI metadata extraction
@@ -66,24 +111,14 @@ def process_proforma_document(self, request_id: str, file_path: str):
         
         if ai_result['success']:
             # Save extracted data
-            data = ai_result['data']
-            metadata.vendor_name = data.get('vendor_name', '')
-            metadata.vendor_address = data.get('vendor_address', '')
-            metadata.total_amount = data.get('total_amount')
-            metadata.currency = data.get('currency', '')
-            metadata.payment_terms = data.get('payment_terms', '')
-            metadata.items = data.get('items', [])
-            metadata.confidence_score = ai_result.get('confidence', 0.0)
-            metadata.ai_response = ai_result.get('raw_response', {})
-            
-            # Determine status based on confidence
-            if metadata.confidence_score >= 0.7:
-                metadata.extraction_status = ProformaMetadata.ExtractionStatus.SUCCESS
-            elif metadata.confidence_score >= 0.3:
-                metadata.extraction_status = ProformaMetadata.ExtractionStatus.PARTIAL
-            else:
-                metadata.extraction_status = ProformaMetadata.ExtractionStatus.FAILED
-                metadata.error_message = "Low confidence in extracted data"
+            metadata.apply_extraction(
+                ai_result['data'], ai_result.get('confidence', 0.0), ai_result.get('raw_response', {})
+            )
+            ExtractedDocument.objects.filter(sha256=content_hash).update(
+                ai_data=ai_result['data'],
+                ai_response=metadata.ai_response,
+                confidence_score=metadata.confidence_score
+            )
         else:
             # AI extraction failed
             metadata.extraction_status = ProformaMetadata.ExtractionStatus.FAILED
@@ -94,13 +129,7 @@ def process_proforma_document(self, request_id: str, file_path: str):
         
         logger.info(f"Proforma processing completed for request {request_id}")
         
-        return {
-            'success': True,
-            'extraction_status': metadata.extraction_status,
-            'confidence_score': metadata.confidence_score,
-            'vendor_name': metadata.vendor_name,
-            'total_amount': str(metadata.total_amount) if metadata.total_amount else None
-        }
+        return _proforma_result(metadata)
         
     except Exception as e:
         logger.error(f"Error processing proforma for request {request_id}: {str(e)}")
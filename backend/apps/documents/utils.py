@@ -1,7 +1,13 @@
 import os
 import logging
+import multiprocessing
+import resource
+import subprocess
+import tempfile
 import magic
-from typing import Optional, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
 
@@ -11,11 +17,16 @@ try:
     import PyPDF2
     import pytesseract
     from PIL import Image
+    from .preprocessing import preprocess_for_ocr
 except ImportError as e:
     logging.warning(f"Document processing library not available: {e}")
 
 logger = logging.getLogger(__name__)
 
+# Extraction runs in threads of the documents worker; forking that process could hand a child
+# a lock another thread holds, so the pools start their processes from a clean fork server
+POOL_CONTEXT = multiprocessing.get_context('forkserver')
+
 class DocumentProcessor:
     """Handles text extraction from various document types"""
     
@@ -80,47 +91,171 @@ class DocumentProcessor:
                 'error': str(e)
             }
     
+    @classmethod
+    def _pdf_settings(cls):
+        config = getattr(settings, 'DOCUMENT_PROCESSING', {})
+        return {
+            'workers': config.get('PDF_WORKERS', 4),
+            'chunk_size': config.get('PDF_PAGES_PER_CHUNK', 25),
+            'min_parallel_pages': config.get('PDF_PARALLEL_MIN_PAGES', 50),
+            'max_pages': config.get('PDF_MAX_PAGES'),
+            'max_chars': config.get('MAX_TEXT_CHARS'),
+            'ocr_dpi': config.get('OCR_DPI', 300),
+            'ocr_workers': config.get('OCR_WORKERS', 2),
+            'ocr_threads': config.get('OCR_THREADS_PER_PROCESS', 1),
+        }
+    
     @classmethod
     def _extract_from_pdf(cls, file_path: str) -> Dict[str, Any]:
-        """Extract text from PDF using pdfplumber with PyPDF2 fallback"""
-        text = ""
-        
+        """
+        Extract text from PDF page by page, with pdfplumber and a PyPDF2 fallback
+        for pages it cannot read. Pages are streamed and released one at a time,
+        reading stops once the PDF_MAX_PAGES or MAX_TEXT_CHARS budget is spent, and
+        long documents are split into page ranges for a bounded process pool.
+        Pages with no text layer (scans) are rasterized and OCRed, then merged in page order.
+        The result also carries the page counts and the peak RSS seen while extracting.
+        """
         try:
-            # Try pdfplumber first (better for tables and layout)
-            with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            if text.strip():
-                return {'success': True, 'text': text.strip(), 'method': 'pdfplumber'}
-                
+            page_count = cls._pdf_page_count(file_path)
         except Exception as e:
-            logger.warning(f"pdfplumber failed for {file_path}: {str(e)}")
+            logger.error(f"Could not read PDF {file_path}: {str(e)}")
+            return {
+                'success': False,
+                'text': '',
+                'error': f'PDF extraction failed: {str(e)}'
+            }
         
+        config = cls._pdf_settings()
+        max_chars = config['max_chars']
+        page_budget = min(page_count, config['max_pages'] or page_count)
+        chunk_size = config['chunk_size']
+        ranges = [(start, min(start + chunk_size, page_budget)) for start in range(0, page_budget, chunk_size)]
+        
+        peaks = [current_rss_kb()]
+        submitted = None
+        if config['workers'] > 1 and len(ranges) > 1 and page_budget >= config['min_parallel_pages']:
+            submitted = cls._submit_ranges(file_path, ranges, config['workers'])
+        if submitted is not None:
+            pages = cls._iter_pool_results(*submitted, peaks)
+        else:
+            pages = (page[1:] for page in iter_pdf_pages(file_path, 0, page_budget))
+        
+        texts, blank_pages, methods, chars, pages_read = {}, [], set(), 0, 0
         try:
-            # Fallback to PyPDF2
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            
-            if text.strip():
-                return {'success': True, 'text': text.strip(), 'method': 'PyPDF2'}
-                
-        except Exception as e:
-            logger.error(f"PyPDF2 also failed for {file_path}: {str(e)}")
+            # Both sources yield every page in order from the first
+            for index, (text, method) in enumerate(pages):
+                pages_read += 1
+                if text:
+                    texts[index] = text
+                    methods.add(method)
+                    chars += len(text) + 1
+                else:
+                    blank_pages.append(index)
+                peaks.append(current_rss_kb())
+                if max_chars and chars >= max_chars:
+                    break
+        finally:
+            # Closing the generator closes the PDF or cancels the pool's outstanding ranges
+            pages.close()
+        
+        ocred = {}
+        if blank_pages and not (max_chars and chars >= max_chars):
+            ocred = cls._ocr_pages(file_path, blank_pages, config, peaks)
+            for index, text in ocred.items():
+                if text:
+                    texts[index] = text
+                    methods.add('pytesseract')
+        
+        if not texts:
             return {
                 'success': False,
                 'text': '',
-                'error': f'PDF extraction failed: {str(e)}'
+                'error': 'No text could be extracted from PDF'
             }
         
+        text = '\n'.join(texts[index] for index in sorted(texts)).strip()
+        truncated = pages_read < page_count or bool(max_chars and len(text) > max_chars)
+        return {
+            'success': True,
+            'text': text[:max_chars] if max_chars else text,
+            'method': '+'.join(sorted(methods)),
+            'page_count': page_count,
+            'pages_extracted': pages_read,
+            'pages_ocred': len(ocred),
+            'truncated': truncated,
+            'peak_memory_kb': max(peaks),
+        }
+    
+    @classmethod
+    def _ocr_pages(cls, file_path, indexes, config, peaks):
+        """
+        {page_index: text} for pages without a text layer, OCRed in a pool of
+        OCR_WORKERS processes each limited to OCR_THREADS_PER_PROCESS tesseract threads.
+        The documents queue's threads-pool worker can start it; daemonic prefork children OCR serially.
+        """
+        workers = min(config['ocr_workers'], len(indexes))
+        count = len(indexes)
+        args = ([file_path] * count, indexes, [config['ocr_dpi']] * count, [config['ocr_threads']] * count)
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT) as pool:
+                    results = list(pool.map(ocr_pdf_page, *args))
+                return cls._collect_ocr(indexes, results, peaks)
+            except (AssertionError, OSError, BrokenProcessPool) as e:
+                logger.warning(f"OCR process pool unavailable, OCRing serially: {str(e)}")
+        return cls._collect_ocr(indexes, list(map(ocr_pdf_page, *args)), peaks)
+    
+    @classmethod
+    def _collect_ocr(cls, indexes, results, peaks):
+        peaks.extend(peak_kb for _, peak_kb in results)
+        return {index: text for index, (text, _) in zip(indexes, results)}
+    
+    @classmethod
+    def _pdf_page_count(cls, file_path):
+        """Page count from the cross-reference table, without parsing any page content"""
+        try:
+            with open(file_path, 'rb') as file:
+                return len(PyPDF2.PdfReader(file).pages)
+        except Exception as e:
+            logger.warning(f"PyPDF2 could not count pages of {file_path}: {str(e)}")
+        with pdfplumber.open(file_path) as pdf:
+            return len(pdf.pages)
+    
+    @classmethod
+    def _submit_ranges(cls, file_path, ranges, workers):
+        """(pool, futures) with every range submitted, or None when a pool cannot be used here"""
+        pool = None
+        try:
+            pool = ProcessPoolExecutor(max_workers=min(workers, len(ranges)), mp_context=POOL_CONTEXT)
+            return pool, [pool.submit(extract_pdf_page_range, file_path, start, stop) for start, stop in ranges]
+        except (AssertionError, OSError, BrokenProcessPool) as e:
+            # Daemonic prefork workers may not start children; run the ranges in this process instead
+            logger.warning(f"PDF process pool unavailable, extracting serially: {str(e)}")
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            return None
+    
+    @classmethod
+    def _iter_pool_results(cls, pool, futures, peaks):
+        """Yield (text, method) from the pool's ranges in page order, recording each worker's peak RSS"""
+        try:
+            for future in futures:
+                pages, peak_kb = future.result()
+                peaks.append(peak_kb)
+                yield from pages
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    @classmethod
+    def _image_settings(cls):
+        config = getattr(settings, 'DOCUMENT_PROCESSING', {})
         return {
-            'success': False,
-            'text': '',
-            'error': 'No text could be extracted from PDF'
+            'preprocess': config.get('OCR_PREPROCESS', True),
+            'dpi': config.get('OCR_IMAGE_DPI', 300),
+            'max_pixels': config.get('OCR_IMAGE_MAX_PIXELS'),
+            'binarize': config.get('OCR_BINARIZE', True),
+            'crop_margins': config.get('OCR_CROP_MARGINS', True),
+            'detect_orientation': config.get('OCR_DETECT_ORIENTATION', False),
         }
     
     @classmethod
@@ -128,13 +263,25 @@ class DocumentProcessor:
         """Extract text from image using OCR"""
         try:
             # Use pytesseract for OCR
-            image = Image.open(file_path)
-            text = pytesseract.image_to_string(image)
+            config = cls._image_settings()
+            with Image.open(file_path) as image:
+                if config['preprocess']:
+                    image = preprocess_for_ocr(
+                        image,
+                        target_dpi=config['dpi'],
+                        max_pixels=config['max_pixels'],
+                        binarize=config['binarize'],
+                        crop_margins=config['crop_margins'],
+                        detect_orientation=config['detect_orientation']
+                    )
+                text = pytesseract.image_to_string(image).strip()
+            max_chars = cls._pdf_settings()['max_chars']
             
             return {
                 'success': True,
-                'text': text.strip(),
-                'method': 'pytesseract'
+                'text': text[:max_chars] if max_chars else text,
+                'method': 'pytesseract',
+                'truncated': bool(max_chars and len(text) > max_chars)
             }
             
         except Exception as e:
@@ -144,3 +291,93 @@ class DocumentProcessor:
                 'text': '',
                 'error': f'OCR extraction failed: {str(e)}'
             }
+
+
+def current_rss_kb() -> int:
+    """Resident set size of this process in KiB; where /proc is missing, the lifetime peak instead"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def iter_pdf_pages(file_path: str, start: int, stop: int) -> Iterator[Tuple[int, str, str]]:
+    """
+    Yield (page_index, text, method) for pages [start, stop) of a PDF, one page
+    at a time. pdfplumber reads each page and its parsed objects are released
+    before the next; a page it fails on or finds empty is retried with PyPDF2
+    on its own. Stop iterating (or close the generator) to stop reading.
+    """
+    try:
+        pdf = pdfplumber.open(file_path, pages=range(start + 1, stop + 1))
+    except Exception as e:
+        logger.warning(f"pdfplumber failed for {file_path}: {str(e)}")
+        pdf = None
+    
+    reader = None
+    try:
+        for index in range(start, stop):
+            text = ''
+            if pdf is not None:
+                page = pdf.pages[index - start]
+                try:
+                    text = page.extract_text() or ''
+                except Exception as e:
+                    logger.warning(f"pdfplumber failed on page {index + 1} of {file_path}: {str(e)}")
+                finally:
+                    page.close()
+            if text.strip():
+                yield index, text, 'pdfplumber'
+                continue
+            
+            try:
+                if reader is None:
+                    reader = PyPDF2.PdfReader(file_path)
+                text = reader.pages[index].extract_text() or ''
+            except Exception as e:
+                logger.warning(f"PyPDF2 failed on page {index + 1} of {file_path}: {str(e)}")
+                text = ''
+            yield index, text, 'PyPDF2'
+    finally:
+        if pdf is not None:
+            pdf.close()
+
+
+def ocr_pdf_page(file_path: str, index: int, dpi: int, threads: int) -> Tuple[str, int]:
+    """
+    (text, peak RSS in KiB) for one page rasterized with poppler's pdftoppm and
+    read by tesseract with at most `threads` OpenMP threads. A page that cannot be
+    rasterized or read gives ''. Module level so a process pool can run it.
+    """
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            prefix = os.path.join(directory, 'page')
+            subprocess.run(
+                ['pdftoppm', '-r', str(dpi), '-f', str(index + 1), '-l', str(index + 1),
+                 '-singlefile', '-gray', '-png', file_path, prefix],
+                check=True, capture_output=True
+            )
+            # The limit goes to this tesseract only; the worker's own environment is shared by its tasks
+            result = subprocess.run(
+                [pytesseract.pytesseract.tesseract_cmd, f'{prefix}.png', 'stdout'],
+                check=True, capture_output=True, text=True,
+                env={**os.environ, 'OMP_THREAD_LIMIT': str(threads)}
+            )
+            return result.stdout.strip(), current_rss_kb()
+    except Exception as e:
+        logger.warning(f"OCR failed on page {index + 1} of {file_path}: {str(e)}")
+        return '', current_rss_kb()
+
+
+def extract_pdf_page_range(file_path: str, start: int, stop: int) -> Tuple[List[Tuple[str, str]], int]:
+    """
+    ([(text, method), ...], peak RSS in KiB) for pages [start, stop).
+    Module level so a process pool can run it.
+    """
+    pages = []
+    peak_kb = current_rss_kb()
+    for _, text, method in iter_pdf_pages(file_path, start, stop):
+        pages.append((text, method))
+        peak_kb = max(peak_kb, current_rss_kb())
+    return pages, peak_kb
@@ -0,0 +1,62 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.notifications.outbox import relay_outbox, purge_dispatched, RELAY_BATCH_SIZE
+
+class Command(BaseCommand):
+    help = 'Send committed outbox messages to the Celery broker, once or continuously'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox once and exit instead of polling'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RELAY_BATCH_SIZE,
+            help='Messages claimed per transaction'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when the outbox is empty'
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=7,
+            help='Delete dispatched messages older than this many days'
+        )
+
+    PURGE_EVERY_SECONDS = 3600
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        retention = timedelta(days=options['retention_days'])
+        purged_at = 0.0
+        
+        while True:
+            total = 0
+            # Keep draining while batches come back full
+            while True:
+                sent = relay_outbox(batch_size)
+                total += sent
+                if sent < batch_size:
+                    break
+            if total:
+                self.stdout.write(f'Relayed {total} outbox messages')
+            
+            if options['once']:
+                purged = purge_dispatched(timezone.now() - retention)
+                self.stdout.write(self.style.SUCCESS(f'Relayed {total} messages, purged {purged}'))
+                return
+            
+            if time.monotonic() - purged_at >= self.PURGE_EVERY_SECONDS:
+                purge_dispatched(timezone.now() - retention)
+                purged_at = time.monotonic()
+            if not total:
+                time.sleep(options['interval'])
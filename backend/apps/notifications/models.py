@@ -0,0 +1,31 @@
+from django.db import models
+from django.utils import timezone
+
+class OutboxMessage(models.Model):
+    """
+    A Celery task call recorded in the same transaction as the workflow change
+    that caused it. apps.notifications.outbox.relay_outbox sends it to the
+    broker after commit, so workers never see uncommitted state.
+    """
+    task_name = models.CharField(max_length=200)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # Relay scan: undispatched messages that are due, oldest first
+            models.Index(
+                fields=['available_at', 'id'],
+                name='outbox_pending_idx',
+                condition=models.Q(dispatched_at__isnull=True)
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.task_name} #{self.id}"
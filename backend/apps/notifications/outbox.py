@@ -0,0 +1,57 @@
+from datetime import timedelta
+from celery import current_app
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboxMessage
+
+RELAY_BATCH_SIZE = 100
+MAX_RETRY_DELAY_SECONDS = 300
+
+
+def enqueue(task, *args, **kwargs):
+    """
+    Record task.delay(*args, **kwargs) in the current transaction instead of
+    calling the broker. Arguments must be JSON serializable.
+    """
+    return OutboxMessage.objects.create(task_name=task.name, args=list(args), kwargs=kwargs)
+
+
+def relay_outbox(batch_size=RELAY_BATCH_SIZE):
+    """
+    Send one batch of due messages to the broker and mark them dispatched.
+    Rows are claimed with SKIP LOCKED so several relays can run side by side.
+    Delivery is at least once: a crash after sending but before commit sends again.
+    Returns the number of messages sent.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True).filter(
+                dispatched_at__isnull=True,
+                available_at__lte=now
+            ).order_by('available_at', 'id')[:batch_size]
+        )
+        
+        sent = []
+        for message in messages:
+            try:
+                current_app.tasks[message.task_name].apply_async(args=message.args, kwargs=message.kwargs)
+            except Exception as e:
+                # Most failures are the broker being away; back off and leave the rest for the next pass
+                message.attempts += 1
+                message.last_error = str(e)
+                message.available_at = now + timedelta(
+                    seconds=min(2 ** message.attempts, MAX_RETRY_DELAY_SECONDS)
+                )
+                message.save(update_fields=['attempts', 'last_error', 'available_at'])
+                break
+            sent.append(message.id)
+        
+        OutboxMessage.objects.filter(id__in=sent).update(dispatched_at=now)
+    return len(sent)
+
+
+def purge_dispatched(older_than):
+    """Delete messages dispatched before older_than, returns the number deleted"""
+    deleted, _ = OutboxMessage.objects.filter(dispatched_at__lt=older_than).delete()
+    return deleted
@@ -1,9 +1,34 @@
 # Complete apps/notifications/tasks.py
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import send_mail, send_mass_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 
+def _approval_email(request_obj, action, approver_name):
+    """Subject and body of the requester email for one approval decision"""
+    subject = f'Purchase Request {action.title()}: {request_obj.title}'
+    
+    if action == 'approved':
+        if request_obj.status == 'approved':
+            message = f'Your purchase request "{request_obj.title}" has been fully approved and is now ready for payment processing.'
+        else:
+            message = f'Your purchase request "{request_obj.title}" has been approved at level {approver_name} and moved to the next approval level.'
+    else:
+        message = f'Your purchase request "{request_obj.title}" has been rejected by {approver_name}.'
+    
+    return subject, message
+
+def _finance_email(request_obj):
+    """Subject and body of the finance email for a fully approved request"""
+    subject = f'Ready for Payment: {request_obj.title}'
+    message = f'''
+Purchase request "{request_obj.title}" has been fully approved and is ready for payment processing.
+
+Amount: ${request_obj.total_amount}
+Requester: {request_obj.created_by.get_full_name() or request_obj.created_by.username}
+        '''
+    return subject, message
+
 @shared_task
 def send_approval_notification(request_id, action, approver_name):
     """Send email when request is approved/rejected"""
@@ -13,15 +38,7 @@ def send_approval_notification(request_id, action, approver_name):
         request_obj = PurchaseRequest.objects.get(id=request_id)
         user_email = request_obj.created_by.email
         
-        subject = f'Purchase Request {action.title()}: {request_obj.title}'
-        
-        if action == 'approved':
-            if request_obj.status == 'approved':
-                message = f'Your purchase request "{request_obj.title}" has been fully approved and is now ready for payment processing.'
-            else:
-                message = f'Your purchase request "{request_obj.title}" has been approved at level {approver_name} and moved to the next approval level.'
-        else:
-            message = f'Your purchase request "{request_obj.title}" has been rejected by {approver_name}.'
+        subject, message = _approval_email(request_obj, action, approver_name)
         
         send_mail(
             subject=subject,
@@ -101,13 +118,7 @@ def send_finance_notification(request_id):
         request_obj = PurchaseRequest.objects.get(id=request_id)
         finance_users = User.objects.filter(role='finance')
         
-        subject = f'Ready for Payment: {request_obj.title}'
-        message = f'''
-Purchase request "{request_obj.title}" has been fully approved and is ready for payment processing.
-
-Amount: ${request_obj.total_amount}
-Requester: {request_obj.created_by.get_full_name() or request_obj.created_by.username}
-        '''
+        subject, message = _finance_email(request_obj)
         
         finance_emails = [user.email for user in finance_users if user.email]
         
@@ -122,3 +133,67 @@ Requester: {request_obj.created_by.get_full_name() or request_obj.created_by.use
         
     except Exception as e:
         print(f"Failed to send finance notification: {e}")
+
+@shared_task
+def send_bulk_approval_notifications(decisions, approver_name):
+    """Send requester and finance emails for a batch of [request_id, action] decisions in one connection"""
+    from apps.requests.models import PurchaseRequest
+    from apps.users.models import User
+    
+    try:
+        actions = dict(decisions)
+        requests = PurchaseRequest.objects.filter(id__in=actions).select_related('created_by')
+        finance_emails = [
+            email for email in User.objects.filter(role='finance').values_list('email', flat=True) if email
+        ]
+        
+        messages = []
+        for request_obj in requests:
+            action = actions[str(request_obj.id)]
+            if request_obj.created_by.email:
+                subject, message = _approval_email(request_obj, action, approver_name)
+                messages.append((subject, message, settings.DEFAULT_FROM_EMAIL, [request_obj.created_by.email]))
+            if action == 'approved' and request_obj.status == 'approved' and finance_emails:
+                subject, message = _finance_email(request_obj)
+                messages.append((subject, message, settings.DEFAULT_FROM_EMAIL, finance_emails))
+        
+        send_mass_mail(messages, fail_silently=False)
+        
+    except Exception as e:
+        print(f"Failed to send bulk approval notifications: {e}")
+
+@shared_task
+def send_escalation_digest(level, request_ids):
+    """Send each approver at a level one email listing the requests that are past their SLA"""
+    from apps.requests.models import PurchaseRequest
+    from apps.users.models import User
+    
+    try:
+        approver_emails = [
+            email for email in User.objects.filter(role=f'approver_level_{level}').values_list('email', flat=True)
+            if email
+        ]
+        if not approver_emails:
+            return
+        
+        requests = PurchaseRequest.objects.filter(
+            id__in=request_ids, status='pending', current_approval_level=level
+        ).order_by('updated_at').values_list('title', 'total_amount', 'updated_at')
+        lines = [
+            f'- {title} (${total_amount}), waiting since {updated_at:%Y-%m-%d %H:%M}'
+            for title, total_amount, updated_at in requests
+        ]
+        if not lines:
+            return
+        
+        subject = f'{len(lines)} purchase request(s) awaiting your level {level} approval'
+        message = 'These requests are past their approval deadline:\n\n' + '\n'.join(lines) + (
+            '\n\nPlease log in to the system to review them.'
+        )
+        send_mass_mail(
+            [(subject, message, settings.DEFAULT_FROM_EMAIL, [email]) for email in approver_emails],
+            fail_silently=False,
+        )
+        
+    except Exception as e:
+        print(f"Failed to send escalation digest: {e}")
@@ -0,0 +1,29 @@
+"""Async variant of the purchase order detail endpoint, see apps.requests.async_views"""
+from asgiref.sync import sync_to_async
+from apps.requests.async_views import json_response
+from apps.requests.cache import purchase_order_detail_cache, request_origin
+from apps.users.authentication import async_read_view
+from .models import PurchaseOrder
+from .serializers import PurchaseOrderSerializer
+
+
+def _serialize_purchase_order(request, pk):
+    purchase_order = PurchaseOrder.objects.select_related('request').get(pk=pk)
+    return PurchaseOrderSerializer(purchase_order, context={'request': request}).data
+
+
+@async_read_view
+async def purchase_order_detail(request, user, pk):
+    """Finance-only PO detail, cached on the request version like PurchaseOrderViewSet.retrieve"""
+    if not user.is_finance:
+        return json_response({'detail': 'You do not have permission to perform this action.'}, status=403)
+    
+    current = await PurchaseOrder.objects.filter(pk=pk).values_list('id', 'request__version').afirst()
+    if current is None:
+        return json_response({'detail': 'Not found.'}, status=404)
+    
+    data = await sync_to_async(purchase_order_detail_cache.get)(*current, user.role, request_origin(request))
+    if data is None:
+        data = await sync_to_async(_serialize_purchase_order)(request, current[0])
+        await sync_to_async(purchase_order_detail_cache.set)(*current, user.role, request_origin(request), data)
+    return json_response(data)
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:35
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    """Start each year's counter after the highest PO number already issued"""
+    PurchaseOrder = apps.get_model('po', 'PurchaseOrder')
+    PurchaseOrderSequence = apps.get_model('po', 'PurchaseOrderSequence')
+
+    last_numbers = {}
+    for po_number in PurchaseOrder.objects.values_list('po_number', flat=True).iterator():
+        parts = po_number.split('-')
+        if len(parts) != 3 or parts[0] != 'PO' or not parts[1].isdigit() or not parts[2].isdigit():
+            continue
+        year, number = int(parts[1]), int(parts[2])
+        last_numbers[year] = max(last_numbers.get(year, 0), number)
+
+    PurchaseOrderSequence.objects.bulk_create([
+        PurchaseOrderSequence(year=year, last_number=number)
+        for year, number in last_numbers.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('po', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseOrderSequence',
+            fields=[
+                ('year', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
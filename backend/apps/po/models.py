@@ -1,8 +1,9 @@
 import uuid
-from django.db import models
+from django.db import models, transaction
 from decimal import Decimal
+from apps.requests.models import NestedInRequestMixin
 
-class PurchaseOrder(models.Model):
+class PurchaseOrder(NestedInRequestMixin, models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     request = models.OneToOneField(
         'requests.PurchaseRequest',
@@ -26,23 +27,28 @@ class PurchaseOrder(models.Model):
         ordering = ['-created_at']
 
     def save(self, *args, **kwargs):
-        if not self.po_number:
-            # Generate PO number: PO-YYYY-NNNNNN
-            from django.utils import timezone
-            year = timezone.now().year
-            last_po = PurchaseOrder.objects.filter(
-                po_number__startswith=f'PO-{year}-'
-            ).order_by('-po_number').first()
+        # The PO number's counter lock has to cover the insert, so a failed insert gives the number back;
+        # inside the approval's transaction this adds no savepoint
+        with transaction.atomic(savepoint=False):
+            if not self.po_number:
+                # Generate PO number: PO-YYYY-NNNNNN
+                from .numbering import allocate_po_number
+                self.po_number = allocate_po_number()
             
-            if last_po:
-                last_num = int(last_po.po_number.split('-')[-1])
-                new_num = last_num + 1
-            else:
-                new_num = 1
-            
-            self.po_number = f'PO-{year}-{new_num:06d}'
-        
-        super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.po_number} - {self.request.title}"
+
+class PurchaseOrderSequence(models.Model):
+    """
+    Last PO number handed out per year. Incrementing this row inside the
+    creating transaction replaces the scan over po_number and serializes
+    allocation, so numbers stay unique and dense even under concurrent approvals.
+    """
+    year = models.PositiveIntegerField(primary_key=True)
+    last_number = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.year}: {self.last_number}"
+
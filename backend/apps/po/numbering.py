@@ -0,0 +1,34 @@
+from django.db import IntegrityError, transaction
+from django.db.transaction import TransactionManagementError
+from django.db.models import F
+from django.utils import timezone
+from .models import PurchaseOrderSequence
+
+
+def format_po_number(year, number):
+    return f'PO-{year}-{number:06d}'
+
+
+def allocate_po_number(year=None):
+    """
+    Take the next PO number for a year from its counter row.
+    The UPDATE locks the row until the caller's transaction ends, so a
+    rolled back approval gives its number back instead of leaving a gap.
+    Must run inside the transaction that inserts the purchase order.
+    """
+    # Outside a transaction the lock would end before the insert, and a failed insert would leave a gap
+    if not transaction.get_connection().in_atomic_block:
+        raise TransactionManagementError('PO numbers must be allocated inside the transaction that saves the PO')
+    year = year or timezone.now().year
+    
+    sequences = PurchaseOrderSequence.objects.filter(year=year)
+    if not sequences.update(last_number=F('last_number') + 1):
+        try:
+            with transaction.atomic():
+                PurchaseOrderSequence.objects.create(year=year, last_number=1)
+        except IntegrityError:
+            # Another transaction opened the year first; continue from its row
+            sequences.update(last_number=F('last_number') + 1)
+    number = sequences.values_list('last_number', flat=True).get()
+    
+    return format_po_number(year, number)
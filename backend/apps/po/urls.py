@@ -1,10 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'purchase-orders', views.PurchaseOrderViewSet, basename='purchaseorder')
 
 urlpatterns = [
+    path(
+        'async/purchase-orders/<uuid:pk>/',
+        async_views.purchase_order_detail,
+        name='async-purchaseorder-detail'
+    ),
     path('', include(router.urls)),
 ]
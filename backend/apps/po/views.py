@@ -1,7 +1,10 @@
 from rest_framework import viewsets, permissions
+from rest_framework.response import Response
+from django.core.exceptions import ValidationError
 from .models import PurchaseOrder
 from .serializers import PurchaseOrderSerializer
 from apps.users.permissions import IsFinance
+from apps.requests.cache import purchase_order_detail_cache, request_origin
 
 class PurchaseOrderViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -12,3 +15,22 @@ class PurchaseOrderViewSet(viewsets.ReadOnlyModelViewSet):
     
     def get_queryset(self):
         return PurchaseOrder.objects.all().select_related('request')
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return the cached payload for this PO's current request version when there is one"""
+        try:
+            current = self.get_queryset().filter(
+                pk=kwargs['pk']
+            ).values_list('id', 'request__version').first()
+        except (ValueError, ValidationError):
+            current = None
+        if current is None:
+            return super().retrieve(request, *args, **kwargs)
+        
+        data = purchase_order_detail_cache.get(*current, request.user.role, request_origin(request))
+        if data is not None:
+            return Response(data)
+        
+        response = super().retrieve(request, *args, **kwargs)
+        purchase_order_detail_cache.set(*current, request.user.role, request_origin(request), response.data)
+        return response
@@ -1,17 +1,28 @@
 from django.contrib import admin
-from .models import PurchaseRequest, RequestItem
+from .models import PurchaseRequest, RequestItem, WorkflowEvent
 
 class RequestItemInline(admin.TabularInline):
     model = RequestItem
     extra = 1
 
+class WorkflowEventInline(admin.TabularInline):
+    """Read-only: the event log is append-only"""
+    model = WorkflowEvent
+    fields = ['created_at', 'event_type', 'actor', 'payload']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 @admin.register(PurchaseRequest)
 class PurchaseRequestAdmin(admin.ModelAdmin):
     list_display = ['title', 'created_by', 'status', 'total_amount', 'created_at']
     list_filter = ['status', 'created_at']
     search_fields = ['title', 'description', 'created_by__username']
     readonly_fields = ['id', 'created_at', 'updated_at', 'version']
-    inlines = [RequestItemInline]
+    inlines = [RequestItemInline, WorkflowEventInline]
 
 @admin.register(RequestItem)
 class RequestItemAdmin(admin.ModelAdmin):
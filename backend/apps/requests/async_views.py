@@ -0,0 +1,76 @@
+"""
+Async variants of the read endpoints the frontend polls. Served under ASGI
+they wait on the database without holding a worker; the payloads are the same
+as the DRF views' and share their response cache entries.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.http import parse_etags
+from rest_framework.renderers import JSONRenderer
+from apps.users.authentication import async_read_view
+from .cache import request_detail_cache, request_origin
+from .dashboard import dashboard_queries
+from .models import PurchaseRequest
+from .serializers import PurchaseRequestSerializer, PurchaseRequestSummarySerializer
+
+
+def json_response(data, status=200):
+    """Render with DRF's renderer so the bytes match the sync endpoints"""
+    return HttpResponse(JSONRenderer().render(data), content_type='application/json', status=status)
+
+
+def _serialize_request(request, pk):
+    purchase_request = PurchaseRequest.objects.with_details().get(pk=pk)
+    return PurchaseRequestSerializer(purchase_request, context={'request': request}).data
+
+
+@async_read_view
+async def request_detail(request, user, pk):
+    """Request detail with the same ETag, 304 and cache behaviour as PurchaseRequestViewSet.retrieve"""
+    current = await PurchaseRequest.objects.visible_to(user).filter(
+        pk=pk
+    ).values_list('id', 'version').afirst()
+    if current is None:
+        return json_response({'detail': 'Not found.'}, status=404)
+
+    etag = f'"{current[0]}-{current[1]}"'
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        client_etags = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+        if '*' in client_etags or etag in client_etags:
+            response = HttpResponse(status=304)
+            response['ETag'] = etag
+            return response
+
+    data = await sync_to_async(request_detail_cache.get)(*current, user.role, request_origin(request))
+    if data is None:
+        # Serializers are synchronous; run the cold path in a worker thread
+        data = await sync_to_async(_serialize_request)(request, current[0])
+        etag = f'"{data["id"]}-{data["version"]}"'
+        await sync_to_async(request_detail_cache.set)(
+            data['id'], data['version'], user.role, request_origin(request), data
+        )
+
+    response = json_response(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@async_read_view
+async def dashboard(request, user):
+    """Per-role dashboard, as PurchaseRequestViewSet.dashboard, on the async ORM"""
+    queries = dashboard_queries(user)
+    if queries is None:
+        return json_response({'error': 'No dashboard available for this role'}, status=403)
+
+    queryset, aggregates, count_queries, recent = queries
+    counts = await queryset.aaggregate(**aggregates)
+    for name, count_query in count_queries.items():
+        counts[name] = await count_query.acount()
+    recent = [purchase_request async for purchase_request in recent]
+    return json_response({
+        'role': user.role,
+        'counts': counts,
+        'recent': PurchaseRequestSummarySerializer(recent, many=True).data
+    })
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'response-cache'
+
+
+def request_origin(request):
+    """Scheme and host the client called, as build_absolute_uri uses them"""
+    return f'{request.scheme}://{request.get_host()}'
+
+
+class VersionedResponseCache:
+    """
+    Serialized detail payloads keyed on object id, version, requesting role and
+    origin. Payloads embed absolute file URLs built from the request host, and
+    the sync and async services share the cache under different hosts.
+
+    Writes never delete entries: every write path bumps the version the key is
+    built from, so readers simply stop asking for the old key and it expires.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    def _key(self, object_id, version, role, origin):
+        return f'{KEY_PREFIX}:{self.namespace}:{object_id}:{version}:{role}:{origin}'
+
+    def _count(self, outcome):
+        key = f'{KEY_PREFIX}:stats:{self.namespace}:{outcome}'
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between add and incr; losing one sample is fine
+            pass
+
+    def get(self, object_id, version, role, origin):
+        data = cache.get(self._key(object_id, version, role, origin))
+        self._count('hits' if data is not None else 'misses')
+        return data
+
+    def set(self, object_id, version, role, origin, data):
+        timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 3600)
+        cache.set(self._key(object_id, version, role, origin), dict(data), timeout=timeout)
+
+    def stats(self):
+        hits = cache.get(f'{KEY_PREFIX}:stats:{self.namespace}:hits', 0)
+        misses = cache.get(f'{KEY_PREFIX}:stats:{self.namespace}:misses', 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / total if total else 0.0,
+        }
+
+    def reset_stats(self):
+        cache.delete_many([
+            f'{KEY_PREFIX}:stats:{self.namespace}:hits',
+            f'{KEY_PREFIX}:stats:{self.namespace}:misses',
+        ])
+
+
+request_detail_cache = VersionedResponseCache('purchase-request')
+purchase_order_detail_cache = VersionedResponseCache('purchase-order')
+
+RESPONSE_CACHES = [request_detail_cache, purchase_order_detail_cache]
@@ -0,0 +1,55 @@
+from django.db.models import Count, Q
+from apps.approvals.models import Approval, ApprovalInboxEntry
+from .models import PurchaseRequest
+
+RECENT_LIMIT = 5
+
+
+def dashboard_queries(user):
+    """
+    The unevaluated queries behind a role's dashboard, so the sync and async views
+    can each run them their own way: (queryset, aggregates, {name: count_queryset},
+    recent_queryset). Returns None for roles without a dashboard.
+    """
+    counts = {}
+    
+    if user.role == 'staff':
+        queryset = PurchaseRequest.objects.filter(created_by=user)
+        aggregates = dict(
+            pending_requests=Count('id', filter=Q(status='pending')),
+            approved_requests=Count('id', filter=Q(status='approved')),
+            rejected_requests=Count('id', filter=Q(status='rejected')),
+            receipts_pending=Count('id', filter=Q(
+                payment_status='paid', receipt_submitted=False, receipt_required=True
+            )),
+        )
+        recent = queryset
+    
+    elif user.is_approver:
+        user_level = 1 if user.role == 'approver_level_1' else 2
+        # Queue depth is a range scan on the inbox, decisions one pass over the user's approvals
+        queryset = Approval.objects.filter(approver=user)
+        aggregates = dict(
+            approved_by_me=Count('request', distinct=True, filter=Q(action='approved')),
+            rejected_by_me=Count('request', distinct=True, filter=Q(action='rejected')),
+        )
+        counts['waiting_for_approval'] = ApprovalInboxEntry.objects.filter(level=user_level)
+        recent = PurchaseRequest.objects.filter(inbox_entry__level=user_level)
+    
+    elif user.is_finance:
+        queryset = PurchaseRequest.objects.filter(status='approved')
+        aggregates = dict(
+            awaiting_finance_review=Count('id', filter=Q(payment_status='pending')),
+            paid_requests=Count('id', filter=Q(payment_status='paid')),
+            on_hold_requests=Count('id', filter=Q(payment_status='on_hold')),
+            missing_receipts=Count('id', filter=Q(
+                payment_status='paid', receipt_submitted=False, receipt_required=True
+            )),
+        )
+        recent = queryset.filter(payment_status='pending')
+    
+    else:
+        return None
+    
+    recent = recent.summary().order_by('-created_at', '-id')[:RECENT_LIMIT]
+    return queryset, aggregates, counts, recent
@@ -0,0 +1,32 @@
+from .models import WorkflowEvent
+
+
+def _snapshot(purchase_request):
+    """The workflow state an event leaves the request in"""
+    return {
+        'status': purchase_request.status,
+        'current_level': purchase_request.current_approval_level,
+        'payment_status': purchase_request.payment_status,
+    }
+
+
+def build_event(purchase_request, event_type, actor=None, **details):
+    """An unsaved event, for callers that write a batch with bulk_create"""
+    payload = _snapshot(purchase_request)
+    payload.update({key: value for key, value in details.items() if value not in (None, '')})
+    return WorkflowEvent(
+        request=purchase_request,
+        event_type=event_type,
+        actor=actor,
+        payload=payload
+    )
+
+
+def record_event(purchase_request, event_type, actor=None, **details):
+    """
+    Append one event for a transition. Call it inside the transaction that
+    saves the transition so the log and the request never disagree.
+    """
+    event = build_event(purchase_request, event_type, actor, **details)
+    event.save()
+    return event
@@ -0,0 +1,154 @@
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+from apps.approvals.inbox import sync_inbox_entry
+from apps.approvals.models import Approval
+from apps.approvals.policy import get_approval_policy
+from apps.notifications.models import OutboxMessage
+from apps.requests.models import PurchaseRequest
+from apps.requests.views import PurchaseRequestViewSet
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'approval-benchmark-'
+MODES = ['locking', 'optimistic']
+MAX_RETRIES = 5
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the locking and If-Match approval paths under a burst of concurrent '
+        'approvals on a few hot requests. Creates and deletes its own rows; run it '
+        'against a scratch database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10, help='Number of hot requests')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent approvers')
+        parser.add_argument('--rounds', type=int, default=5, help='Bursts per mode')
+        parser.add_argument('--mode', choices=MODES, help='Only run one mode')
+
+    def handle(self, *args, **options):
+        threads = options['threads']
+        if threads > 1 and not connection.features.has_select_for_update:
+            raise CommandError(
+                f'{connection.vendor} has no row locks and serializes writers; '
+                'run the benchmark on PostgreSQL or with --threads 1'
+            )
+
+        first_outbox_id = OutboxMessage.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        staff_user, approvers, hot_requests = self._create_fixture(options['requests'], threads)
+        try:
+            for mode in [options['mode']] if options['mode'] else MODES:
+                self._report(mode, [
+                    self._run_burst(mode, approvers, hot_requests)
+                    for _ in range(options['rounds'])
+                ])
+        finally:
+            PurchaseRequest.objects.filter(created_by=staff_user).delete()
+            User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+            OutboxMessage.objects.filter(id__gt=first_outbox_id).delete()
+
+    def _create_fixture(self, request_count, approver_count):
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        amount = Decimal('1000.00')
+        level = get_approval_policy().first_level(amount)
+
+        staff_user = User.objects.create_user(username=f'{USERNAME_PREFIX}staff', role='staff')
+        approvers = [
+            User.objects.create_user(
+                username=f'{USERNAME_PREFIX}approver{i}',
+                role=f'approver_level_{level}',
+                approver_level=level
+            )
+            for i in range(approver_count)
+        ]
+        hot_requests = [
+            PurchaseRequest.objects.create(
+                title=f'Benchmark request {i}',
+                description='Approval benchmark',
+                total_amount=amount,
+                created_by=staff_user,
+                current_approval_level=level
+            )
+            for i in range(request_count)
+        ]
+        return staff_user, approvers, hot_requests
+
+    def _reset(self, hot_requests):
+        """Put every hot request back in front of the approvers"""
+        Approval.objects.filter(request__in=hot_requests).delete()
+        for purchase_request in hot_requests:
+            purchase_request.status = PurchaseRequest.Status.PENDING
+            purchase_request.current_approval_level = hot_requests[0].current_approval_level
+            purchase_request.save(update_fields=['status', 'current_approval_level', 'updated_at'])
+            sync_inbox_entry(purchase_request)
+
+    def _approve(self, view, factory, user, purchase_request, mode):
+        """One approval attempt as a client would make it; returns (status_code, seconds)"""
+        started = time.perf_counter()
+        for _ in range(MAX_RETRIES):
+            headers = {}
+            if mode == 'optimistic':
+                # The version the client would have from the detail ETag
+                version = PurchaseRequest.objects.values_list('version', flat=True).get(pk=purchase_request.pk)
+                headers['HTTP_IF_MATCH'] = f'"{purchase_request.pk}-{version}"'
+            request = factory.patch(
+                f'/api/requests/{purchase_request.pk}/approve/', {}, format='json', **headers
+            )
+            force_authenticate(request, user=user)
+            response = view(request, pk=str(purchase_request.pk))
+            if response.status_code != 412:
+                break
+        return response.status_code, time.perf_counter() - started
+
+    def _run_burst(self, mode, approvers, hot_requests):
+        self._reset(hot_requests)
+        view = PurchaseRequestViewSet.as_view({'patch': 'approve'})
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(len(approvers))
+        samples = []
+        lock = threading.Lock()
+
+        def worker(user):
+            try:
+                order = random.sample(hot_requests, len(hot_requests))
+                barrier.wait()
+                results = [self._approve(view, factory, user, purchase_request, mode) for purchase_request in order]
+                with lock:
+                    samples.extend(results)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(user,)) for user in approvers]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started, samples
+
+    def _report(self, mode, bursts):
+        latencies = sorted(seconds for _, samples in bursts for _, seconds in samples)
+        outcomes = Counter(code for _, samples in bursts for code, _ in samples)
+        wall = sum(elapsed for elapsed, _ in bursts)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+
+        self.stdout.write(self.style.SUCCESS(f'{mode}:'))
+        self.stdout.write(
+            f'  {len(latencies)} calls in {wall:.2f}s ({len(latencies) / wall:.0f} calls/s)'
+        )
+        self.stdout.write(
+            f'  latency p50 {statistics.median(latencies) * 1000:.1f}ms, '
+            f'p95 {p95 * 1000:.1f}ms, max {latencies[-1] * 1000:.1f}ms'
+        )
+        self.stdout.write(
+            '  outcomes ' + ', '.join(f'{code}: {count}' for code, count in sorted(outcomes.items()))
+        )
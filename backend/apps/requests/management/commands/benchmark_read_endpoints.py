@@ -0,0 +1,114 @@
+import json
+import math
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Load the polled read endpoints (request detail and dashboard, DRF and async '
+        'variants) of one or more running deployments and report requests/sec and '
+        'latency percentiles. To compare WSGI and ASGI, start the web and web-async '
+        'services with the same worker count and memory limit and pass both URLs; '
+        'repeat --concurrency to sweep past the worker count, where the two diverge.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', required=True, help='Base URL, repeat to compare deployments')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument(
+            '--concurrency', type=int, action='append',
+            help='Clients polling at once, repeat to sweep; defaults to 32'
+        )
+        parser.add_argument('--requests', type=int, default=500, help='Calls per endpoint')
+        parser.add_argument('--request-id', help='Request to poll; defaults to the first one the user can see')
+
+    def handle(self, *args, **options):
+        concurrencies = options['concurrency'] or [32]
+        throughput = {}
+        for base_url in options['url']:
+            base_url = base_url.rstrip('/')
+            token = self._login(base_url, options['username'], options['password'])
+            request_id = options['request_id'] or self._first_request_id(base_url, token)
+
+            self.stdout.write(self.style.SUCCESS(f'{base_url}:'))
+            for concurrency in concurrencies:
+                for label, path in [
+                    ('detail', f'/api/requests/{request_id}/'),
+                    ('detail, async view', f'/api/async/requests/{request_id}/'),
+                    ('dashboard', '/api/requests/dashboard/'),
+                    ('dashboard, async view', '/api/async/requests/dashboard/'),
+                ]:
+                    label = f'{label} x{concurrency}'
+                    elapsed, samples = self._load(
+                        base_url + path, token, concurrency, options['requests']
+                    )
+                    self._report(label, elapsed, samples)
+                    throughput.setdefault(label, []).append((base_url, len(samples) / elapsed))
+
+        if len(options['url']) > 1:
+            self._compare(throughput)
+
+    def _fetch(self, url, token=None, data=None):
+        """One call; returns (status_code, seconds, body)"""
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        request = Request(url, data=json.dumps(data).encode() if data else None, headers=headers)
+        started = time.perf_counter()
+        try:
+            with urlopen(request, timeout=30) as response:
+                body = response.read()
+                code = response.status
+        except HTTPError as error:
+            body = error.read()
+            code = error.code
+        except URLError as error:
+            raise CommandError(f'{url}: {error.reason}')
+        return code, time.perf_counter() - started, body
+
+    def _login(self, base_url, username, password):
+        code, _, body = self._fetch(
+            f'{base_url}/api/auth/login/', data={'username': username, 'password': password}
+        )
+        if code != 200:
+            raise CommandError(f'{base_url}: login failed with {code}')
+        return json.loads(body)['access']
+
+    def _first_request_id(self, base_url, token):
+        _, _, body = self._fetch(f'{base_url}/api/requests/?page_size=1', token)
+        results = json.loads(body).get('results')
+        if not results:
+            raise CommandError(f'{base_url}: the user cannot see any request, pass --request-id')
+        return results[0]['id']
+
+    def _load(self, url, token, concurrency, total):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(lambda _: self._fetch(url, token)[:2], range(total)))
+        return time.perf_counter() - started, samples
+
+    def _report(self, label, elapsed, samples):
+        latencies = sorted(seconds for _, seconds in samples)
+        outcomes = Counter(code for code, _ in samples)
+        p99 = latencies[max(math.ceil(len(latencies) * 0.99) - 1, 0)]
+        self.stdout.write(
+            f'  {label}: {len(samples) / elapsed:.0f} req/s, '
+            f'p50 {statistics.median(latencies) * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms, '
+            + ', '.join(f'{code}: {count}' for code, count in sorted(outcomes.items()))
+        )
+
+    def _compare(self, throughput):
+        """req/s of every deployment relative to the first one, per endpoint and concurrency"""
+        self.stdout.write(self.style.SUCCESS('relative to the first URL:'))
+        for label, results in throughput.items():
+            (_, baseline), *others = results
+            self.stdout.write(f'  {label}: ' + ', '.join(
+                f'{base_url} {rate / baseline:.2f}x' for base_url, rate in others
+            ))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from apps.requests.cache import RESPONSE_CACHES
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters for the detail response caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        for response_cache in RESPONSE_CACHES:
+            stats = response_cache.stats()
+            self.stdout.write(
+                f"{response_cache.namespace}: {stats['hits']} hits, {stats['misses']} misses, "
+                f"hit ratio {stats['hit_ratio']:.1%}"
+            )
+            if options['reset']:
+                response_cache.reset_stats()
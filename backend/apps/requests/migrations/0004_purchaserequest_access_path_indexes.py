@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0003_purchaserequest_clarification_message_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['created_by', '-created_at'], name='pr_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['status', 'current_approval_level', '-created_at'], name='pr_status_level_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['-created_at'], name='pr_approved_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(condition=models.Q(('receipt_submitted', False), ('status', 'approved')), fields=['payment_status'], name='pr_receipt_due_idx'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+FTS_TABLE = 'requests_search_fts'
+DOCUMENT_TABLE = 'requests_requestsearchdocument'
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f"ALTER TABLE {DOCUMENT_TABLE} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('english', document)) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX request_search_vector_gin ON {DOCUMENT_TABLE} USING GIN (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        # External-content FTS5 table over the document rows, kept current by triggers
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"document, content='{DOCUMENT_TABLE}', content_rowid='rowid')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.rowid, new.document); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.rowid, old.document); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.rowid, old.document); "
+            f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.rowid, new.document); END"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS request_search_vector_gin")
+        schema_editor.execute(f"ALTER TABLE {DOCUMENT_TABLE} DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        for suffix in ['ai', 'ad', 'au']:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def populate_search_documents(apps, schema_editor):
+    PurchaseRequest = apps.get_model('requests', 'PurchaseRequest')
+    RequestItem = apps.get_model('requests', 'RequestItem')
+    RequestSearchDocument = apps.get_model('requests', 'RequestSearchDocument')
+    ProformaMetadata = apps.get_model('documents', 'ProformaMetadata')
+
+    for purchase_request in PurchaseRequest.objects.iterator():
+        parts = [purchase_request.title, purchase_request.description]
+        parts.extend(RequestItem.objects.filter(request=purchase_request).values_list('description', flat=True))
+        parts.extend(ProformaMetadata.objects.filter(request=purchase_request).values_list('vendor_name', flat=True))
+        RequestSearchDocument.objects.create(
+            request=purchase_request,
+            document='\n'.join(part for part in parts if part)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0004_purchaserequest_access_path_indexes'),
+        ('documents', '0002_receiptmetadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestSearchDocument',
+            fields=[
+                ('request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='requests.purchaserequest')),
+                ('document', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def backfill_events(apps, schema_editor):
+    """
+    Seed the log from what survives of older requests: their creation and their
+    Approval rows. Clarification and payment history was overwritten and is lost.
+    """
+    PurchaseRequest = apps.get_model('requests', 'PurchaseRequest')
+    Approval = apps.get_model('approvals', 'Approval')
+    WorkflowEvent = apps.get_model('requests', 'WorkflowEvent')
+
+    def write(rows):
+        # auto_now_add stamps bulk_create with the current time, so restore the original times afterwards
+        events = WorkflowEvent.objects.bulk_create([event for event, _ in rows])
+        WorkflowEvent.objects.filter(pk__in=[event.pk for event in events]).update(created_at=models.Case(
+            *[models.When(pk=event.pk, then=models.Value(created_at)) for event, (_, created_at) in zip(events, rows)],
+            output_field=models.DateTimeField()
+        ))
+
+    rows = []
+    requests = PurchaseRequest.objects.values_list('id', 'created_by_id', 'total_amount', 'created_at')
+    for request_id, created_by_id, total_amount, created_at in requests.iterator():
+        event = WorkflowEvent(
+            request_id=request_id,
+            event_type='created',
+            actor_id=created_by_id,
+            payload={'status': 'pending', 'current_level': 1, 'total_amount': str(total_amount), 'backfilled': True}
+        )
+        rows.append((event, created_at))
+        if len(rows) >= BACKFILL_BATCH_SIZE:
+            write(rows)
+            rows = []
+
+    approvals = Approval.objects.values_list('request_id', 'approver_id', 'level', 'action', 'comment', 'created_at')
+    for request_id, approver_id, level, action, comment, created_at in approvals.iterator():
+        payload = {'approval_level': level, 'backfilled': True}
+        if comment:
+            payload['comment'] = comment
+        event = WorkflowEvent(request_id=request_id, event_type=action, actor_id=approver_id, payload=payload)
+        rows.append((event, created_at))
+        if len(rows) >= BACKFILL_BATCH_SIZE:
+            write(rows)
+            rows = []
+
+    if rows:
+        write(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('requests', '0005_requestsearchdocument'),
+        ('approvals', '0003_approvalpolicy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('created', 'Created'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('clarification_requested', 'Clarification Requested'), ('clarification_responded', 'Clarification Responded'), ('payment_updated', 'Payment Updated'), ('receipt_uploaded', 'Receipt Uploaded')], max_length=30)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='requests.purchaserequest')),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['request', 'created_at', 'id'], name='event_request_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
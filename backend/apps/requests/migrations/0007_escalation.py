@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0006_workflowevent'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workflowevent',
+            name='event_type',
+            field=models.CharField(choices=[('created', 'Created'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('clarification_requested', 'Clarification Requested'), ('clarification_responded', 'Clarification Responded'), ('payment_updated', 'Payment Updated'), ('receipt_uploaded', 'Receipt Uploaded'), ('escalated', 'Escalated')], max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['status', 'current_approval_level', 'updated_at'], name='pr_status_level_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0007_escalation'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='purchaserequest',
+            name='pr_status_level_updated_idx',
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['status', 'current_approval_level', 'updated_at', 'id'], name='pr_status_level_updated_idx'),
+        ),
+    ]
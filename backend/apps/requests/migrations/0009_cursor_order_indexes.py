@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0008_escalation_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='purchaserequest',
+            name='pr_owner_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='purchaserequest',
+            name='pr_approved_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(fields=['created_by', '-created_at', '-id'], name='pr_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaserequest',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['-created_at', '-id'], name='pr_approved_created_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from importlib import import_module
+from django.db import migrations, models
+import django.db.models.deletion
+
+initial = import_module('apps.requests.migrations.0005_requestsearchdocument')
+
+FTS_TABLE = initial.FTS_TABLE
+DOCUMENT_TABLE = initial.DOCUMENT_TABLE
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        initial.create_search_index(apps, schema_editor)
+    elif vendor == 'sqlite':
+        # Keyed on the explicit INTEGER PRIMARY KEY rather than the implicit rowid
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"document, content='{DOCUMENT_TABLE}', content_rowid='id')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.id, new.document); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.id, old.document); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {DOCUMENT_TABLE} BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.id, old.document); "
+            f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.id, new.document); END"
+        )
+
+
+def restore_initial_index(apps, schema_editor):
+    initial.create_search_index(apps, schema_editor)
+    initial.populate_search_documents(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+    """
+    Rebuild the search documents with an integer primary key. The documents are
+    derived data, so the table is recreated and repopulated rather than altered.
+    """
+
+    dependencies = [
+        ('requests', '0009_cursor_order_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(initial.drop_search_index, restore_initial_index),
+        migrations.DeleteModel(name='RequestSearchDocument'),
+        migrations.CreateModel(
+            name='RequestSearchDocument',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='requests.purchaserequest')),
+                ('document', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, initial.drop_search_index),
+        migrations.RunPython(initial.populate_search_documents, migrations.RunPython.noop),
+    ]
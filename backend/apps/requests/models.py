@@ -1,10 +1,81 @@
+import re
 import uuid
-from django.db import models
+from django.db import models, connections
+from django.db.models.expressions import RawSQL
 from django.contrib.auth import get_user_model
 from decimal import Decimal
 
 User = get_user_model()
 
+class ApprovedLevels(models.Aggregate):
+    """Comma separated list of levels, aggregated per request"""
+    function = 'GROUP_CONCAT'
+    output_field = models.CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            function='STRING_AGG',
+            template="%(function)s(CAST(%(expressions)s AS text), ',')",
+            **extra_context
+        )
+
+class PurchaseRequestQuerySet(models.QuerySet):
+    SUMMARY_FIELDS = [
+        'id', 'title', 'total_amount', 'status', 'current_approval_level',
+        'payment_status', 'receipt_required', 'receipt_submitted',
+        'created_by', 'created_by__username', 'created_at', 'updated_at',
+    ]
+
+    def visible_to(self, user):
+        """Requests a user may open in detail: their own, their level's or ones they decided, or approved ones"""
+        if user.role == 'staff':
+            return self.filter(created_by=user)
+        if user.is_approver:
+            level = 1 if user.role == 'approver_level_1' else 2
+            return self.filter(
+                models.Q(current_approval_level=level) | models.Q(approvals__approver=user)
+            ).distinct()
+        if user.is_finance:
+            return self.filter(status='approved')
+        return self.none()
+
+    def summary(self):
+        """Load only the columns PurchaseRequestSummarySerializer renders"""
+        return self.select_related('created_by').only(*self.SUMMARY_FIELDS)
+
+    def with_details(self):
+        """Load every relation PurchaseRequestSerializer renders in a fixed number of queries"""
+        return self.select_related(
+            'created_by',
+            'purchase_order',
+            'proforma_metadata',
+            'receipt_metadata',
+        ).prefetch_related(
+            'items',
+            'approvals__approver',
+        )
+
+    def bump_version(self):
+        """Mark these requests as changed without loading them, e.g. after a nested metadata write"""
+        return self.update(version=models.F('version') + 1)
+
+    def with_approval_state(self):
+        """Annotate approved and required levels so next_approval_level/is_fully_approved cost no queries"""
+        from apps.approvals.models import Approval
+        from apps.approvals.policy import get_approval_policy
+
+        approved_levels = Approval.objects.filter(
+            request=models.OuterRef('pk'),
+            action='approved'
+        ).order_by().values('request').annotate(
+            levels=ApprovedLevels('level')
+        ).values('levels')
+        return self.annotate(
+            approved_levels_csv=models.Subquery(approved_levels),
+            required_levels_csv=get_approval_policy().as_expression('total_amount'),
+        )
+
 class PurchaseRequest(models.Model):
     class Status(models.TextChoices):
         PENDING = 'pending', 'Pending'
@@ -56,12 +127,54 @@ class PurchaseRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PurchaseRequestQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Staff list: own requests, newest first, in cursor order down to the id tie-break
+            models.Index(fields=['created_by', '-created_at', '-id'], name='pr_owner_created_idx'),
+            # Approver queue: pending requests at one level, newest first
+            models.Index(
+                fields=['status', 'current_approval_level', '-created_at'],
+                name='pr_status_level_created_idx'
+            ),
+            # SLA escalation: pending requests at one level, least recently touched first
+            models.Index(
+                fields=['status', 'current_approval_level', 'updated_at', 'id'],
+                name='pr_status_level_updated_idx'
+            ),
+            # Finance list: approved requests only, in cursor order
+            models.Index(
+                fields=['-created_at', '-id'],
+                name='pr_approved_created_idx',
+                condition=models.Q(status='approved')
+            ),
+            # Payment and receipt reminders: approved requests still missing a receipt
+            models.Index(
+                fields=['payment_status'],
+                name='pr_receipt_due_idx',
+                condition=models.Q(status='approved', receipt_submitted=False)
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
 
+    def save(self, *args, **kwargs):
+        # Every write changes the representation, so every write gets a new version (served as the ETag).
+        # Incremented in SQL so bumps made by bump_version() since this instance was loaded are kept.
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        
+        self.version = models.F('version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'version'}
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
+
     @property
     def is_locked(self):
         """Request is locked if approved or rejected"""
@@ -69,29 +182,48 @@ class PurchaseRequest(models.Model):
 
     @property
     def required_approval_levels(self):
-        """Define required approval levels based on amount or other criteria"""
-        # Simple rule: all requests need level 1 and 2 approval
-        return [1, 2]
+        """Approval levels this request's amount is routed through, from the approval policy"""
+        if hasattr(self, 'required_levels_csv'):
+            return [int(level) for level in self.required_levels_csv.split(',')]
+        from apps.approvals.policy import get_approval_policy
+        return list(get_approval_policy().levels_for(self.total_amount))
+
+    def _approved_levels(self):
+        """Levels approved so far, from the list annotation or prefetched approvals when available"""
+        if hasattr(self, 'approved_levels_csv'):
+            return {int(level) for level in (self.approved_levels_csv or '').split(',') if level}
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'approvals' in prefetched:
+            return {approval.level for approval in prefetched['approvals'] if approval.action == 'approved'}
+        return set(self.approvals.filter(action='approved').values_list('level', flat=True))
+
+    def approval_state(self, also_approved=()):
+        """Return (is_fully_approved, next_approval_level) from a single read of approved levels"""
+        pending_levels = set(self.required_approval_levels) - self._approved_levels() - set(also_approved)
+        if pending_levels:
+            return False, min(pending_levels)
+        return True, None
 
     @property
     def next_approval_level(self):
         """Get the next required approval level"""
-        approved_levels = set(self.approvals.filter(action='approved').values_list('level', flat=True))
-        required_levels = set(self.required_approval_levels)
-        pending_levels = required_levels - approved_levels
-        
-        if pending_levels:
-            return min(pending_levels)
-        return None
+        return self.approval_state()[1]
 
     @property
     def is_fully_approved(self):
         """Check if all required approvals are complete"""
-        approved_levels = set(self.approvals.filter(action='approved').values_list('level', flat=True))
-        required_levels = set(self.required_approval_levels)
-        return required_levels.issubset(approved_levels)
+        return self.approval_state()[0]
+
+class NestedInRequestMixin:
+    """
+    For models nested in the request payload (items, proforma and receipt metadata,
+    the PO): saving one changes the request's version, which keys its ETag and cache
+    """
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        PurchaseRequest.objects.filter(pk=self.request_id).bump_version()
 
-class RequestItem(models.Model):
+class RequestItem(NestedInRequestMixin, models.Model):
     request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE, related_name='items')
     description = models.CharField(max_length=200)
     quantity = models.PositiveIntegerField()
@@ -105,3 +237,101 @@ class RequestItem(models.Model):
 
     def __str__(self):
         return f"{self.description} (x{self.quantity})"
+
+class RequestSearchDocumentQuerySet(models.QuerySet):
+    FTS_TABLE = 'requests_search_fts'
+    TERM = re.compile(r'\w+')
+
+    def matching(self, query):
+        """
+        Documents matching every word of a free-text query as a prefix ("inv" finds
+        "invoice"), the same on every engine, using the engine's full-text index
+        """
+        terms = self.TERM.findall(query)
+        if not terms:
+            return self.none()
+        
+        vendor = connections[self.db].vendor
+        if vendor == 'postgresql':
+            # Terms are word characters only, so none of them is parsed as tsquery syntax
+            return self.filter(RawSQL(
+                "search_vector @@ to_tsquery('english', %s)",
+                [' & '.join(f'{term}:*' for term in terms)],
+                output_field=models.BooleanField()
+            ))
+        if vendor == 'sqlite':
+            # Quote every term so user input is never parsed as FTS5 syntax; trailing * allows prefixes
+            match = ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+            # The FTS rowid is the document's integer primary key; Django qualifies the column
+            return self.filter(id__in=RawSQL(
+                f"SELECT rowid FROM {self.FTS_TABLE} WHERE {self.FTS_TABLE} MATCH %s",
+                [match]
+            ))
+        
+        queryset = self
+        for term in terms:
+            queryset = queryset.filter(document__icontains=term)
+        return queryset
+
+class RequestSearchDocument(models.Model):
+    """
+    Precomputed search text for a request: title, description, item descriptions
+    and the extracted vendor name. The migration adds the engine index on top of
+    it, a generated tsvector column with a GIN index on PostgreSQL and an FTS5
+    table kept in sync by triggers on SQLite.
+    """
+    # INTEGER PRIMARY KEY is SQLite's rowid itself, so the FTS5 index can key on it
+    # without VACUUM or a table rebuild renumbering rows behind the index's back
+    id = models.AutoField(primary_key=True)
+    request = models.OneToOneField(
+        PurchaseRequest,
+        on_delete=models.CASCADE,
+        related_name='search_document'
+    )
+    document = models.TextField(blank=True)
+
+    objects = RequestSearchDocumentQuerySet.as_manager()
+
+    def __str__(self):
+        return f"Search document for {self.request_id}"
+
+class WorkflowEvent(models.Model):
+    """
+    Append-only history of a request. Every transition writes one row in the
+    transaction that makes it, with the state it left the request in, so the
+    timeline never depends on fields that later writes overwrite.
+    """
+    class EventType(models.TextChoices):
+        CREATED = 'created', 'Created'
+        APPROVED = 'approved', 'Approved'
+        REJECTED = 'rejected', 'Rejected'
+        CLARIFICATION_REQUESTED = 'clarification_requested', 'Clarification Requested'
+        CLARIFICATION_RESPONDED = 'clarification_responded', 'Clarification Responded'
+        PAYMENT_UPDATED = 'payment_updated', 'Payment Updated'
+        RECEIPT_UPLOADED = 'receipt_uploaded', 'Receipt Uploaded'
+        ESCALATED = 'escalated', 'Escalated'
+
+    id = models.BigAutoField(primary_key=True)
+    request = models.ForeignKey(PurchaseRequest, on_delete=models.CASCADE, related_name='events')
+    event_type = models.CharField(max_length=30, choices=EventType.choices)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['created_at', 'id']
+        indexes = [
+            # Timeline read: one request's events in order
+            models.Index(fields=['request', 'created_at', 'id'], name='event_request_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.request_id} - {self.get_event_type_display()}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Workflow events are append-only')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError('Workflow events are append-only')
@@ -0,0 +1,26 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PurchaseRequestCursorPagination(CursorPagination):
+    """
+    Keyset pagination for request lists: no COUNT(*) and no OFFSET scans,
+    and pages stay stable while new requests are being created.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class ApprovalHistoryCursorPagination(PurchaseRequestCursorPagination):
+    """Approval history is ordered by the most recent workflow change"""
+    ordering = ('-updated_at', '-id')
+
+
+class ApproverInboxCursorPagination(PurchaseRequestCursorPagination):
+    """
+    The approver queue is ordered on the inbox's own denormalized columns,
+    annotated onto each request, so a page is one range scan of
+    inbox_level_created_req_idx with no sort
+    """
+    ordering = ('-inbox_created_at', 'inbox_request_id')
@@ -0,0 +1,26 @@
+from .models import RequestItem, RequestSearchDocument
+
+
+def build_search_document(purchase_request):
+    """Concatenate everything a request can be found by"""
+    from apps.documents.models import ProformaMetadata
+
+    parts = [purchase_request.title, purchase_request.description]
+    parts.extend(RequestItem.objects.filter(request=purchase_request).values_list('description', flat=True))
+    parts.extend(ProformaMetadata.objects.filter(request=purchase_request).values_list('vendor_name', flat=True))
+    return '\n'.join(part for part in parts if part)
+
+
+def update_search_document(purchase_request, create_missing=True):
+    """Rewrite the search document of one request; the engine index follows it on write"""
+    document = build_search_document(purchase_request)
+    updated = RequestSearchDocument.objects.filter(request=purchase_request).update(document=document)
+    if not updated and create_missing:
+        RequestSearchDocument.objects.create(request=purchase_request, document=document)
+
+
+def search_requests(queryset, query):
+    """Narrow a PurchaseRequest queryset to full-text matches, as a single subquery"""
+    return queryset.filter(
+        pk__in=RequestSearchDocument.objects.matching(query).values('request_id')
+    )
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import PurchaseRequest, RequestItem
+from .models import PurchaseRequest, RequestItem, WorkflowEvent
 from apps.approvals.serializers import ApprovalSerializer
 from apps.po.models import PurchaseOrder
 from apps.documents.serializers import ProformaMetadataSerializer, ReceiptMetadataSerializer
@@ -111,3 +111,25 @@ class PurchaseRequestSerializer(serializers.ModelSerializer):
                 RequestItem.objects.create(request=instance, **item_data)
         
         return instance
+
+class PurchaseRequestSummarySerializer(serializers.ModelSerializer):
+    """Flat, read-only projection used by the list tables"""
+    created_by_username = serializers.CharField(source='created_by.username', read_only=True)
+
+    class Meta:
+        model = PurchaseRequest
+        fields = [
+            'id', 'title', 'total_amount', 'status', 'current_approval_level',
+            'payment_status', 'receipt_required', 'receipt_submitted',
+            'created_by_username', 'created_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+class WorkflowEventSerializer(serializers.ModelSerializer):
+    actor_username = serializers.CharField(source='actor.username', read_only=True, default=None)
+
+    class Meta:
+        model = WorkflowEvent
+        fields = ['id', 'event_type', 'actor', 'actor_username', 'payload', 'created_at']
+        read_only_fields = fields
+
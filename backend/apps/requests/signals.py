@@ -0,0 +1,47 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import PurchaseRequest, RequestItem, WorkflowEvent
+from .events import record_event
+from .search import update_search_document
+
+SEARCHED_FIELDS = {'title', 'description'}
+
+
+@receiver(post_save, sender=PurchaseRequest)
+def record_creation(sender, instance, created, raw=False, **kwargs):
+    # Here rather than in the view so requests created anywhere start their timeline
+    if created and not raw:
+        record_event(
+            instance, WorkflowEvent.EventType.CREATED, instance.created_by,
+            total_amount=str(instance.total_amount)
+        )
+
+
+@receiver(post_save, sender=PurchaseRequest)
+def index_purchase_request(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Workflow saves that only touch status or files leave the search text alone
+    if raw or (update_fields is not None and not SEARCHED_FIELDS & set(update_fields)):
+        return
+    update_search_document(instance)
+
+
+@receiver(post_save, sender=RequestItem)
+def index_saved_request_item(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_search_document(instance.request)
+
+
+@receiver(post_delete, sender=RequestItem)
+def index_deleted_request_item(sender, instance, **kwargs):
+    # Never create a document here: the request itself may be part of the same cascade delete
+    purchase_request = PurchaseRequest.objects.filter(pk=instance.request_id).first()
+    if purchase_request is not None:
+        update_search_document(purchase_request, create_missing=False)
+
+
+@receiver(post_save, sender='documents.ProformaMetadata')
+def index_proforma_metadata(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    update_search_document(instance.request)
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'requests', views.PurchaseRequestViewSet, basename='purchaserequest')
 
 urlpatterns = [
+    path('async/requests/dashboard/', async_views.dashboard, name='async-request-dashboard'),
+    path('async/requests/<uuid:pk>/', async_views.request_detail, name='async-request-detail'),
     path('', include(router.urls)),
 ]
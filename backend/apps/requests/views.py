@@ -2,27 +2,75 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.conf import settings
 from django.core.files.storage import default_storage
 from django.db import transaction
-from django.db.models import Q
-from .models import PurchaseRequest
-from .serializers import PurchaseRequestSerializer
+from django.db.models import Exists, OuterRef, F
+from django.utils import timezone
+from django.utils.http import parse_etags
+from django.core.exceptions import ValidationError
+from .models import PurchaseRequest, WorkflowEvent
+from .events import build_event, record_event
+from .serializers import PurchaseRequestSerializer, PurchaseRequestSummarySerializer, WorkflowEventSerializer
 from .permissions import IsOwnerOrReadOnly
+from .cache import request_detail_cache, request_origin
+from .search import search_requests
+from .dashboard import dashboard_queries
+from .pagination import (
+    PurchaseRequestCursorPagination, ApprovalHistoryCursorPagination, ApproverInboxCursorPagination
+)
 from apps.users.permissions import IsStaff, IsApprover, CanApproveRequest
 from apps.approvals.models import Approval
-from apps.approvals.serializers import ApprovalActionSerializer
+from apps.approvals.inbox import sync_inbox_entry
+from apps.approvals.policy import get_approval_policy
+from apps.approvals.pool import claim_requests, claimed_by_others, release_claims
+from apps.approvals.serializers import (
+    ApprovalActionSerializer, BulkApprovalActionSerializer, ClaimRequestsSerializer, ReleaseClaimsSerializer
+)
 from apps.po.models import PurchaseOrder
+from apps.documents.fingerprints import ContentHashUploadHandler, fingerprint_file, reusable_extraction
+from apps.documents.models import ProformaMetadata
 from apps.documents.serializers import ProformaUploadSerializer
 from apps.documents.tasks import process_proforma_document
-from apps.notifications.tasks import send_approval_notification, send_clarification_request, send_receipt_reminder, send_finance_notification
+from apps.notifications.outbox import enqueue
+from apps.notifications.tasks import send_approval_notification, send_clarification_request, send_receipt_reminder, send_finance_notification, send_bulk_approval_notifications
 from apps.users.permissions import IsStaff, IsApprover, CanApproveRequest, IsFinance
 
 
 class PurchaseRequestViewSet(viewsets.ModelViewSet):
     serializer_class = PurchaseRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PurchaseRequestCursorPagination
+
+    def _wants_summary(self):
+        """List routes return the summary projection unless ?view=full is passed"""
+        if self.action not in ['list', 'my_approvals']:
+            return False
+        return self.request.query_params.get('view', 'summary') != 'full'
+
+    def get_serializer_class(self):
+        if self._wants_summary():
+            return PurchaseRequestSummarySerializer
+        return PurchaseRequestSerializer
 
     def get_queryset(self):
+        queryset = self._get_role_queryset()
+
+        # ?q= narrows list views through the full-text index after role scoping
+        query = self.request.query_params.get('q', '').strip()
+        if query and self.action in ['list', 'my_approvals']:
+            queryset = search_requests(queryset, query)
+
+        if self._wants_summary():
+            return queryset.summary()
+
+        # Every role shares the same relation loading so list pages stay at a fixed query count
+        queryset = queryset.with_details()
+        if self.action in ['list', 'my_approvals']:
+            queryset = queryset.with_approval_state()
+        return queryset
+
+    def _get_role_queryset(self):
         user = self.request.user
         
         # Staff can only see their own requests
@@ -36,20 +84,26 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
                 return PurchaseRequest.objects.filter(
                     approvals__approver=user
                 ).distinct().order_by('-updated_at')
-            elif self.action == 'retrieve':
+            elif self.action in ['retrieve', 'timeline']:
                 # For detail view, show any request they have permission to see
-                if user.role == 'approver_level_1':
-                    return PurchaseRequest.objects.filter(
-                        Q(current_approval_level=1) | 
-                        Q(approvals__approver=user)
-                    ).distinct()
-                elif user.role == 'approver_level_2':
-                    return PurchaseRequest.objects.filter(
-                        Q(current_approval_level=2) | 
-                        Q(approvals__approver=user)
-                    ).distinct()
+                return PurchaseRequest.objects.visible_to(user)
+            elif self.action == 'list':
+                # The approver queue is served from the materialized inbox, in its index order
+                queryset = PurchaseRequest.objects.filter(
+                    inbox_entry__level=self._approver_level(user)
+                ).annotate(
+                    inbox_created_at=F('inbox_entry__created_at'),
+                    inbox_request_id=F('inbox_entry__request_id')
+                )
+                if settings.APPROVAL_POOL_MODE:
+                    # In pool mode approvers work their own claims instead of one shared list
+                    queryset = queryset.filter(
+                        inbox_entry__claimed_by=user,
+                        inbox_entry__claim_expires_at__gt=timezone.now()
+                    )
+                return queryset
             else:
-                # For list view, only show pending requests for their level
+                # For workflow actions, only pending requests for their level
                 if user.role == 'approver_level_1':
                     return PurchaseRequest.objects.filter(
                         status='pending',
@@ -67,8 +121,17 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         
         return PurchaseRequest.objects.none()
 
-   
-    @action(detail=False, methods=['get'])
+    def _approver_level(self, user):
+        return 1 if user.role == 'approver_level_1' else 2
+
+    @property
+    def paginator(self):
+        """Approver lists page on the inbox's own columns; see ApproverInboxCursorPagination"""
+        if not hasattr(self, '_paginator') and self.action == 'list' and self.request.user.is_approver:
+            self._paginator = ApproverInboxCursorPagination()
+        return super().paginator
+
+    @action(detail=False, methods=['get'], pagination_class=ApprovalHistoryCursorPagination)
     def my_approvals(self, request):
         """Get requests that the current user has approved/rejected"""
         user = request.user
@@ -77,14 +140,45 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Only approvers can access this endpoint'}, 
                         status=status.HTTP_403_FORBIDDEN)
         
-        # Get only requests where user has actually made an approval decision
-        # This bypasses get_queryset() to avoid any interference
-        approved_requests = PurchaseRequest.objects.filter(
-            approvals__approver=user
-        ).distinct().order_by('-updated_at')
+        # get_queryset() narrows to requests where user has actually made an approval decision
+        approved_requests = self.get_queryset()
         
-        serializer = self.get_serializer(approved_requests, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(approved_requests)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """Full workflow history of a request, oldest first, in one indexed query"""
+        try:
+            visible = self._get_role_queryset().filter(pk=pk).values('pk')
+            events = list(
+                WorkflowEvent.objects.filter(request__in=visible).select_related('actor').order_by('created_at', 'id')
+            )
+        except (ValueError, ValidationError):
+            events = []
+        
+        # Every request has at least its creation event, so nothing means not visible
+        if not events:
+            return Response({'error': 'Request not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(WorkflowEventSerializer(events, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """Per-role dashboard counts, aggregated in a single query, plus the most recent requests"""
+        queries = dashboard_queries(request.user)
+        if queries is None:
+            return Response({'error': 'No dashboard available for this role'}, 
+                        status=status.HTTP_403_FORBIDDEN)
+        
+        queryset, aggregates, count_queries, recent = queries
+        counts = queryset.aggregate(**aggregates)
+        counts.update({name: count_query.count() for name, count_query in count_queries.items()})
+        return Response({
+            'role': request.user.role,
+            'counts': counts,
+            'recent': PurchaseRequestSummarySerializer(recent, many=True).data
+        })
 
     def get_permissions(self):
         """Set permissions based on action"""
@@ -94,6 +188,8 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             permission_classes = [permissions.IsAuthenticated, IsOwnerOrReadOnly]
         elif self.action in ['approve', 'reject', 'request_clarification']:
             permission_classes = [permissions.IsAuthenticated, IsApprover, CanApproveRequest]
+        elif self.action in ['bulk_approve', 'bulk_reject', 'claim', 'release']:
+            permission_classes = [permissions.IsAuthenticated, IsApprover]
         elif self.action in ['upload_proforma', 'upload_receipt', 'respond_to_clarification']:
             permission_classes = [permissions.IsAuthenticated, IsStaff, IsOwnerOrReadOnly]
         elif self.action == 'update_payment_status':
@@ -104,10 +200,80 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
     
+    @transaction.atomic
     def perform_create(self, serializer):
         """Set the created_by field to the current user"""
-        serializer.save(created_by=self.request.user)
+        # Small amounts may skip levels, so start at the first level the policy requires
+        first_level = get_approval_policy().first_level(serializer.validated_data['total_amount'])
+        serializer.save(created_by=self.request.user, current_approval_level=first_level)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Keep the request and its approver inbox row in one transaction
+        purchase_request = serializer.save()
+        
+        # A new amount can change the route; move a pending request to the level it now waits on
+        if purchase_request.status == PurchaseRequest.Status.PENDING:
+            fully_approved, next_level = purchase_request.approval_state()
+            if fully_approved:
+                # The levels already approved cover the new amount, so finish it as the approve path does
+                purchase_request.status = PurchaseRequest.Status.APPROVED
+                self._create_purchase_order(purchase_request)
+                purchase_request.save(update_fields=['status', 'updated_at'])
+                record_event(
+                    purchase_request, WorkflowEvent.EventType.APPROVED,
+                    total_amount=str(purchase_request.total_amount)
+                )
+                enqueue(send_finance_notification, str(purchase_request.id))
+            elif next_level != purchase_request.current_approval_level:
+                purchase_request.current_approval_level = next_level
+                purchase_request.save(update_fields=['current_approval_level', 'updated_at'])
     
+    def _etag(self, pk, version):
+        return f'"{pk}-{version}"'
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Serve the request with a version ETag. If-None-Match is answered with 304
+        and cached payloads are returned after a single version lookup.
+        """
+        try:
+            current = self._get_role_queryset().filter(
+                pk=kwargs['pk']
+            ).values_list('id', 'version').first()
+        except (ValueError, ValidationError):
+            # Malformed ids fall through to the regular 404 handling
+            current = None
+        if current is None:
+            return super().retrieve(request, *args, **kwargs)
+        
+        etag = self._etag(*current)
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # If-None-Match uses weak comparison, so W/ prefixes are ignored
+            client_etags = {tag.removeprefix('W/') for tag in parse_etags(if_none_match)}
+            if '*' in client_etags or etag in client_etags:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+                response['ETag'] = etag
+                return response
+        
+        data = request_detail_cache.get(*current, request.user.role, request_origin(request))
+        if data is not None:
+            response = Response(data)
+        else:
+            response = super().retrieve(request, *args, **kwargs)
+            # Key on the version that was actually serialized in case a write landed in between
+            etag = self._etag(response.data['id'], response.data['version'])
+            request_detail_cache.set(
+                response.data['id'], response.data['version'], request.user.role,
+                request_origin(request), response.data
+            )
+        
+        response['ETag'] = etag
+        # Let browsers keep the payload but revalidate it on every poll
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
     def update(self, request, *args, **kwargs):
         """Override update to check if request is still pending"""
         instance = self.get_object()
@@ -123,6 +289,9 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], parser_classes=[MultiPartParser, FormParser])
     def upload_proforma(self, request, pk=None):
         """Upload proforma document for processing"""
+        # Fingerprint the file while it is parsed, before request.data is read
+        hasher = ContentHashUploadHandler(request)
+        request.upload_handlers.insert(0, hasher)
         purchase_request = self.get_object()
         
         # Check if request is still editable
@@ -138,6 +307,7 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         uploaded_file = serializer.validated_data['file']
+        content_hash = hasher.digests.get('file') or fingerprint_file(uploaded_file)
         
         try:
             # Save file
@@ -148,10 +318,24 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             purchase_request.proforma_file = saved_path
             purchase_request.save()
             
+            # A document processed before gets its metadata now, without OCR or an AI call
+            extraction = reusable_extraction(content_hash)
+            if extraction is not None:
+                metadata, _ = ProformaMetadata.objects.get_or_create(request=purchase_request)
+                extraction.apply_to(metadata)
+                metadata.save()
+                return Response({
+                    'status': 'success',
+                    'message': 'Proforma matches a previously processed document. Metadata is ready.',
+                    'file_path': saved_path,
+                    'task_id': None
+                }, status=status.HTTP_201_CREATED)
+            
             # Start async processing
             task = process_proforma_document.delay(
                 str(purchase_request.id),
-                saved_path
+                saved_path,
+                content_hash
             )
             
             return Response({
@@ -177,15 +361,213 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         """Reject a purchase request"""
         return self._handle_approval_action(request, pk, 'rejected')
     
+    @action(detail=False, methods=['post'])
+    def bulk_approve(self, request):
+        """Approve a batch of purchase requests in one transaction"""
+        return self._handle_bulk_approval_action(request, 'approved')
+    
+    @action(detail=False, methods=['post'])
+    def bulk_reject(self, request):
+        """Reject a batch of purchase requests in one transaction"""
+        return self._handle_bulk_approval_action(request, 'rejected')
+    
+    @action(detail=False, methods=['post'])
+    def claim(self, request):
+        """Pool mode: lease the next pending requests at the approver's level"""
+        if not settings.APPROVAL_POOL_MODE:
+            return Response(
+                {'error': 'Approver pools are not enabled'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = ClaimRequestsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        request_ids = claim_requests(
+            request.user, self._approver_level(request.user), serializer.validated_data['count']
+        )
+        claimed = PurchaseRequest.objects.filter(pk__in=request_ids).summary().order_by('created_at')
+        return Response({
+            'lease_seconds': settings.APPROVAL_CLAIM_LEASE_SECONDS,
+            'results': PurchaseRequestSummarySerializer(claimed, many=True).data
+        })
+    
+    @action(detail=False, methods=['post'])
+    def release(self, request):
+        """Pool mode: hand claimed requests back, all of them unless ids are given"""
+        serializer = ReleaseClaimsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        released = release_claims(request.user, serializer.validated_data.get('ids'))
+        return Response({'released': released})
+    
+    @transaction.atomic
+    def _handle_bulk_approval_action(self, request, action):
+        """Apply one decision to many requests, skipping rows another approver currently holds"""
+        serializer = BulkApprovalActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        comment = serializer.validated_data.get('comment', '')
+        user_level = self._approver_level(request.user)
+        
+        # One locking read for the whole batch; rows locked elsewhere are reported, not waited on
+        locked_requests = {
+            purchase_request.id: purchase_request
+            for purchase_request in PurchaseRequest.objects.select_for_update(
+                skip_locked=True, of=('self',)
+            ).filter(pk__in=ids).select_related('proforma_metadata').prefetch_related('items').with_approval_state()
+        }
+        missing_ids = set(ids) - set(locked_requests)
+        existing_ids = set(
+            PurchaseRequest.objects.filter(pk__in=missing_ids).values_list('id', flat=True)
+        ) if missing_ids else set()
+        decided_ids = set(
+            Approval.objects.filter(request_id__in=locked_requests, level=user_level).values_list('request_id', flat=True)
+        )
+        contested_ids = claimed_by_others(request.user, locked_requests) if settings.APPROVAL_POOL_MODE else set()
+        
+        results = {}
+        accepted = []
+        for request_id in ids:
+            purchase_request = locked_requests.get(request_id)
+            if purchase_request is None:
+                error = 'Request is being processed by another approver' if request_id in existing_ids else 'Request not found'
+            elif purchase_request.is_locked:
+                error = 'Request is already approved or rejected'
+            elif purchase_request.current_approval_level != user_level:
+                error = f'Request is not at approval level {user_level}'
+            elif request_id in decided_ids:
+                error = 'Request has already been processed at this level'
+            elif request_id in contested_ids:
+                error = 'Request is claimed by another approver'
+            else:
+                accepted.append(purchase_request)
+                continue
+            results[request_id] = {'id': request_id, 'success': False, 'error': error}
+        
+        approvals = Approval.objects.bulk_create([
+            Approval(
+                request=purchase_request,
+                approver=request.user,
+                level=user_level,
+                action=action,
+                comment=comment
+            )
+            for purchase_request in accepted
+        ])
+        
+        for purchase_request, approval in zip(accepted, approvals):
+            if action == 'rejected':
+                purchase_request.status = PurchaseRequest.Status.REJECTED
+            else:
+                # The annotation predates this batch's approvals, so count the level just approved
+                fully_approved, next_level = purchase_request.approval_state(also_approved=[user_level])
+                if fully_approved:
+                    purchase_request.status = PurchaseRequest.Status.APPROVED
+                    self._create_purchase_order(purchase_request)
+                else:
+                    purchase_request.current_approval_level = next_level
+            purchase_request.save(update_fields=['status', 'current_approval_level', 'updated_at'])
+            
+            results[purchase_request.id] = {
+                'id': purchase_request.id,
+                'success': True,
+                'approval_id': approval.id,
+                'request_status': purchase_request.status,
+                'current_level': purchase_request.current_approval_level
+            }
+        
+        WorkflowEvent.objects.bulk_create([
+            build_event(
+                purchase_request, action, request.user,
+                approval_level=user_level, comment=comment, bulk=True
+            )
+            for purchase_request in accepted
+        ])
+        
+        # One task for the whole batch instead of one or two per request
+        if accepted:
+            enqueue(
+                send_bulk_approval_notifications,
+                [[str(purchase_request.id), action] for purchase_request in accepted],
+                request.user.get_full_name() or request.user.username
+            )
+        
+        return Response({
+            'processed': len(accepted),
+            'failed': len(ids) - len(accepted),
+            'results': [results[request_id] for request_id in ids]
+        })
+    
+    def _if_match_version(self, request, purchase_request):
+        """
+        Version named by the If-Match header for this request, or None when the
+        client did not send one (or sent '*') and the locking path applies.
+        A header naming no version of this request yields 0, which never matches.
+        """
+        header = request.headers.get('If-Match')
+        if not header:
+            return None
+        client_etags = parse_etags(header)
+        if '*' in client_etags:
+            return None
+        
+        # If-Match uses strong comparison, so weak tags never match
+        prefix = f'"{purchase_request.id}-'
+        for tag in client_etags:
+            if tag.startswith(prefix) and tag.endswith('"') and tag[len(prefix):-1].isdigit():
+                return int(tag[len(prefix):-1])
+        return 0
+
+    def _precondition_failed(self):
+        return Response(
+            {'error': 'Request has changed since it was read, reload it and try again'},
+            status=status.HTTP_412_PRECONDITION_FAILED
+        )
+
     @transaction.atomic
     def _handle_approval_action(self, request, pk, action):
-        """Handle approval/rejection with proper locking and workflow"""
-        # Get request with SELECT FOR UPDATE to prevent race conditions
+        """
+        Handle approval/rejection. Without If-Match the row is locked for the whole
+        decision; with If-Match nothing is locked up front and the transition is one
+        conditional UPDATE on the version the client saw, answering 412 on conflict.
+        """
+        serializer = ApprovalActionSerializer(data={'action': action, **request.data})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        user_level = self._approver_level(request.user)
+        if_match = request.headers.get('If-Match')
+        optimistic = bool(if_match) and '*' not in parse_etags(if_match)
+        
+        # One read brings the row, its approved levels, this approver's previous
+        # decision and the proforma vendor needed for the PO
+        queryset = PurchaseRequest.objects.all()
+        if not optimistic:
+            queryset = queryset.select_for_update(of=('self',))
+        if settings.APPROVAL_POOL_MODE:
+            queryset = queryset.annotate(
+                claim_holder_id=F('inbox_entry__claimed_by'),
+                claim_expires_at=F('inbox_entry__claim_expires_at')
+            )
         try:
-            purchase_request = PurchaseRequest.objects.select_for_update().get(pk=pk)
-        except PurchaseRequest.DoesNotExist:
+            purchase_request = queryset.select_related(
+                'proforma_metadata'
+            ).with_approval_state().annotate(
+                already_processed=Exists(Approval.objects.filter(
+                    request=OuterRef('pk'), approver=request.user, level=user_level
+                ))
+            ).get(pk=pk)
+        except (PurchaseRequest.DoesNotExist, ValueError, ValidationError):
             return Response({'error': 'Request not found'}, status=status.HTTP_404_NOT_FOUND)
         
+        expected_version = self._if_match_version(request, purchase_request) if optimistic else None
+        if expected_version is not None and expected_version != purchase_request.version:
+            return self._precondition_failed()
+        
         # Check if request is already processed
         if purchase_request.is_locked:
             return Response(
@@ -194,7 +576,6 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             )
         
         # Validate user can approve at current level
-        user_level = 1 if request.user.role == 'approver_level_1' else 2
         if purchase_request.current_approval_level != user_level:
             return Response(
                 {'error': f'Request is not at approval level {user_level}'},
@@ -202,22 +583,54 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             )
         
         # Check if user already approved/rejected this request
-        existing_approval = Approval.objects.filter(
-            request=purchase_request,
-            approver=request.user,
-            level=user_level
-        ).first()
-        
-        if existing_approval:
+        if purchase_request.already_processed:
             return Response(
                 {'error': 'You have already processed this request'},
                 status=status.HTTP_409_CONFLICT
             )
         
-        # Validate serializer
-        serializer = ApprovalActionSerializer(data={'action': action, **request.data})
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # In pool mode a live claim reserves the request for the approver holding it
+        if (
+            settings.APPROVAL_POOL_MODE
+            and purchase_request.claim_holder_id not in (None, request.user.id)
+            and purchase_request.claim_expires_at > timezone.now()
+        ):
+            return Response(
+                {'error': 'Request is claimed by another approver'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        # Work out the transition
+        observed_status = purchase_request.status
+        fully_approved = False
+        if action == 'rejected':
+            purchase_request.status = PurchaseRequest.Status.REJECTED
+        elif action == 'approved':
+            # The annotation was read before this approval, so count the level just approved
+            fully_approved, next_level = purchase_request.approval_state(also_approved=[user_level])
+            if fully_approved:
+                purchase_request.status = PurchaseRequest.Status.APPROVED
+            else:
+                purchase_request.current_approval_level = next_level
+        
+        if expected_version is not None:
+            # Apply the transition first and only if nobody moved the request since the client read it
+            applied = PurchaseRequest.objects.filter(
+                pk=purchase_request.pk,
+                version=expected_version,
+                status=observed_status,
+                current_approval_level=user_level
+            ).update(
+                status=purchase_request.status,
+                current_approval_level=purchase_request.current_approval_level,
+                version=F('version') + 1,
+                updated_at=timezone.now()
+            )
+            if not applied:
+                return self._precondition_failed()
+            purchase_request.version = expected_version + 1
+            # update() skips post_save, so keep the approver inbox in step here
+            sync_inbox_entry(purchase_request)
         
         # Create approval record (ONLY ONCE)
         approval = Approval.objects.create(
@@ -228,34 +641,38 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             comment=serializer.validated_data.get('comment', '')
         )
         
-        # Update request based on action
-        if action == 'rejected':
-            purchase_request.status = PurchaseRequest.Status.REJECTED
-        elif action == 'approved':
-            if purchase_request.is_fully_approved:
-                purchase_request.status = PurchaseRequest.Status.APPROVED
-                self._create_purchase_order(purchase_request)
-                send_finance_notification.delay(str(purchase_request.id))
-            else:
-                purchase_request.current_approval_level = purchase_request.next_approval_level
+        if fully_approved:
+            self._create_purchase_order(purchase_request)
+            enqueue(send_finance_notification, str(purchase_request.id))
         
-        # Increment version for optimistic locking
-        purchase_request.version += 1
-        purchase_request.save()
+        if expected_version is None:
+            # save() increments version for optimistic locking
+            purchase_request.save(update_fields=['status', 'current_approval_level', 'updated_at'])
+        elif fully_approved:
+            # Creating the PO bumped the version again
+            purchase_request.refresh_from_db(fields=['version'])
+        
+        record_event(
+            purchase_request, action, request.user,
+            approval_level=user_level, comment=approval.comment
+        )
 
         # Send notification to requester
-        send_approval_notification.delay(
+        enqueue(
+            send_approval_notification,
             str(purchase_request.id), 
             action, 
             request.user.get_full_name() or request.user.username
         )
         
-        return Response({
+        response = Response({
             'message': f'Request {action} successfully',
             'approval_id': approval.id,
             'request_status': purchase_request.status,
             'current_level': purchase_request.current_approval_level
         })
+        response['ETag'] = self._etag(purchase_request.id, purchase_request.version)
+        return response
     
     def _create_purchase_order(self, purchase_request):
         """Create a purchase order for approved request"""
@@ -284,6 +701,7 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def request_clarification(self, request, pk=None):
         """Approver requests more information"""
         purchase_request = self.get_object()
@@ -302,9 +720,13 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         purchase_request.clarification_requested = True
         purchase_request.clarification_message = message
         purchase_request.save()
+        record_event(
+            purchase_request, WorkflowEvent.EventType.CLARIFICATION_REQUESTED, request.user,
+            message=message
+        )
         
         # Send notification
-        send_clarification_request.delay(str(purchase_request.id), message)
+        enqueue(send_clarification_request, str(purchase_request.id), message)
         
         return Response({
             'message': 'Clarification requested successfully',
@@ -342,7 +764,12 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         
         purchase_request.receipt_file = saved_path
         purchase_request.receipt_submitted = True
-        purchase_request.save()
+        with transaction.atomic():
+            purchase_request.save()
+            record_event(
+                purchase_request, WorkflowEvent.EventType.RECEIPT_UPLOADED, request.user,
+                file=saved_path
+            )
         
         # Start validation process
         from apps.documents.tasks import process_receipt_validation
@@ -368,20 +795,27 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Invalid payment status'}, 
                         status=status.HTTP_400_BAD_REQUEST)
         
+        previous_payment_status = purchase_request.payment_status
         purchase_request.payment_status = payment_status
         
         # Handle payment proof upload
+        saved_path = None
         if 'payment_proof' in request.FILES:
             proof_file = request.FILES['payment_proof']
             file_path = f'payment_proofs/{purchase_request.id}/{proof_file.name}'
             saved_path = default_storage.save(file_path, proof_file)
             purchase_request.payment_proof = saved_path
         
-        purchase_request.save()
-        
-        # Send receipt reminder if paid
-        if payment_status == PurchaseRequest.PaymentStatus.PAID and purchase_request.receipt_required:
-            send_receipt_reminder.delay(str(purchase_request.id))
+        with transaction.atomic():
+            purchase_request.save()
+            record_event(
+                purchase_request, WorkflowEvent.EventType.PAYMENT_UPDATED, request.user,
+                previous_payment_status=previous_payment_status, payment_proof=saved_path
+            )
+            
+            # Send receipt reminder if paid
+            if payment_status == PurchaseRequest.PaymentStatus.PAID and purchase_request.receipt_required:
+                enqueue(send_receipt_reminder, str(purchase_request.id))
         
         return Response({
             'message': 'Payment status updated successfully',
@@ -389,6 +823,7 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         })
 
     @action(detail=True, methods=['post'])
+    @transaction.atomic
     def respond_to_clarification(self, request, pk=None):
         """Staff responds to clarification request"""
         purchase_request = self.get_object()
@@ -411,6 +846,10 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         purchase_request.clarification_requested = False
         purchase_request.status = PurchaseRequest.Status.PENDING
         purchase_request.save()
+        record_event(
+            purchase_request, WorkflowEvent.EventType.CLARIFICATION_RESPONDED, request.user,
+            response=response_message
+        )
         
         return Response({
             'message': 'Response submitted successfully',
@@ -0,0 +1,34 @@
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+async def authenticate_async(request):
+    """
+    Resolve the JWT bearer token on a plain Django request for the async views,
+    which run outside DRF. Returns the user, or None when the token is missing or invalid.
+    """
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def async_read_view(view):
+    """Wrap an async view as a GET-only, JWT-authenticated endpoint; the view receives (request, user, ...)"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ['GET', 'HEAD']:
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        user = await authenticate_async(request)
+        if user is None:
+            return JsonResponse(
+                {'detail': 'Authentication credentials were not provided.'},
+                status=401,
+                headers={'WWW-Authenticate': 'Bearer realm="api"'}
+            )
+        return await view(request, user, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,8 @@
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+from django.core.asgi import get_asgi_application
+
+# Importing the backend package runs backend.celery, which already defaults
+# DJANGO_SETTINGS_MODULE to production; ASGI deployments set backend.settings.asgi
+# explicitly (see the web-async service) to drop the sync-only WhiteNoise middleware.
+# Only STATIC_URL paths go through the (threaded) static file view; the API stays fully async.
+application = ASGIStaticFilesHandler(get_asgi_application())
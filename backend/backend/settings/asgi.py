@@ -0,0 +1,8 @@
+from .production import *
+
+# WhiteNoise's middleware is sync-only: under ASGI Django would adapt every request
+# through a thread to run it. backend.asgi serves static files itself instead.
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware != 'whitenoise.middleware.WhiteNoiseMiddleware'
+]
@@ -78,6 +78,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
 
 # REST Framework
 REST_FRAMEWORK = {
@@ -120,6 +121,45 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom user model
 AUTH_USER_MODEL = 'users.User'
 
+# Cache (per-process memory by default, Redis in production)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Detail response cache entries are keyed on object version, so this only bounds memory
+RESPONSE_CACHE_TIMEOUT = env.int('RESPONSE_CACHE_TIMEOUT', default=3600)
+
+# Approval SLA: hours a pending request may sit at a level before its approvers are chased
+APPROVAL_SLA_HOURS = {
+    1: env.int('APPROVAL_SLA_HOURS_LEVEL_1', default=48),
+    2: env.int('APPROVAL_SLA_HOURS_LEVEL_2', default=72),
+}
+# One escalation run reads at most ESCALATION_MAX_BATCHES * ESCALATION_BATCH_SIZE requests per level
+ESCALATION_BATCH_SIZE = env.int('ESCALATION_BATCH_SIZE', default=500)
+ESCALATION_MAX_BATCHES = env.int('ESCALATION_MAX_BATCHES', default=20)
+
+# Approver pools: approvers claim leased batches from their level's queue instead of sharing one list
+APPROVAL_POOL_MODE = env.bool('APPROVAL_POOL_MODE', default=False)
+APPROVAL_CLAIM_LEASE_SECONDS = env.int('APPROVAL_CLAIM_LEASE_SECONDS', default=15 * 60)
+
+# Periodic tasks, run by `celery -A backend beat`
+CELERY_BEAT_SCHEDULE = {
+    'escalate-stale-approvals': {
+        'task': 'apps.approvals.tasks.escalate_stale_approvals',
+        'schedule': 15 * 60,
+    },
+}
+
+# Document extraction starts its own process pools (PDF_WORKERS, OCR_WORKERS), which the
+# daemonic children of Celery's prefork pool may not do. It runs on the documents queue,
+# served by a worker with `--pool threads` (see the celery-documents compose service).
+CELERY_TASK_ROUTES = {
+    'apps.documents.tasks.process_proforma_document': {'queue': 'documents'},
+    'apps.documents.tasks.process_receipt_validation': {'queue': 'documents'},
+}
+
 # Google AI Configuration  
 GOOGLE_API_KEY = env('GOOGLE_API_KEY', default='')
 
@@ -128,6 +168,26 @@ DOCUMENT_PROCESSING = {
     'MAX_FILE_SIZE': 10 * 1024 * 1024,  # 10MB
     'ALLOWED_TYPES': ['application/pdf', 'image/jpeg', 'image/png', 'image/tiff'],
     'TESSERACT_CMD': env('TESSERACT_CMD', default='/usr/bin/tesseract'),  # For Docker
+    # Long PDFs are split into page chunks extracted by a pool of PDF_WORKERS processes
+    'PDF_WORKERS': env.int('PDF_WORKERS', default=4),
+    'PDF_PAGES_PER_CHUNK': env.int('PDF_PAGES_PER_CHUNK', default=25),
+    'PDF_PARALLEL_MIN_PAGES': env.int('PDF_PARALLEL_MIN_PAGES', default=50),
+    # Extraction budgets: pages read from one PDF, and characters kept for raw_text and the AI prompt
+    'PDF_MAX_PAGES': env.int('PDF_MAX_PAGES', default=200),
+    'MAX_TEXT_CHARS': env.int('MAX_TEXT_CHARS', default=200_000),
+    # Scanned pages are rasterized at OCR_DPI and OCRed by OCR_WORKERS processes,
+    # each running tesseract with OCR_THREADS_PER_PROCESS OpenMP threads
+    'OCR_DPI': env.int('OCR_DPI', default=300),
+    'OCR_WORKERS': env.int('OCR_WORKERS', default=2),
+    'OCR_THREADS_PER_PROCESS': env.int('OCR_THREADS_PER_PROCESS', default=1),
+    # Uploaded images are downsampled to OCR_IMAGE_DPI and OCR_IMAGE_MAX_PIXELS, cropped
+    # to their margins and binarized before OCR. Orientation detection needs osd.traineddata.
+    'OCR_PREPROCESS': env.bool('OCR_PREPROCESS', default=True),
+    'OCR_IMAGE_DPI': env.int('OCR_IMAGE_DPI', default=300),
+    'OCR_IMAGE_MAX_PIXELS': env.int('OCR_IMAGE_MAX_PIXELS', default=4_000_000),
+    'OCR_BINARIZE': env.bool('OCR_BINARIZE', default=True),
+    'OCR_CROP_MARGINS': env.bool('OCR_CROP_MARGINS', default=True),
+    'OCR_DETECT_ORIENTATION': env.bool('OCR_DETECT_ORIENTATION', default=False),
 }
 
 # File Upload Settings
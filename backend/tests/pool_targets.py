@@ -0,0 +1,9 @@
+"""
+Stand-ins for the functions the document process pools run. Fork-server children
+unpickle them by module without setting Django up, so nothing here imports models.
+"""
+
+
+def scanned_page_text(path, index, dpi, threads):
+    """Stand-in for ocr_pdf_page"""
+    return f'Scanned page {index + 1} at {dpi}', 1
@@ -1,11 +1,31 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock
+import uuid
+from datetime import timedelta
+from django.core import mail
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.db import connection
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.contrib.auth import get_user_model
-from rest_framework.test import APITestCase
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
 from django.urls import reverse
-from apps.requests.models import PurchaseRequest
-from apps.approvals.models import Approval
-from apps.po.models import PurchaseOrder
+from django.utils import timezone
+from apps.requests.models import PurchaseRequest, RequestItem, WorkflowEvent
+from apps.approvals.models import Approval, ApprovalInboxEntry, ApprovalPolicy, EscalationCheckpoint
+from apps.approvals.escalation import escalate_stale_requests
+from apps.approvals.policy import (
+    CompiledApprovalPolicy, DEFAULT_LEVELS, GENERATION_CACHE_KEY, RECHECK_SECONDS,
+    get_approval_policy, invalidate_approval_policy
+)
+from apps.approvals.inbox import find_inbox_inconsistencies
+from apps.approvals.pool import claim_requests
+from apps.po.models import PurchaseOrder, PurchaseOrderSequence
+from apps.documents.models import ProformaMetadata
+from apps.notifications.models import OutboxMessage
+from apps.notifications.tasks import send_bulk_approval_notifications, send_escalation_digest
 from decimal import Decimal
 
 User = get_user_model()
@@ -97,6 +117,52 @@ class ApprovalWorkflowTest(TestCase):
         
         self.assertTrue(PurchaseOrder.objects.filter(request=self.request).exists())
 
+    def test_annotated_approval_state(self):
+        """Test list annotation provides approval state without extra queries"""
+        Approval.objects.create(
+            request=self.request,
+            approver=self.approver_l1,
+            level=1,
+            action='approved'
+        )
+        
+        annotated = PurchaseRequest.objects.with_approval_state().get(pk=self.request.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(annotated.next_approval_level, 2)
+            self.assertFalse(annotated.is_fully_approved)
+
+        Approval.objects.create(
+            request=self.request,
+            approver=self.approver_l2,
+            level=2,
+            action='approved'
+        )
+        
+        annotated = PurchaseRequest.objects.with_approval_state().get(pk=self.request.pk)
+        with self.assertNumQueries(0):
+            self.assertIsNone(annotated.next_approval_level)
+            self.assertTrue(annotated.is_fully_approved)
+
+    def test_annotated_approval_state_without_approvals(self):
+        """Test annotation handles requests nobody has approved yet"""
+        annotated = PurchaseRequest.objects.with_approval_state().get(pk=self.request.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(annotated.next_approval_level, 1)
+            self.assertFalse(annotated.is_fully_approved)
+
+    def test_prefetched_approval_state(self):
+        """Test prefetched approvals are reused for approval state"""
+        Approval.objects.create(
+            request=self.request,
+            approver=self.approver_l1,
+            level=1,
+            action='approved'
+        )
+        
+        prefetched = PurchaseRequest.objects.with_details().get(pk=self.request.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(prefetched.approval_state(), (False, 2))
+
     def test_rejection_locks_request(self):
         """Test that rejection locks the request"""
         self.request.status = 'rejected'
@@ -276,3 +342,817 @@ class PermissionTest(APITestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
+
+class ApprovalInboxTest(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.approver_l2 = User.objects.create_user(
+            username='approver2',
+            password='testpass123',
+            role='approver_level_2',
+            approver_level=2
+        )
+        
+        self.request = PurchaseRequest.objects.create(
+            title='Test Request',
+            description='Test Description',
+            total_amount=Decimal('1000.00'),
+            created_by=self.staff_user
+        )
+
+    def _entry(self):
+        return ApprovalInboxEntry.objects.filter(request=self.request).first()
+
+    def test_creation_adds_entry(self):
+        entry = self._entry()
+        self.assertEqual(entry.level, 1)
+        self.assertEqual(entry.title, 'Test Request')
+        self.assertEqual(entry.total_amount, Decimal('1000.00'))
+        self.assertEqual(entry.created_at, self.request.created_at)
+
+    def test_entry_follows_approval_workflow(self):
+        self.client.force_authenticate(user=self.approver_l1)
+        self.client.patch(reverse('purchaserequest-approve', kwargs={'pk': self.request.pk}), {}, format='json')
+        self.assertEqual(self._entry().level, 2)
+        
+        self.client.force_authenticate(user=self.approver_l2)
+        self.client.patch(reverse('purchaserequest-approve', kwargs={'pk': self.request.pk}), {}, format='json')
+        self.assertIsNone(self._entry())
+
+    def test_rejection_removes_entry(self):
+        self.client.force_authenticate(user=self.approver_l1)
+        self.client.patch(reverse('purchaserequest-reject', kwargs={'pk': self.request.pk}), {}, format='json')
+        self.assertIsNone(self._entry())
+
+    def test_clarification_round_trip(self):
+        self.client.force_authenticate(user=self.approver_l1)
+        response = self.client.post(
+            reverse('purchaserequest-request-clarification', kwargs={'pk': self.request.pk}),
+            {'message': 'Which vendor?'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(self._entry())
+        
+        self.client.force_authenticate(user=self.staff_user)
+        response = self.client.post(
+            reverse('purchaserequest-respond-to-clarification', kwargs={'pk': self.request.pk}),
+            {'response': 'ACME'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._entry().level, 1)
+
+    def test_approver_list_reads_inbox(self):
+        self.client.force_authenticate(user=self.approver_l1)
+        response = self.client.get(reverse('purchaserequest-list'))
+        self.assertEqual([row['id'] for row in response.data['results']], [str(self.request.id)])
+        
+        ApprovalInboxEntry.objects.all().delete()
+        response = self.client.get(reverse('purchaserequest-list'))
+        self.assertEqual(response.data['results'], [])
+
+    def test_approver_list_pages_in_inbox_order(self):
+        for i in range(4):
+            PurchaseRequest.objects.create(
+                title=f'Queued {i}', description='Queued', total_amount=Decimal('1000.00'), created_by=self.staff_user
+            )
+        expected = [
+            str(request_id) for request_id in ApprovalInboxEntry.objects.filter(level=1).order_by(
+                '-created_at', 'request_id'
+            ).values_list('request_id', flat=True)
+        ]
+        
+        self.client.force_authenticate(user=self.approver_l1)
+        seen, url = [], reverse('purchaserequest-list') + '?page_size=2'
+        while url:
+            response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, expected)
+
+    def test_rebuild_and_check_commands(self):
+        ApprovalInboxEntry.objects.all().delete()
+        PurchaseRequest.objects.filter(pk=self.request.pk).update(title='Renamed')
+        self.assertEqual(find_inbox_inconsistencies(), [
+            {'request_id': str(self.request.id), 'problem': 'missing'}
+        ])
+        with self.assertRaises(CommandError):
+            call_command('rebuild_approval_inbox', '--check', stdout=StringIO())
+        
+        call_command('rebuild_approval_inbox', stdout=StringIO())
+        self.assertEqual(self._entry().title, 'Renamed')
+        self.assertEqual(find_inbox_inconsistencies(), [])
+        
+        ApprovalInboxEntry.objects.filter(request=self.request).update(level=2)
+        problems = find_inbox_inconsistencies()
+        self.assertEqual(problems[0]['problem'], 'stale')
+        self.assertEqual(problems[0]['field'], 'level')
+
+class BulkApprovalTest(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff',
+            email='staff@example.com'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.approver_l2 = User.objects.create_user(
+            username='approver2',
+            password='testpass123',
+            role='approver_level_2',
+            approver_level=2
+        )
+        self.requests = [
+            PurchaseRequest.objects.create(
+                title=f'Request {i}',
+                description='Description',
+                total_amount=Decimal('100.00'),
+                created_by=self.staff_user
+            )
+            for i in range(3)
+        ]
+
+    def _bulk(self, user, name, ids, **data):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(
+            reverse(f'purchaserequest-{name}'),
+            {'ids': [str(pk) for pk in ids], **data},
+            format='json'
+        )
+        return response, OutboxMessage.objects.filter(task_name=send_bulk_approval_notifications.name)
+
+    def test_staff_cannot_bulk_approve(self):
+        response, _ = self._bulk(self.staff_user, 'bulk-approve', [self.requests[0].pk])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_empty_batch_is_rejected(self):
+        response, _ = self._bulk(self.approver_l1, 'bulk-approve', [])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_approve_moves_batch_to_next_level(self):
+        ids = [purchase_request.pk for purchase_request in self.requests]
+        response, messages = self._bulk(self.approver_l1, 'bulk-approve', ids, comment='Batch')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['processed'], 3)
+        self.assertEqual(Approval.objects.filter(approver=self.approver_l1, level=1, comment='Batch').count(), 3)
+        self.assertEqual(
+            set(PurchaseRequest.objects.values_list('current_approval_level', flat=True)), {2}
+        )
+        self.assertEqual(messages.count(), 1)
+        self.assertEqual(len(messages.get().args[0]), 3)
+
+    def test_final_level_creates_purchase_orders(self):
+        ids = [purchase_request.pk for purchase_request in self.requests[:2]]
+        self._bulk(self.approver_l1, 'bulk-approve', ids)
+        response, _ = self._bulk(self.approver_l2, 'bulk-approve', ids)
+        
+        self.assertEqual(response.data['processed'], 2)
+        self.assertEqual(
+            set(PurchaseRequest.objects.filter(pk__in=ids).values_list('status', flat=True)), {'approved'}
+        )
+        self.assertEqual(PurchaseOrder.objects.filter(request_id__in=ids).count(), 2)
+
+    def test_per_id_outcomes(self):
+        rejected = self.requests[0]
+        self._bulk(self.approver_l1, 'bulk-reject', [rejected.pk])
+        unknown = uuid.uuid4()
+        
+        response, _ = self._bulk(
+            self.approver_l2, 'bulk-approve', [rejected.pk, self.requests[1].pk, unknown]
+        )
+        results = response.data['results']
+        
+        self.assertEqual(response.data['processed'], 0)
+        self.assertEqual(response.data['failed'], 3)
+        self.assertEqual(results[0]['error'], 'Request is already approved or rejected')
+        self.assertEqual(results[1]['error'], 'Request is not at approval level 2')
+        self.assertEqual(results[2]['error'], 'Request not found')
+
+    def test_bulk_reject_removes_inbox_entries(self):
+        ids = [purchase_request.pk for purchase_request in self.requests]
+        response, _ = self._bulk(self.approver_l1, 'bulk-reject', ids)
+        
+        self.assertEqual(response.data['processed'], 3)
+        self.assertFalse(ApprovalInboxEntry.objects.exists())
+        self.assertEqual(
+            set(PurchaseRequest.objects.values_list('status', flat=True)), {'rejected'}
+        )
+
+    def test_batch_notification_sends_one_mail_per_requester(self):
+        from django.core import mail
+        from apps.notifications.tasks import send_bulk_approval_notifications
+        
+        send_bulk_approval_notifications(
+            [[str(purchase_request.pk), 'rejected'] for purchase_request in self.requests],
+            'approver1'
+        )
+        self.assertEqual(len(mail.outbox), 3)
+
+class ApprovalQueryBudgetTest(APITestCase):
+    """
+    One approval costs a fixed number of queries whatever the request holds.
+    Counts include the SAVEPOINT/RELEASE pair of the view's transaction and
+    the outbox inserts that replace broker calls and the workflow event insert.
+    The two constants below are the reference figures for the budget.
+    """
+    INTERMEDIATE_APPROVAL_QUERIES = 9
+    FINAL_APPROVAL_QUERIES = 15
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.approver_l2 = User.objects.create_user(
+            username='approver2',
+            password='testpass123',
+            role='approver_level_2',
+            approver_level=2
+        )
+
+    def _create_request(self, item_count):
+        request = PurchaseRequest.objects.create(
+            title='Test Request',
+            description='Test Description',
+            total_amount=Decimal('1000.00'),
+            created_by=self.staff_user
+        )
+        for i in range(item_count):
+            RequestItem.objects.create(
+                request=request,
+                description=f'Item {i}',
+                quantity=1,
+                unit_price=Decimal('10.00')
+            )
+        ProformaMetadata.objects.create(request=request, vendor_name='ACME')
+        return request
+
+    def _approve(self, user, request, queries):
+        self.client.force_authenticate(user=user)
+        # Compile the approval policy outside the measured block; it is loaded once per process
+        get_approval_policy()
+        url = reverse('purchaserequest-approve', kwargs={'pk': request.pk})
+        with self.assertNumQueries(queries):
+            response = self.client.patch(url, {'comment': 'OK'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_approval_path_query_count(self):
+        # Steady state: the year's PO counter row already exists
+        PurchaseOrderSequence.objects.create(year=timezone.now().year)
+        for item_count in [1, 10]:
+            request = self._create_request(item_count)
+            self._approve(self.approver_l1, request, self.INTERMEDIATE_APPROVAL_QUERIES)
+            response = self._approve(self.approver_l2, request, self.FINAL_APPROVAL_QUERIES)
+            
+            self.assertEqual(response.data['request_status'], 'approved')
+            purchase_order = PurchaseOrder.objects.get(request=request)
+            self.assertEqual(purchase_order.vendor_name, 'ACME')
+            self.assertEqual(len(purchase_order.items), item_count)
+
+    def test_rejection_query_count(self):
+        request = self._create_request(3)
+        get_approval_policy()
+        self.client.force_authenticate(user=self.approver_l1)
+        url = reverse('purchaserequest-reject', kwargs={'pk': request.pk})
+        with self.assertNumQueries(self.INTERMEDIATE_APPROVAL_QUERIES):
+            response = self.client.patch(url, {}, format='json')
+        self.assertEqual(response.data['request_status'], 'rejected')
+
+    def test_save_writes_only_workflow_fields(self):
+        request = self._create_request(1)
+        # A concurrent edit to another column must survive the approval's UPDATE
+        PurchaseRequest.objects.filter(pk=request.pk).update(description='Edited elsewhere')
+        self._approve(self.approver_l1, request, self.INTERMEDIATE_APPROVAL_QUERIES)
+        request.refresh_from_db()
+        self.assertEqual(request.description, 'Edited elsewhere')
+        self.assertEqual(request.current_approval_level, 2)
+
+class ApprovalPolicyTest(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.approver_l2 = User.objects.create_user(
+            username='approver2',
+            password='testpass123',
+            role='approver_level_2',
+            approver_level=2
+        )
+        # Test rollbacks fire no delete signals, so never leak a compiled policy into other tests
+        self.addCleanup(invalidate_approval_policy)
+        with self.captureOnCommitCallbacks(execute=True):
+            ApprovalPolicy.objects.create(min_amount=Decimal('0.00'), required_levels=[1])
+            ApprovalPolicy.objects.create(min_amount=Decimal('1000.00'), required_levels=[1, 2])
+            ApprovalPolicy.objects.create(min_amount=Decimal('50000.00'), required_levels=[2])
+
+    def _create_request(self, amount):
+        self.client.force_authenticate(user=self.staff_user)
+        response = self.client.post(reverse('purchaserequest-list'), {
+            'title': 'Test Request',
+            'description': 'Test Description',
+            'total_amount': str(amount)
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return PurchaseRequest.objects.get(pk=response.data['id'])
+
+    def test_thresholds_route_by_interval(self):
+        policy = get_approval_policy()
+        self.assertEqual(policy.levels_for(Decimal('20.00')), (1,))
+        self.assertEqual(policy.levels_for(Decimal('999.99')), (1,))
+        self.assertEqual(policy.levels_for(Decimal('1000.00')), (1, 2))
+        self.assertEqual(policy.levels_for(Decimal('75000.00')), (2,))
+
+    def test_amounts_below_every_threshold_use_default_chain(self):
+        policy = CompiledApprovalPolicy([(Decimal('100.00'), [1])])
+        self.assertEqual(policy.levels_for(Decimal('5.00')), DEFAULT_LEVELS)
+        self.assertEqual(CompiledApprovalPolicy([]).levels_for(Decimal('5.00')), DEFAULT_LEVELS)
+
+    def test_routing_costs_no_queries_once_compiled(self):
+        policy = get_approval_policy()
+        with self.assertNumQueries(0):
+            for amount in range(0, 100000, 250):
+                policy.levels_for(Decimal(amount))
+
+    def test_small_request_skips_level_two(self):
+        request = self._create_request('20.00')
+        self.client.force_authenticate(user=self.approver_l1)
+        response = self.client.patch(
+            reverse('purchaserequest-approve', kwargs={'pk': request.pk}), {}, format='json'
+        )
+        
+        self.assertEqual(response.data['request_status'], 'approved')
+        self.assertTrue(PurchaseOrder.objects.filter(request=request).exists())
+        self.assertIsNone(ApprovalInboxEntry.objects.filter(request=request).first())
+
+    def test_large_request_starts_at_first_required_level(self):
+        request = self._create_request('75000.00')
+        self.assertEqual(request.current_approval_level, 2)
+        self.assertEqual(ApprovalInboxEntry.objects.get(request=request).level, 2)
+
+    def test_amount_change_reroutes_pending_request(self):
+        request = self._create_request('75000.00')
+        response = self.client.patch(
+            reverse('purchaserequest-detail', kwargs={'pk': request.pk}),
+            {'total_amount': '20.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        request.refresh_from_db()
+        self.assertEqual(request.current_approval_level, 1)
+
+    def test_amount_change_covered_by_approved_levels_finishes_request(self):
+        request = self._create_request('1000.00')
+        self.client.force_authenticate(user=self.approver_l1)
+        self.client.patch(reverse('purchaserequest-approve', kwargs={'pk': request.pk}), {}, format='json')
+
+        self.client.force_authenticate(user=self.staff_user)
+        with self.captureOnCommitCallbacks():
+            response = self.client.patch(
+                reverse('purchaserequest-detail', kwargs={'pk': request.pk}),
+                {'total_amount': '20.00'}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        request.refresh_from_db()
+        self.assertEqual(request.status, PurchaseRequest.Status.APPROVED)
+        self.assertEqual(PurchaseOrder.objects.get(request=request).total_amount, Decimal('20.00'))
+        self.assertFalse(ApprovalInboxEntry.objects.filter(request=request).exists())
+        event = request.events.order_by('-created_at', '-id').first()
+        self.assertEqual((event.event_type, event.actor), (WorkflowEvent.EventType.APPROVED, None))
+        self.assertEqual(Approval.objects.filter(request=request).count(), 1)
+
+    def test_list_annotation_matches_instance_routing(self):
+        for amount in ['20.00', '1000.00', '75000.00']:
+            self._create_request(amount)
+        for request in PurchaseRequest.objects.with_approval_state():
+            self.assertEqual(
+                request.required_approval_levels,
+                list(get_approval_policy().levels_for(request.total_amount))
+            )
+
+    def test_policy_change_invalidates_compiled_policy(self):
+        self.assertEqual(get_approval_policy().levels_for(Decimal('20.00')), (1,))
+        with self.captureOnCommitCallbacks(execute=True):
+            ApprovalPolicy.objects.filter(min_amount=Decimal('0.00')).get().delete()
+        self.assertEqual(get_approval_policy().levels_for(Decimal('20.00')), DEFAULT_LEVELS)
+
+    def test_other_process_change_is_picked_up(self):
+        import time
+        from django.core.cache import cache
+        
+        policy = get_approval_policy()
+        # Another process changed the table and moved the shared generation on
+        ApprovalPolicy.objects.filter(min_amount=Decimal('0.00')).update(required_levels=[2])
+        cache.set(GENERATION_CACHE_KEY, cache.get(GENERATION_CACHE_KEY, 0) + 1, timeout=None)
+        
+        # Within the recheck window this process keeps its copy without asking the cache
+        self.assertIs(get_approval_policy(), policy)
+        later = time.monotonic() + RECHECK_SECONDS
+        with mock.patch('apps.approvals.policy.time.monotonic', return_value=later):
+            self.assertEqual(get_approval_policy().levels_for(Decimal('20.00')), (2,))
+
+    def test_invalid_levels_are_rejected(self):
+        from django.core.exceptions import ValidationError
+        
+        for levels in [[], [3], 'one']:
+            with self.assertRaises(ValidationError):
+                ApprovalPolicy(min_amount=Decimal('10.00'), required_levels=levels).full_clean()
+
+
+class OptimisticApprovalTest(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.approver_l2 = User.objects.create_user(
+            username='approver2',
+            password='testpass123',
+            role='approver_level_2',
+            approver_level=2
+        )
+        self.request = PurchaseRequest.objects.create(
+            title='Test Request',
+            description='Test Description',
+            total_amount=Decimal('1000.00'),
+            created_by=self.staff_user
+        )
+
+    def _etag(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse('purchaserequest-detail', kwargs={'pk': self.request.pk}))
+        return response['ETag']
+
+    def _approve(self, user, if_match):
+        self.client.force_authenticate(user=user)
+        return self.client.patch(
+            reverse('purchaserequest-approve', kwargs={'pk': self.request.pk}),
+            {}, format='json', HTTP_IF_MATCH=if_match
+        )
+
+    def test_matching_version_applies_transition(self):
+        etag = self._etag(self.approver_l1)
+        response = self._approve(self.approver_l1, etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.current_approval_level, 2)
+        self.assertEqual(response['ETag'], f'"{self.request.pk}-{self.request.version}"')
+        self.assertEqual(ApprovalInboxEntry.objects.get(request=self.request).level, 2)
+
+    def test_final_approval_with_if_match(self):
+        self._approve(self.approver_l1, self._etag(self.approver_l1))
+        response = self._approve(self.approver_l2, self._etag(self.approver_l2))
+        
+        self.assertEqual(response.data['request_status'], 'approved')
+        self.assertTrue(PurchaseOrder.objects.filter(request=self.request).exists())
+        self.assertFalse(ApprovalInboxEntry.objects.filter(request=self.request).exists())
+        self.request.refresh_from_db()
+        self.assertEqual(response['ETag'], f'"{self.request.pk}-{self.request.version}"')
+
+    def test_stale_version_is_rejected(self):
+        etag = self._etag(self.approver_l1)
+        PurchaseRequest.objects.filter(pk=self.request.pk).bump_version()
+        
+        response = self._approve(self.approver_l1, etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertFalse(Approval.objects.exists())
+
+    def test_write_between_read_and_update_is_rejected(self):
+        etag = self._etag(self.approver_l1)
+        original = PurchaseRequest.approval_state
+        
+        def concurrent_write(purchase_request, *args, **kwargs):
+            # Another approver's transition commits after this request was read
+            PurchaseRequest.objects.filter(pk=purchase_request.pk).bump_version()
+            return original(purchase_request, *args, **kwargs)
+        
+        with mock.patch.object(PurchaseRequest, 'approval_state', concurrent_write):
+            response = self._approve(self.approver_l1, etag)
+        
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertFalse(Approval.objects.exists())
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.current_approval_level, 1)
+
+    def test_weak_or_foreign_etags_never_match(self):
+        etag = self._etag(self.approver_l1)
+        for if_match in [f'W/{etag}', '"someone-else-1"', 'garbage']:
+            response = self._approve(self.approver_l1, if_match)
+            self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_wildcard_uses_locking_path(self):
+        response = self._approve(self.approver_l1, '*')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.current_approval_level, 2)
+
+
+@override_settings(APPROVAL_SLA_HOURS={1: 48, 2: 72})
+class EscalationTest(TestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff', password='testpass123', role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1', password='testpass123', role='approver_level_1',
+            approver_level=1, email='approver1@example.com'
+        )
+        self.other_approver_l1 = User.objects.create_user(
+            username='approver1b', password='testpass123', role='approver_level_1',
+            approver_level=1, email='approver1b@example.com'
+        )
+        self.now = timezone.now()
+
+    def _request(self, title, hours_idle, level=1, status='pending'):
+        purchase_request = PurchaseRequest.objects.create(
+            title=title,
+            description='Test',
+            total_amount=Decimal('100.00'),
+            created_by=self.staff_user,
+            current_approval_level=level,
+            status=status
+        )
+        # update() leaves updated_at alone, unlike save()
+        PurchaseRequest.objects.filter(pk=purchase_request.pk).update(
+            updated_at=self.now - timedelta(hours=hours_idle)
+        )
+        return purchase_request
+
+    def _digests(self):
+        return OutboxMessage.objects.filter(task_name=send_escalation_digest.name).order_by('id')
+
+    def test_escalates_only_requests_past_their_level_sla(self):
+        stale = self._request('Stale', hours_idle=50)
+        self._request('Fresh', hours_idle=10)
+        self._request('Level 2 within SLA', hours_idle=50, level=2)
+        self._request('Settled', hours_idle=500, status='approved')
+
+        escalated = escalate_stale_requests(now=self.now)
+
+        self.assertEqual(escalated, {1: 1, 2: 0})
+        digest = self._digests().get()
+        self.assertEqual(digest.args, [1, [str(stale.id)]])
+        event = WorkflowEvent.objects.get(event_type=WorkflowEvent.EventType.ESCALATED)
+        self.assertEqual(event.request, stale)
+        self.assertEqual(event.payload['sla_hours'], 48)
+
+    def test_does_not_escalate_the_same_request_twice(self):
+        self._request('Stale', hours_idle=50)
+        escalate_stale_requests(now=self.now)
+
+        self.assertEqual(escalate_stale_requests(now=self.now + timedelta(hours=1)), {1: 0, 2: 0})
+        self.assertEqual(self._digests().count(), 1)
+
+    def test_request_touched_after_escalation_is_escalated_again_once_stale(self):
+        purchase_request = self._request('Stale', hours_idle=50)
+        escalate_stale_requests(now=self.now)
+
+        PurchaseRequest.objects.filter(pk=purchase_request.pk).update(updated_at=self.now)
+        self.assertEqual(escalate_stale_requests(now=self.now + timedelta(hours=49))[1], 1)
+        self.assertEqual(self._digests().count(), 2)
+
+    def test_walks_the_backlog_in_bounded_batches_across_runs(self):
+        stale = [self._request(f'Stale {i}', hours_idle=100 + i) for i in range(5)]
+
+        self.assertEqual(escalate_stale_requests(now=self.now, batch_size=2, max_batches=2)[1], 4)
+        self.assertEqual(escalate_stale_requests(now=self.now, batch_size=2, max_batches=2)[1], 1)
+
+        # One digest per level and run, however many batches the run took
+        batches = [message.args[1] for message in self._digests()]
+        self.assertEqual([len(batch) for batch in batches], [4, 1])
+        # Oldest first, each request exactly once
+        self.assertEqual(sum(batches, []), [str(request.id) for request in reversed(stale)])
+        checkpoint = EscalationCheckpoint.objects.get(level=1)
+        self.assertEqual(checkpoint.last_request_id, stale[0].id)
+
+    def test_digest_sends_one_email_per_approver(self):
+        first = self._request('Laptop', hours_idle=50)
+        second = self._request('Monitor', hours_idle=60)
+
+        send_escalation_digest(1, [str(first.id), str(second.id)])
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            ['approver1@example.com', 'approver1b@example.com']
+        )
+        self.assertIn('Laptop', mail.outbox[0].body)
+        self.assertIn('Monitor', mail.outbox[0].body)
+
+    def test_digest_skips_requests_that_moved_on(self):
+        purchase_request = self._request('Laptop', hours_idle=50)
+        PurchaseRequest.objects.filter(pk=purchase_request.pk).update(status='approved')
+
+        send_escalation_digest(1, [str(purchase_request.id)])
+
+        self.assertEqual(mail.outbox, [])
+
+
+@override_settings(APPROVAL_POOL_MODE=True, APPROVAL_CLAIM_LEASE_SECONDS=600)
+class ApproverPoolTest(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff', password='testpass123', role='staff'
+        )
+        self.approver_a = User.objects.create_user(
+            username='approver1a', password='testpass123', role='approver_level_1', approver_level=1
+        )
+        self.approver_b = User.objects.create_user(
+            username='approver1b', password='testpass123', role='approver_level_1', approver_level=1
+        )
+        self.requests = [
+            PurchaseRequest.objects.create(
+                title=f'Request {i}',
+                description='Test',
+                total_amount=Decimal('1000.00'),
+                created_by=self.staff_user,
+                current_approval_level=1
+            )
+            for i in range(6)
+        ]
+
+    def _claim(self, user, count):
+        self.client.force_authenticate(user=user)
+        response = self.client.post(reverse('purchaserequest-claim'), {'count': count}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['id'] for row in response.data['results']]
+
+    def _approve(self, user, purchase_request):
+        self.client.force_authenticate(user=user)
+        return self.client.patch(
+            reverse('purchaserequest-approve', kwargs={'pk': purchase_request.pk}), {}, format='json'
+        )
+
+    def test_approvers_claim_disjoint_batches_oldest_first(self):
+        first = self._claim(self.approver_a, 2)
+        second = self._claim(self.approver_b, 2)
+
+        self.assertEqual(first, [str(r.id) for r in self.requests[:2]])
+        self.assertEqual(second, [str(r.id) for r in self.requests[2:4]])
+
+    def test_claim_renews_held_requests_and_tops_up(self):
+        first = self._claim(self.approver_a, 2)
+        again = self._claim(self.approver_a, 3)
+
+        self.assertEqual(again[:2], first)
+        self.assertEqual(len(again), 3)
+
+    def test_expired_claims_return_to_the_pool(self):
+        claim_requests(self.approver_a, 1, 6, now=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(len(self._claim(self.approver_b, 6)), 6)
+
+    def test_list_shows_only_own_claims(self):
+        claimed = self._claim(self.approver_a, 2)
+
+        response = self.client.get(reverse('purchaserequest-list'))
+        self.assertEqual(sorted(row['id'] for row in response.data['results']), sorted(claimed))
+
+    def test_cannot_approve_request_claimed_by_another_approver(self):
+        self._claim(self.approver_a, 1)
+
+        response = self._approve(self.approver_b, self.requests[0])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        response = self._approve(self.approver_a, self.requests[0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_approve_reports_requests_claimed_by_another_approver(self):
+        self._claim(self.approver_a, 1)
+
+        self.client.force_authenticate(user=self.approver_b)
+        response = self.client.post(
+            reverse('purchaserequest-bulk-approve'),
+            {'ids': [str(self.requests[0].id), str(self.requests[1].id)]},
+            format='json'
+        )
+        self.assertEqual(response.data['processed'], 1)
+        self.assertEqual(response.data['results'][0]['error'], 'Request is claimed by another approver')
+
+    def test_moving_to_the_next_level_drops_the_claim(self):
+        self._claim(self.approver_a, 1)
+        self._approve(self.approver_a, self.requests[0])
+
+        entry = ApprovalInboxEntry.objects.get(request=self.requests[0])
+        self.assertEqual(entry.level, 2)
+        self.assertIsNone(entry.claimed_by)
+        self.assertIsNone(entry.claim_expires_at)
+
+    def test_release_hands_claims_back(self):
+        self._claim(self.approver_a, 3)
+
+        response = self.client.post(reverse('purchaserequest-release'), {}, format='json')
+        self.assertEqual(response.data['released'], 3)
+        self.assertEqual(len(self._claim(self.approver_b, 6)), 6)
+
+    @override_settings(APPROVAL_POOL_MODE=False)
+    def test_claim_requires_pool_mode(self):
+        self.client.force_authenticate(user=self.approver_a)
+        response = self.client.post(reverse('purchaserequest-claim'), {'count': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_simulation_command_refuses_to_touch_real_pending_requests(self):
+        with self.assertRaises(CommandError):
+            call_command('simulate_approver_pool', '--approvers', '1', stdout=StringIO())
+        self.assertFalse(Approval.objects.exists())
+
+    def test_simulation_command_drains_the_level(self):
+        PurchaseRequest.objects.all().delete()
+        out = StringIO()
+        call_command('simulate_approver_pool', '--approvers', '1', '--requests', '5', stdout=out)
+
+        self.assertIn('shared:\n  5 approvals', out.getvalue())
+        self.assertIn('pool:\n  5 approvals', out.getvalue())
+        self.assertFalse(User.objects.filter(username__startswith='pool-simulation-').exists())
+
+
+@skipUnlessDBFeature('has_select_for_update')
+@override_settings(APPROVAL_POOL_MODE=True)
+class ApproverPoolConcurrencyTest(TransactionTestCase):
+    """Many approvers drain one level at once; claims should leave them nothing to fight over"""
+    REQUEST_COUNT = 200
+    APPROVERS = 16
+    CLAIM_SIZE = 5
+
+    def setUp(self):
+        staff_user = User.objects.create_user(username='staff', role='staff')
+        self.approvers = [
+            User.objects.create_user(username=f'approver{i}', role='approver_level_1', approver_level=1)
+            for i in range(self.APPROVERS)
+        ]
+        for i in range(self.REQUEST_COUNT):
+            PurchaseRequest.objects.create(
+                title=f'Request {i}',
+                description='Description',
+                total_amount=Decimal('1000.00'),
+                created_by=staff_user,
+                current_approval_level=1
+            )
+
+    def _work(self, approver):
+        """Claim and approve until the level is empty; returns (approved ids, non-200 responses)"""
+        approved, conflicts = [], 0
+        try:
+            client = APIClient()
+            client.force_authenticate(user=approver)
+            while True:
+                batch = client.post(
+                    reverse('purchaserequest-claim'), {'count': self.CLAIM_SIZE}, format='json'
+                ).data['results']
+                if not batch:
+                    return approved, conflicts
+                for row in batch:
+                    url = reverse('purchaserequest-approve', kwargs={'pk': row['id']})
+                    if client.patch(url, {}, format='json').status_code == status.HTTP_200_OK:
+                        approved.append(row['id'])
+                    else:
+                        conflicts += 1
+        finally:
+            connection.close()
+
+    def test_concurrent_approvers_work_disjoint_sets(self):
+        with ThreadPoolExecutor(max_workers=self.APPROVERS) as executor:
+            results = list(executor.map(self._work, self.approvers))
+
+        approved = [request_id for ids, _ in results for request_id in ids]
+        self.assertEqual(sum(conflicts for _, conflicts in results), 0)
+        self.assertEqual(len(approved), self.REQUEST_COUNT)
+        self.assertEqual(len(set(approved)), self.REQUEST_COUNT)
+        self.assertEqual(Approval.objects.filter(level=1).count(), self.REQUEST_COUNT)
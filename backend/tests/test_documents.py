@@ -1,6 +1,16 @@
+import hashlib
+from io import StringIO
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+import PyPDF2
+from PIL import Image
 import tempfile
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.conf import settings
+from django.core.management import call_command
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.test import APITestCase
@@ -8,13 +18,34 @@ from rest_framework import status
 from django.urls import reverse
 from unittest.mock import patch, MagicMock
 from apps.requests.models import PurchaseRequest
-from apps.documents.models import ProformaMetadata
-from apps.documents.utils import DocumentProcessor
+from apps.documents.models import ExtractedDocument, ProformaMetadata
+from apps.documents.tasks import process_proforma_document
+from apps.documents.utils import DocumentProcessor, iter_pdf_pages, ocr_pdf_page
+from apps.documents.preprocessing import otsu_threshold, preprocess_for_ocr
+from apps.documents.management.commands.benchmark_image_ocr import build_phone_photo, receipt_lines
+from apps.documents.management.commands.benchmark_pdf_extraction import build_catalogue_pdf, build_text_pdf
 from apps.documents.ai_service import AIExtractionService
+from backend.celery import app as celery_app
+from celery.concurrency.thread import TaskPool as ThreadTaskPool
 from decimal import Decimal
+from .pool_targets import scanned_page_text
 
 User = get_user_model()
 
+
+def run_in_documents_worker(target):
+    """Run target in Celery's threads pool, which the documents queue's worker uses (--pool threads)"""
+    pool = ThreadTaskPool(limit=1)
+    results = []
+    pool.start()
+    try:
+        applied = pool.apply_async(target, callback=results.append)
+        if applied is not None:
+            applied.get()
+    finally:
+        pool.stop()
+    return results[0]
+
 class DocumentProcessorTest(TestCase):
     def test_file_validation_success(self):
         """Test successful file validation"""
@@ -313,3 +344,357 @@ class DocumentProcessingIntegrationTest(APITestCase):
         # Verify file was saved to request
         self.request.refresh_from_db()
         self.assertTrue(self.request.proforma_file)
+
+
+class ExtractionCacheTest(APITestCase):
+    PDF = b'%PDF-1.4\nInvoice from XYZ Corp\nTotal: $200.00'
+    AI_DATA = {
+        'vendor_name': 'XYZ Corp', 'vendor_address': '1 Main St', 'total_amount': 200.0,
+        'currency': 'USD', 'payment_terms': 'Net 30', 'items': [],
+    }
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.staff_user = User.objects.create_user(
+            username='staff', password='testpass123', role='staff'
+        )
+        self.requests = [
+            PurchaseRequest.objects.create(
+                title=f'Request {i}',
+                description='Test Description',
+                total_amount=Decimal('200.00'),
+                created_by=self.staff_user
+            )
+            for i in range(2)
+        ]
+        self.content_hash = hashlib.sha256(self.PDF).hexdigest()
+
+    def _upload(self, purchase_request):
+        self.client.force_authenticate(user=self.staff_user)
+        url = reverse('purchaserequest-upload-proforma', kwargs={'pk': purchase_request.pk})
+        uploaded_file = SimpleUploadedFile('invoice.pdf', self.PDF, content_type='application/pdf')
+        with patch('apps.documents.utils.DocumentProcessor.validate_file') as mock_validate, \
+                patch('apps.documents.tasks.process_proforma_document.delay') as mock_task:
+            mock_validate.return_value = {'valid': True, 'errors': [], 'file_type': 'application/pdf'}
+            mock_task.return_value = MagicMock(id='task-1')
+            response = self.client.post(url, {'file': uploaded_file}, format='multipart')
+        return response, mock_task
+
+    def _process(self, purchase_request, ai_result=None):
+        """Run the task on a stored copy of the PDF, returning (result, extract mock, AI mock)"""
+        path = default_storage.save(f'proformas/{purchase_request.id}/invoice.pdf', ContentFile(self.PDF))
+        ai_result = ai_result or {'success': True, 'data': self.AI_DATA, 'confidence': 1.0, 'raw_response': '{}'}
+        with patch('apps.documents.tasks.DocumentProcessor.extract_text_from_document') as mock_extract, \
+                patch('apps.documents.tasks.AIExtractionService.extract_metadata') as mock_ai:
+            mock_extract.return_value = {'success': True, 'text': 'Invoice from XYZ Corp', 'method': 'pdfplumber'}
+            mock_ai.return_value = ai_result
+            result = process_proforma_document(str(purchase_request.id), path)
+        return result, mock_extract, mock_ai
+
+    def test_upload_passes_the_streamed_sha256_to_the_task(self):
+        response, mock_task = self._upload(self.requests[0])
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(mock_task.call_args.args[2], self.content_hash)
+
+    def test_first_processing_fills_the_cache(self):
+        result, mock_extract, mock_ai = self._process(self.requests[0])
+
+        self.assertFalse(result['cached'])
+        mock_extract.assert_called_once()
+        mock_ai.assert_called_once()
+        extraction = ExtractedDocument.objects.get(sha256=self.content_hash)
+        self.assertEqual(extraction.raw_text, 'Invoice from XYZ Corp')
+        self.assertEqual(extraction.ai_data, self.AI_DATA)
+
+    def test_duplicate_document_skips_extraction_and_ai(self):
+        self._process(self.requests[0])
+
+        result, mock_extract, mock_ai = self._process(self.requests[1])
+        self.assertTrue(result['cached'])
+        mock_extract.assert_not_called()
+        mock_ai.assert_not_called()
+        metadata = ProformaMetadata.objects.get(request=self.requests[1])
+        self.assertEqual(metadata.vendor_name, 'XYZ Corp')
+        self.assertEqual(metadata.extraction_status, ProformaMetadata.ExtractionStatus.SUCCESS)
+        self.assertEqual(ExtractedDocument.objects.get(sha256=self.content_hash).hit_count, 1)
+
+    def test_failed_ai_call_keeps_text_but_is_not_cached(self):
+        self._process(self.requests[0], ai_result={'success': False, 'error': 'quota', 'data': {}})
+        self.assertIsNone(ExtractedDocument.objects.get(sha256=self.content_hash).ai_data)
+
+        _, mock_extract, mock_ai = self._process(self.requests[1])
+        mock_extract.assert_not_called()
+        mock_ai.assert_called_once_with('Invoice from XYZ Corp')
+
+    def test_duplicate_upload_gets_metadata_without_a_task(self):
+        self._process(self.requests[0])
+
+        response, mock_task = self._upload(self.requests[1])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(response.data['task_id'])
+        mock_task.assert_not_called()
+        self.assertEqual(ProformaMetadata.objects.get(request=self.requests[1]).vendor_name, 'XYZ Corp')
+
+
+class PdfPageExtractionTest(TestCase):
+    PAGES = 6
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(handle, 'wb') as file:
+            file.write(build_text_pdf(self.PAGES, lines_per_page=3))
+        self.addCleanup(os.remove, self.path)
+
+    def _extract(self, workers=1, **budgets):
+        config = {
+            **settings.DOCUMENT_PROCESSING,
+            'PDF_WORKERS': workers, 'PDF_PAGES_PER_CHUNK': 2, 'PDF_PARALLEL_MIN_PAGES': 0,
+            'PDF_MAX_PAGES': None, 'MAX_TEXT_CHARS': None, **budgets,
+        }
+        with override_settings(DOCUMENT_PROCESSING=config):
+            return DocumentProcessor._extract_from_pdf(self.path)
+
+    def test_pages_are_joined_in_order(self):
+        result = self._extract()
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['method'], 'pdfplumber')
+        positions = [result['text'].index(f'Item {page}-1:') for page in range(1, self.PAGES + 1)]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_process_pool_matches_serial_extraction(self):
+        self.assertEqual(self._extract(workers=3)['text'], self._extract()['text'])
+
+    def test_failed_page_falls_back_to_pypdf2_alone(self):
+        from pdfplumber.page import Page
+        original = Page.extract_text
+
+        def flaky(page, *args, **kwargs):
+            if page.page_number == 2:
+                raise ValueError('broken content stream')
+            return original(page, *args, **kwargs)
+
+        with patch.object(Page, 'extract_text', flaky), \
+                patch('PyPDF2.PdfReader', wraps=PyPDF2.PdfReader) as reader:
+            result = self._extract()
+
+        self.assertEqual(result['method'], 'PyPDF2+pdfplumber')
+        self.assertIn('Item 2-1:', result['text'])
+        # One reader to count pages, one for the fallback page's range
+        self.assertEqual(reader.call_count, 2)
+
+    def test_falls_back_to_serial_when_no_pool_can_start(self):
+        with patch('apps.documents.utils.ProcessPoolExecutor', side_effect=AssertionError('daemonic')):
+            result = self._extract(workers=3)
+
+        self.assertEqual(result['text'], self._extract()['text'])
+
+    def test_process_pool_runs_under_the_documents_worker(self):
+        with patch('apps.documents.utils.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool, \
+                self.assertNoLogs('apps.documents.utils', level='WARNING'):
+            result = run_in_documents_worker(lambda: self._extract(workers=3))
+
+        self.assertEqual(pool.call_count, 1)
+        self.assertEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'forkserver')
+        self.assertEqual(result['text'], self._extract()['text'])
+
+    def test_extraction_tasks_route_to_the_documents_queue(self):
+        for task in ['process_proforma_document', 'process_receipt_validation']:
+            route = celery_app.amqp.router.route({}, f'apps.documents.tasks.{task}')
+            self.assertEqual(route['queue'].name, 'documents')
+        route = celery_app.amqp.router.route({}, 'apps.notifications.tasks.send_approval_notification')
+        self.assertEqual(route['queue'].name, 'celery')
+
+    def test_pages_are_streamed_and_released(self):
+        from pdfplumber.page import Page
+        pages = iter_pdf_pages(self.path, 0, self.PAGES)
+
+        with patch.object(Page, 'close', autospec=True, side_effect=Page.close) as close:
+            index, text, method = next(pages)
+            self.assertEqual((index, method), (0, 'pdfplumber'))
+            self.assertIn('Item 1-1:', text)
+            self.assertEqual(close.call_count, 1)
+            pages.close()
+
+    def test_page_budget_stops_reading(self):
+        result = self._extract(PDF_MAX_PAGES=3)
+
+        self.assertIn('Item 3-1:', result['text'])
+        self.assertNotIn('Item 4-1:', result['text'])
+        self.assertEqual((result['page_count'], result['pages_extracted']), (self.PAGES, 3))
+        self.assertTrue(result['truncated'])
+
+    def test_character_budget_stops_reading_early(self):
+        for workers in [1, 3]:
+            with self.subTest(workers=workers):
+                result = self._extract(workers=workers, MAX_TEXT_CHARS=50)
+
+                self.assertEqual(len(result['text']), 50)
+                self.assertEqual(result['pages_extracted'], 1)
+                self.assertTrue(result['truncated'])
+
+    def test_whole_document_reports_peak_memory(self):
+        result = self._extract()
+
+        self.assertEqual(result['pages_extracted'], self.PAGES)
+        self.assertFalse(result['truncated'])
+        self.assertGreater(result['peak_memory_kb'], 0)
+
+    def test_benchmark_command_compares_pool_sizes(self):
+        out = StringIO()
+        call_command(
+            'benchmark_pdf_extraction', '--pages', '4', '--workers', '1,2',
+            '--chunk', '2', '--rounds', '1', stdout=out
+        )
+        self.assertIn('4 pages', out.getvalue())
+        self.assertIn('2 worker(s)', out.getvalue())
+        self.assertIn('peak RSS', out.getvalue())
+
+
+class PdfOcrFallbackTest(TestCase):
+    PAGES = 4
+    SCANNED = {1, 3}
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(handle, 'wb') as file:
+            file.write(build_catalogue_pdf(self.PAGES, lines_per_page=3, scanned_pages=self.SCANNED, dpi=50))
+        self.addCleanup(os.remove, self.path)
+
+    def _extract(self, ocr_workers=1, **budgets):
+        config = {
+            **settings.DOCUMENT_PROCESSING,
+            'PDF_WORKERS': 1, 'OCR_WORKERS': ocr_workers, 'OCR_DPI': 100,
+            'PDF_MAX_PAGES': None, 'MAX_TEXT_CHARS': None, **budgets,
+        }
+        with override_settings(DOCUMENT_PROCESSING=config), \
+                patch('apps.documents.utils.ocr_pdf_page',
+                      side_effect=lambda path, index, dpi, threads: (f'Scanned page {index + 1} at {dpi}', 1)) as ocr:
+            return DocumentProcessor._extract_from_pdf(self.path), ocr
+
+    def test_only_pages_without_text_are_ocred_and_merged_in_order(self):
+        result, ocr = self._extract()
+
+        self.assertEqual(sorted(call.args[1] for call in ocr.call_args_list), sorted(self.SCANNED))
+        self.assertEqual(result['method'], 'pdfplumber+pytesseract')
+        self.assertEqual(result['pages_ocred'], 2)
+        markers = ['Item 1-1:', 'Scanned page 2 at 100', 'Item 3-1:', 'Scanned page 4 at 100']
+        positions = [result['text'].index(marker) for marker in markers]
+        self.assertEqual(positions, sorted(positions))
+
+    def test_no_pages_are_reported_ocred_when_the_budget_skips_ocr(self):
+        # The budget runs out on the third page, after the scanned second one was seen
+        _, first_page, _ = next(iter_pdf_pages(self.path, 0, 1))
+        result, ocr = self._extract(MAX_TEXT_CHARS=len(first_page) + 2)
+
+        ocr.assert_not_called()
+        self.assertEqual(result['pages_extracted'], 3)
+        self.assertEqual(result['pages_ocred'], 0)
+
+    def test_ocr_runs_serially_when_no_pool_can_start(self):
+        with patch('apps.documents.utils.ProcessPoolExecutor', side_effect=AssertionError('daemonic')):
+            result, ocr = self._extract(ocr_workers=2)
+
+        self.assertEqual(ocr.call_count, 2)
+        self.assertIn('Scanned page 4', result['text'])
+
+    def test_ocr_pool_runs_under_the_documents_worker(self):
+        config = {
+            **settings.DOCUMENT_PROCESSING,
+            'PDF_WORKERS': 1, 'OCR_WORKERS': 2, 'OCR_DPI': 100,
+            'PDF_MAX_PAGES': None, 'MAX_TEXT_CHARS': None,
+        }
+        with override_settings(DOCUMENT_PROCESSING=config), \
+                patch('apps.documents.utils.ocr_pdf_page', scanned_page_text), \
+                patch('apps.documents.utils.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool, \
+                self.assertNoLogs('apps.documents.utils', level='WARNING'):
+            result = run_in_documents_worker(lambda: DocumentProcessor._extract_from_pdf(self.path))
+
+        self.assertEqual(pool.call_count, 1)
+        self.assertEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'forkserver')
+        self.assertEqual(result['pages_ocred'], 2)
+        self.assertIn('Scanned page 4 at 100', result['text'])
+
+    def test_scan_without_readable_text_fails(self):
+        config = {**settings.DOCUMENT_PROCESSING, 'OCR_WORKERS': 1}
+        with open(self.path, 'wb') as file:
+            file.write(build_catalogue_pdf(2, lines_per_page=3, scanned_pages={0, 1}, dpi=50))
+
+        with override_settings(DOCUMENT_PROCESSING=config), \
+                patch('apps.documents.utils.ocr_pdf_page', return_value=('', 1)):
+            result = DocumentProcessor._extract_from_pdf(self.path)
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['error'], 'No text could be extracted from PDF')
+
+    def test_thread_limit_is_set_for_tesseract_only(self):
+        environment = dict(os.environ)
+        with patch('apps.documents.utils.subprocess.run') as run:
+            run.return_value.stdout = ' Scanned text \n'
+            text, _ = ocr_pdf_page(self.path, 1, 100, 2)
+
+        self.assertEqual(text, 'Scanned text')
+        tesseract = run.call_args_list[-1]
+        self.assertEqual(tesseract.kwargs['env']['OMP_THREAD_LIMIT'], '2')
+        self.assertEqual(dict(os.environ), environment)
+
+
+class OcrPreprocessingTest(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.jpg')
+        os.close(handle)
+        build_phone_photo(self.path, receipt_lines(0))
+        self.addCleanup(os.remove, self.path)
+
+    def test_phone_photo_is_upright_small_cropped_and_binary(self):
+        with Image.open(self.path) as photo:
+            self.assertEqual(photo.size, (3000, 4000))
+            image = preprocess_for_ocr(photo, max_pixels=4_000_000)
+
+        self.assertEqual(image.mode, 'L')
+        # The receipt, not the table around it: taller than wide, a fraction of the photo
+        self.assertGreater(image.height, image.width)
+        self.assertLess(image.width * image.height, 1_000_000)
+        self.assertEqual({level for level, count in enumerate(image.histogram()) if count}, {0, 255})
+
+    def test_scan_keeps_its_dpi_below_target(self):
+        scan = Image.new('L', (600, 800), 255)
+        scan.paste(0, (100, 100, 500, 120))
+        scan.info['dpi'] = (150, 150)
+
+        image = preprocess_for_ocr(scan, target_dpi=300, binarize=False, crop_margins=False)
+
+        self.assertEqual(image.size, (600, 800))
+
+    def test_high_dpi_scan_is_downsampled_to_target(self):
+        scan = Image.new('L', (1200, 1600), 255)
+        scan.info['dpi'] = (600, 600)
+
+        image = preprocess_for_ocr(scan, target_dpi=300, crop_margins=False)
+
+        self.assertEqual(image.size, (600, 800))
+
+    def test_otsu_threshold_splits_ink_from_paper(self):
+        image = Image.new('L', (100, 100), 230)
+        image.paste(40, (0, 0, 100, 20))
+
+        self.assertTrue(40 <= otsu_threshold(image) < 230)
+
+    def test_extract_from_image_ocrs_the_preprocessed_image(self):
+        sizes = {}
+        for preprocess in [False, True]:
+            config = {**settings.DOCUMENT_PROCESSING, 'OCR_PREPROCESS': preprocess}
+            with override_settings(DOCUMENT_PROCESSING=config), \
+                    patch('pytesseract.image_to_string', return_value='TOTAL 118.00') as ocr:
+                result = DocumentProcessor._extract_from_image(self.path)
+            self.assertEqual(result['text'], 'TOTAL 118.00')
+            sizes[preprocess] = ocr.call_args.args[0].size
+
+        self.assertEqual(sizes[False], (3000, 4000))
+        self.assertLess(sizes[True][0] * sizes[True][1], 1_000_000)
@@ -0,0 +1,108 @@
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from apps.requests.models import PurchaseRequest
+from apps.notifications.models import OutboxMessage
+from apps.notifications.outbox import enqueue, relay_outbox, purge_dispatched
+from apps.notifications.tasks import send_approval_notification, send_receipt_reminder
+from decimal import Decimal
+
+User = get_user_model()
+
+class OutboxTest(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.request = PurchaseRequest.objects.create(
+            title='Test Request',
+            description='Test Description',
+            total_amount=Decimal('1000.00'),
+            created_by=self.staff_user
+        )
+
+    def test_approval_records_message_without_calling_broker(self):
+        self.client.force_authenticate(user=self.approver_l1)
+        with mock.patch.object(send_approval_notification, 'apply_async') as apply_async:
+            response = self.client.patch(
+                reverse('purchaserequest-approve', kwargs={'pk': self.request.pk}), {}, format='json'
+            )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        apply_async.assert_not_called()
+        message = OutboxMessage.objects.get()
+        self.assertEqual(message.task_name, send_approval_notification.name)
+        self.assertEqual(message.args, [str(self.request.pk), 'approved', 'approver1'])
+        self.assertIsNone(message.dispatched_at)
+
+    def test_rolled_back_action_leaves_no_message(self):
+        try:
+            with transaction.atomic():
+                enqueue(send_receipt_reminder, str(self.request.pk))
+                raise RuntimeError('workflow failed')
+        except RuntimeError:
+            pass
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_relay_sends_in_order_and_marks_dispatched(self):
+        for _ in range(3):
+            enqueue(send_receipt_reminder, str(self.request.pk))
+        
+        with mock.patch.object(send_receipt_reminder, 'apply_async') as apply_async:
+            self.assertEqual(relay_outbox(batch_size=2), 2)
+            self.assertEqual(relay_outbox(batch_size=2), 1)
+            self.assertEqual(relay_outbox(batch_size=2), 0)
+        
+        self.assertEqual(apply_async.call_count, 3)
+        apply_async.assert_called_with(args=[str(self.request.pk)], kwargs={})
+        self.assertFalse(OutboxMessage.objects.filter(dispatched_at__isnull=True).exists())
+
+    def test_broker_failure_backs_off_and_keeps_message(self):
+        first = enqueue(send_receipt_reminder, str(self.request.pk))
+        enqueue(send_receipt_reminder, str(self.request.pk))
+        
+        with mock.patch.object(send_receipt_reminder, 'apply_async', side_effect=ConnectionError('broker down')) as apply_async:
+            self.assertEqual(relay_outbox(), 0)
+        # The pass stops at the first failure instead of hammering a missing broker
+        self.assertEqual(apply_async.call_count, 1)
+        
+        first.refresh_from_db()
+        self.assertEqual(first.attempts, 1)
+        self.assertEqual(first.last_error, 'broker down')
+        self.assertGreater(first.available_at, timezone.now())
+        
+        with mock.patch.object(send_receipt_reminder, 'apply_async') as apply_async:
+            self.assertEqual(relay_outbox(), 1)
+        self.assertEqual(OutboxMessage.objects.filter(dispatched_at__isnull=True).get(), first)
+
+    def test_purge_removes_only_old_dispatched_messages(self):
+        old = enqueue(send_receipt_reminder, str(self.request.pk))
+        recent = enqueue(send_receipt_reminder, str(self.request.pk))
+        pending = enqueue(send_receipt_reminder, str(self.request.pk))
+        OutboxMessage.objects.filter(pk=old.pk).update(dispatched_at=timezone.now() - timedelta(days=30))
+        OutboxMessage.objects.filter(pk=recent.pk).update(dispatched_at=timezone.now())
+        
+        self.assertEqual(purge_dispatched(timezone.now() - timedelta(days=7)), 1)
+        self.assertEqual(set(OutboxMessage.objects.values_list('pk', flat=True)), {recent.pk, pending.pk})
+
+    def test_relay_command_once(self):
+        enqueue(send_receipt_reminder, str(self.request.pk))
+        out = StringIO()
+        with mock.patch.object(send_receipt_reminder, 'apply_async'):
+            call_command('relay_outbox', '--once', stdout=out)
+        self.assertIn('Relayed 1 messages', out.getvalue())
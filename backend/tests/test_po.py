@@ -0,0 +1,166 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.db.transaction import TransactionManagementError
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from apps.requests.models import PurchaseRequest
+from apps.approvals.models import Approval
+from apps.po.models import PurchaseOrder, PurchaseOrderSequence
+from apps.po.numbering import allocate_po_number, format_po_number
+from decimal import Decimal
+
+User = get_user_model()
+
+class PurchaseOrderNumberingTest(TestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff'
+        )
+        self.year = timezone.now().year
+
+    def _create_purchase_order(self):
+        request = PurchaseRequest.objects.create(
+            title='Test Request',
+            description='Test Description',
+            total_amount=Decimal('100.00'),
+            created_by=self.staff_user
+        )
+        return PurchaseOrder.objects.create(request=request, total_amount=request.total_amount)
+
+    def test_numbers_are_sequential(self):
+        numbers = [self._create_purchase_order().po_number for _ in range(3)]
+        self.assertEqual(numbers, [format_po_number(self.year, n) for n in [1, 2, 3]])
+        self.assertEqual(PurchaseOrderSequence.objects.get(year=self.year).last_number, 3)
+
+    def test_each_year_has_its_own_counter(self):
+        self.assertEqual(allocate_po_number(2030), 'PO-2030-000001')
+        self.assertEqual(allocate_po_number(2031), 'PO-2031-000001')
+        self.assertEqual(allocate_po_number(2030), 'PO-2030-000002')
+
+    def test_rolled_back_allocation_leaves_no_gap(self):
+        try:
+            with transaction.atomic():
+                allocate_po_number(2030)
+                raise RuntimeError('approval failed')
+        except RuntimeError:
+            pass
+        self.assertEqual(allocate_po_number(2030), 'PO-2030-000001')
+
+    def test_allocation_does_not_scan_purchase_orders(self):
+        self._create_purchase_order()
+        with self.assertNumQueries(2):
+            # UPDATE counter, SELECT counter
+            allocate_po_number()
+
+
+class PurchaseOrderNumberingTransactionTest(TransactionTestCase):
+    """Autocommit, as in a shell or a task: no caller transaction holds the counter lock"""
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', role='staff')
+        self.year = timezone.now().year
+
+    def _request(self):
+        return PurchaseRequest.objects.create(
+            title='Test Request', description='Description',
+            total_amount=Decimal('100.00'), created_by=self.staff_user
+        )
+
+    def test_allocation_needs_the_callers_transaction(self):
+        with self.assertRaises(TransactionManagementError):
+            allocate_po_number(2030)
+        self.assertFalse(PurchaseOrderSequence.objects.filter(year=2030).exists())
+
+    def test_failed_insert_gives_its_number_back(self):
+        request = self._request()
+        PurchaseOrder.objects.create(request=request, total_amount=request.total_amount)
+        with self.assertRaises(IntegrityError):
+            # A second PO for the same request fails on insert, after its number was allocated
+            PurchaseOrder.objects.create(request=request, total_amount=request.total_amount)
+
+        second = PurchaseOrder.objects.create(request=self._request(), total_amount=Decimal('100.00'))
+        self.assertEqual(second.po_number, format_po_number(self.year, 2))
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class PurchaseOrderNumberingConcurrencyTest(TransactionTestCase):
+    """Approve hundreds of requests from parallel threads and check PO numbers stay unique and dense"""
+    REQUEST_COUNT = 200
+    THREADS = 16
+
+    def setUp(self):
+        staff_user = User.objects.create_user(username='staff', role='staff')
+        approver_l1 = User.objects.create_user(
+            username='approver1', role='approver_level_1', approver_level=1
+        )
+        self.approver_l2 = User.objects.create_user(
+            username='approver2', role='approver_level_2', approver_level=2
+        )
+        self.requests = []
+        for i in range(self.REQUEST_COUNT):
+            request = PurchaseRequest.objects.create(
+                title=f'Request {i}',
+                description='Description',
+                total_amount=Decimal('100.00'),
+                created_by=staff_user,
+                current_approval_level=2
+            )
+            Approval.objects.create(request=request, approver=approver_l1, level=1, action='approved')
+            self.requests.append(request)
+
+    def _approve(self, request):
+        try:
+            client = APIClient()
+            client.force_authenticate(user=self.approver_l2)
+            url = reverse('purchaserequest-approve', kwargs={'pk': request.pk})
+            return client.patch(url, {}, format='json').status_code
+        finally:
+            connection.close()
+
+    def test_concurrent_approvals_get_unique_dense_numbers(self):
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            status_codes = list(executor.map(self._approve, self.requests))
+        
+        self.assertEqual(status_codes, [status.HTTP_200_OK] * self.REQUEST_COUNT)
+        year = timezone.now().year
+        self.assertEqual(
+            set(PurchaseOrder.objects.values_list('po_number', flat=True)),
+            {format_po_number(year, n) for n in range(1, self.REQUEST_COUNT + 1)}
+        )
+
+
+class AsyncPurchaseOrderDetailTest(TestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(username='staff', role='staff')
+        self.finance_user = User.objects.create_user(username='finance', role='finance')
+        request = PurchaseRequest.objects.create(
+            title='Laptop',
+            description='Description',
+            total_amount=Decimal('100.00'),
+            created_by=self.staff_user
+        )
+        self.purchase_order = PurchaseOrder.objects.create(request=request, total_amount=request.total_amount)
+        self.url = reverse('async-purchaseorder-detail', kwargs={'pk': self.purchase_order.pk})
+
+    def _get(self, user):
+        token = RefreshToken.for_user(user).access_token
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_finance_gets_the_drf_payload(self):
+        response = self._get(self.finance_user)
+
+        client = APIClient()
+        client.force_authenticate(user=self.finance_user)
+        drf_response = client.get(reverse('purchaseorder-detail', kwargs={'pk': self.purchase_order.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), drf_response.json())
+
+    def test_other_roles_are_forbidden(self):
+        self.assertEqual(self._get(self.staff_user).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,144 @@
+import random
+from datetime import timedelta
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from apps.requests.models import PurchaseRequest
+from apps.requests.views import PurchaseRequestViewSet
+from apps.approvals.escalation import stale_requests
+from apps.approvals.inbox import rebuild_inbox
+from decimal import Decimal
+
+User = get_user_model()
+
+class QueryPlanTest(TestCase):
+    """
+    Seed a large request table and check via EXPLAIN that every role's
+    list query is served from an index rather than a full table scan.
+    """
+    SEED_SIZE = 5000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff_users = [
+            User.objects.create_user(username=f'staff{i}', role='staff')
+            for i in range(50)
+        ]
+        cls.approver_l1 = User.objects.create_user(
+            username='approver1', password='testpass123', role='approver_level_1', approver_level=1
+        )
+        cls.approver_l2 = User.objects.create_user(
+            username='approver2', password='testpass123', role='approver_level_2', approver_level=2
+        )
+        cls.finance_user = User.objects.create_user(
+            username='finance', password='testpass123', role='finance'
+        )
+
+        # Mostly settled history with a thin band of open work, like production
+        rng = random.Random(42)
+        statuses = ['approved'] * 3 + ['rejected'] * 5 + ['pending'] + ['need_info']
+        payment_statuses = ['paid'] * 8 + ['pending', 'on_hold']
+        PurchaseRequest.objects.bulk_create([
+            PurchaseRequest(
+                title=f'Request {i}',
+                description='Description',
+                total_amount=Decimal('100.00'),
+                created_by=rng.choice(cls.staff_users),
+                status=rng.choice(statuses),
+                current_approval_level=rng.choice([1, 2]),
+                payment_status=rng.choice(payment_statuses),
+                receipt_submitted=rng.random() < 0.9,
+            )
+            for i in range(cls.SEED_SIZE)
+        ], batch_size=500)
+        # bulk_create skips the post_save hook that maintains the approver inbox
+        rebuild_inbox()
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _list_queryset(self, user):
+        """Build the queryset the list endpoint runs for this user, including cursor ordering"""
+        request = Request(APIRequestFactory().get('/api/requests/'))
+        request.user = user
+        view = PurchaseRequestViewSet(request=request, action='list', format_kwarg=None)
+        paginator = view.paginator
+        return view.get_queryset().order_by(*paginator.ordering)[:paginator.page_size + 1]
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        table = PurchaseRequest._meta.db_table
+
+        if connection.vendor == 'postgresql':
+            self.assertNotIn(f'Seq Scan on {table}', plan, plan)
+            # Sort and Incremental Sort nodes: the index must deliver rows already in order
+            self.assertNotRegex(plan, r'\bSort\b', plan)
+        elif connection.vendor == 'sqlite':
+            self.assertNotRegex(plan, rf'SCAN {table}(?! USING)', plan)
+            # Covers both a full sort and a tie-break sort (RIGHT PART OF ORDER BY)
+            self.assertNotRegex(plan, r'USE TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY', plan)
+        self.assertIn(index_name, plan, plan)
+
+    def _route_plan(self, user, url):
+        """EXPLAIN the request-list query the route itself ran, cursor filter and all"""
+        client = APIClient()
+        client.force_authenticate(user=user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        table = PurchaseRequest._meta.db_table
+        sql = next(query['sql'] for query in context.captured_queries if f'FROM "{table}"' in query['sql'])
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            return response, '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+    def test_approver_list_route_pages_on_inbox_index(self):
+        url = reverse('purchaserequest-list')
+        for user in [self.approver_l1, self.approver_l2]:
+            with self.subTest(user=user.username):
+                # The first page, then a page behind a cursor
+                response, plan = self._route_plan(user, url)
+                self.assertUsesIndex(_ExplainedPlan(plan), 'inbox_level_created_req_idx')
+                response, plan = self._route_plan(user, response.data['next'])
+                self.assertUsesIndex(_ExplainedPlan(plan), 'inbox_level_created_req_idx')
+
+    def test_staff_list_uses_owner_index(self):
+        self.assertUsesIndex(self._list_queryset(self.staff_users[0]), 'pr_owner_created_idx')
+
+    def test_approver_level_1_list_uses_inbox_index(self):
+        self.assertUsesIndex(self._list_queryset(self.approver_l1), 'inbox_level_created_req_idx')
+
+    def test_approver_level_2_list_uses_inbox_index(self):
+        self.assertUsesIndex(self._list_queryset(self.approver_l2), 'inbox_level_created_req_idx')
+
+    def test_finance_list_uses_approved_index(self):
+        self.assertUsesIndex(self._list_queryset(self.finance_user), 'pr_approved_created_idx')
+
+    def test_receipt_reminder_uses_payment_index(self):
+        queryset = PurchaseRequest.objects.filter(
+            status='approved',
+            payment_status='paid',
+            receipt_submitted=False
+        ).order_by().only('id')  # reminders and dashboard counts need no order
+        self.assertUsesIndex(queryset, 'pr_receipt_due_idx')
+
+    def test_escalation_batch_uses_updated_index(self):
+        cutoff = timezone.now() - timedelta(hours=48)
+        after = (cutoff - timedelta(days=7), PurchaseRequest.objects.values_list('id', flat=True).first())
+        queryset = stale_requests(1, cutoff, after).only('id')[:500]
+        self.assertUsesIndex(queryset, 'pr_status_level_updated_idx')
+
+
+class _ExplainedPlan:
+    """An already captured plan, for assertUsesIndex"""
+    def __init__(self, plan):
+        self.plan = plan
+
+    def explain(self):
+        return self.plan
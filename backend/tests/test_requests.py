@@ -1,9 +1,23 @@
-from django.test import TestCase
+from io import StringIO
+from unittest import mock
+from unittest import skipUnless
+from django.test import LiveServerTestCase, TestCase, TransactionTestCase, override_settings
+from django.core.cache import cache
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import status
 from django.urls import reverse
-from apps.requests.models import PurchaseRequest, RequestItem
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from apps.requests.models import PurchaseRequest, RequestItem, RequestSearchDocument, WorkflowEvent
+from apps.requests.cache import request_detail_cache, purchase_order_detail_cache
+from apps.approvals.models import Approval
+from apps.approvals.policy import get_approval_policy
+from apps.po.models import PurchaseOrder
+from apps.documents.models import ProformaMetadata, ReceiptMetadata
 from decimal import Decimal
 
 User = get_user_model()
@@ -98,3 +112,803 @@ class PurchaseRequestAPITest(APITestCase):
         data = {'title': 'Updated Title'}
         response = self.client.patch(url, data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class PurchaseRequestQueryCountTest(APITestCase):
+    """List pages must cost the same number of queries whatever their size"""
+
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.approver_l2 = User.objects.create_user(
+            username='approver2',
+            password='testpass123',
+            role='approver_level_2',
+            approver_level=2
+        )
+        self.finance_user = User.objects.create_user(
+            username='finance',
+            password='testpass123',
+            role='finance'
+        )
+
+    def _seed(self, count):
+        """Create requests in every workflow state with all nested relations populated"""
+        for i in range(count):
+            for state in ['level_1', 'level_2', 'approved']:
+                request = PurchaseRequest.objects.create(
+                    title=f'{state} request {i}',
+                    description='Description',
+                    total_amount=Decimal('100.00'),
+                    created_by=self.staff_user
+                )
+                RequestItem.objects.create(
+                    request=request,
+                    description='Item',
+                    quantity=2,
+                    unit_price=Decimal('50.00')
+                )
+                ProformaMetadata.objects.create(request=request, vendor_name='Vendor')
+                if state in ['level_2', 'approved']:
+                    Approval.objects.create(
+                        request=request, approver=self.approver_l1, level=1, action='approved'
+                    )
+                    request.current_approval_level = 2
+                if state == 'approved':
+                    Approval.objects.create(
+                        request=request, approver=self.approver_l2, level=2, action='approved'
+                    )
+                    request.status = 'approved'
+                    PurchaseOrder.objects.create(
+                        request=request, total_amount=request.total_amount, vendor_name='Vendor'
+                    )
+                    ReceiptMetadata.objects.create(request=request, vendor_name='Vendor')
+                request.save()
+
+    def _count_queries(self, user, url):
+        self.client.force_authenticate(user=user)
+        # Compile the approval policy outside the measured block; it is loaded once per process
+        get_approval_policy()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context.captured_queries), response
+
+    def _rows(self, response):
+        if isinstance(response.data, dict):
+            return response.data['results']
+        return response.data
+
+    def _assert_constant_queries(self, user, url):
+        full_url = f'{url}?view=full'
+        self._seed(1)
+        small_count, small_response = self._count_queries(user, url)
+        small_full_count, _ = self._count_queries(user, full_url)
+        self._seed(5)
+        large_count, large_response = self._count_queries(user, url)
+        large_full_count, _ = self._count_queries(user, full_url)
+
+        self.assertGreater(len(self._rows(large_response)), len(self._rows(small_response)))
+        self.assertEqual(small_count, large_count)
+        self.assertLessEqual(large_count, 1)
+        self.assertEqual(small_full_count, large_full_count)
+        self.assertLessEqual(large_full_count, 5)
+
+    def test_staff_list_query_count(self):
+        self._assert_constant_queries(self.staff_user, reverse('purchaserequest-list'))
+
+    def test_approver_level_1_list_query_count(self):
+        self._assert_constant_queries(self.approver_l1, reverse('purchaserequest-list'))
+
+    def test_approver_level_2_list_query_count(self):
+        self._assert_constant_queries(self.approver_l2, reverse('purchaserequest-list'))
+
+    def test_finance_list_query_count(self):
+        self._assert_constant_queries(self.finance_user, reverse('purchaserequest-list'))
+
+    def test_my_approvals_query_count(self):
+        self._assert_constant_queries(self.approver_l1, reverse('purchaserequest-my-approvals'))
+
+class PurchaseRequestSummaryViewTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            role='staff'
+        )
+        self.client.force_authenticate(user=self.user)
+        PurchaseRequest.objects.create(
+            title='My Request',
+            description='My Description',
+            total_amount=Decimal('100.00'),
+            created_by=self.user
+        )
+
+    def test_list_returns_summary_by_default(self):
+        response = self.client.get(reverse('purchaserequest-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data['results'][0]
+        self.assertEqual(row['created_by_username'], 'testuser')
+        self.assertNotIn('description', row)
+        self.assertNotIn('approvals', row)
+
+    def test_list_full_view(self):
+        response = self.client.get(reverse('purchaserequest-list'), {'view': 'full'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data['results'][0]
+        self.assertEqual(row['description'], 'My Description')
+        self.assertIn('approvals', row)
+        self.assertEqual(row['next_approval_level'], 1)
+
+    def test_retrieve_is_always_full(self):
+        request = PurchaseRequest.objects.get()
+        url = reverse('purchaserequest-detail', kwargs={'pk': request.pk})
+        response = self.client.get(url, {'view': 'summary'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('items', response.data)
+
+class PurchaseRequestCursorPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.requests = [
+            PurchaseRequest.objects.create(
+                title=f'Request {i}',
+                description='Description',
+                total_amount=Decimal('100.00'),
+                created_by=self.user
+            )
+            for i in range(25)
+        ]
+
+    def _collect(self, url, params=None):
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(row['id'] for row in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_list_pages_follow_creation_order(self):
+        self.client.force_authenticate(user=self.user)
+        ids = self._collect(reverse('purchaserequest-list'), {'page_size': 10})
+        expected = [
+            str(pk) for pk in PurchaseRequest.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+        self.assertEqual(ids, expected)
+
+    def test_inserts_do_not_shift_later_pages(self):
+        self.client.force_authenticate(user=self.user)
+        url = reverse('purchaserequest-list')
+        first_page = self.client.get(url, {'page_size': 10})
+        
+        PurchaseRequest.objects.create(
+            title='Late Request',
+            description='Description',
+            total_amount=Decimal('100.00'),
+            created_by=self.user
+        )
+        
+        second_page = self.client.get(first_page.data['next'])
+        first_ids = {row['id'] for row in first_page.data['results']}
+        second_ids = {row['id'] for row in second_page.data['results']}
+        self.assertEqual(len(second_ids), 10)
+        self.assertFalse(first_ids & second_ids)
+
+    def test_my_approvals_is_paginated(self):
+        for purchase_request in self.requests:
+            Approval.objects.create(
+                request=purchase_request, approver=self.approver, level=1, action='approved'
+            )
+            purchase_request.save()
+        
+        self.client.force_authenticate(user=self.approver)
+        url = reverse('purchaserequest-my-approvals')
+        first_page = self.client.get(url)
+        self.assertEqual(len(first_page.data['results']), 20)
+        
+        ids = self._collect(url)
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+
+class PurchaseRequestDashboardTest(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.finance_user = User.objects.create_user(
+            username='finance',
+            password='testpass123',
+            role='finance'
+        )
+        self.url = reverse('purchaserequest-dashboard')
+        
+        self.pending = self._create(status='pending')
+        self._create(status='pending')
+        self.approved = self._create(status='approved', current_approval_level=2)
+        self._create(status='approved', current_approval_level=2, payment_status='paid')
+        self._create(status='approved', current_approval_level=2, payment_status='on_hold')
+        self.rejected = self._create(status='rejected')
+        
+        for purchase_request in [self.approved, self.rejected]:
+            Approval.objects.create(
+                request=purchase_request,
+                approver=self.approver_l1,
+                level=1,
+                action='rejected' if purchase_request.status == 'rejected' else 'approved'
+            )
+
+    def _create(self, **kwargs):
+        return PurchaseRequest.objects.create(
+            title='Request',
+            description='Description',
+            total_amount=Decimal('100.00'),
+            created_by=self.staff_user,
+            **kwargs
+        )
+
+    def _get_dashboard(self, user, queries=2):
+        self.client.force_authenticate(user=user)
+        with self.assertNumQueries(queries):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_staff_dashboard(self):
+        data = self._get_dashboard(self.staff_user)
+        self.assertEqual(data['counts'], {
+            'pending_requests': 2,
+            'approved_requests': 3,
+            'rejected_requests': 1,
+            'receipts_pending': 1,
+        })
+        self.assertEqual(len(data['recent']), 5)
+
+    def test_approver_dashboard(self):
+        data = self._get_dashboard(self.approver_l1, queries=3)
+        self.assertEqual(data['counts'], {
+            'waiting_for_approval': 2,
+            'approved_by_me': 1,
+            'rejected_by_me': 1,
+        })
+        self.assertEqual(len(data['recent']), 2)
+
+    def test_finance_dashboard(self):
+        data = self._get_dashboard(self.finance_user)
+        self.assertEqual(data['counts'], {
+            'awaiting_finance_review': 1,
+            'paid_requests': 1,
+            'on_hold_requests': 1,
+            'missing_receipts': 1,
+        })
+        self.assertEqual([row['id'] for row in data['recent']], [str(self.approved.id)])
+
+class PurchaseRequestETagTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.request = PurchaseRequest.objects.create(
+            title='Test Request',
+            description='Test Description',
+            total_amount=Decimal('100.00'),
+            created_by=self.user
+        )
+        self.url = reverse('purchaserequest-detail', kwargs={'pk': self.request.pk})
+        self.client.force_authenticate(user=self.user)
+
+    def test_retrieve_sets_version_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], f'"{self.request.pk}-{self.request.version}"')
+
+    def test_matching_if_none_match_returns_304_from_one_query(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_every_mutation_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        
+        self.client.patch(self.url, {'title': 'Renamed'}, format='json')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+        
+        self.client.force_authenticate(user=self.approver)
+        self.client.patch(reverse('purchaserequest-approve', kwargs={'pk': self.request.pk}), {}, format='json')
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        
+        # Document tasks write metadata without touching the request row
+        ProformaMetadata.objects.create(request=self.request, vendor_name='Vendor')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['proforma_metadata']['vendor_name'], 'Vendor')
+
+    def test_every_nested_model_save_bumps_the_version(self):
+        writes = [
+            lambda: RequestItem.objects.create(
+                request=self.request, description='Chair', quantity=1, unit_price=Decimal('10.00')
+            ),
+            lambda: ProformaMetadata.objects.create(request=self.request, vendor_name='Vendor'),
+            lambda: ReceiptMetadata.objects.create(request=self.request, vendor_name='Vendor'),
+            lambda: PurchaseOrder.objects.create(request=self.request, total_amount=self.request.total_amount),
+        ]
+        for write in writes:
+            version = PurchaseRequest.objects.values_list('version', flat=True).get(pk=self.request.pk)
+            write()
+            self.assertEqual(
+                PurchaseRequest.objects.values_list('version', flat=True).get(pk=self.request.pk), version + 1
+            )
+
+    def test_if_none_match_respects_visibility(self):
+        other = User.objects.create_user(username='other', password='testpass123', role='staff')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class ResponseCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            role='staff'
+        )
+        self.finance_user = User.objects.create_user(
+            username='finance',
+            password='testpass123',
+            role='finance'
+        )
+        self.request = PurchaseRequest.objects.create(
+            title='Test Request',
+            description='Test Description',
+            total_amount=Decimal('100.00'),
+            created_by=self.user,
+            status='approved'
+        )
+        self.url = reverse('purchaserequest-detail', kwargs={'pk': self.request.pk})
+
+    def test_request_detail_is_served_from_cache(self):
+        self.client.force_authenticate(user=self.user)
+        first = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            second = self.client.get(self.url)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+        self.assertEqual(request_detail_cache.stats()['hits'], 1)
+        self.assertEqual(request_detail_cache.stats()['misses'], 1)
+
+    @override_settings(ALLOWED_HOSTS=['api.example.com', 'async.example.com'])
+    def test_cached_file_urls_follow_the_request_host(self):
+        self.request.proforma_file.name = 'proformas/quote.pdf'
+        self.request.save()
+        self.client.force_authenticate(user=self.user)
+        
+        for host in ['api.example.com', 'async.example.com', 'api.example.com']:
+            response = self.client.get(self.url, HTTP_HOST=host)
+            self.assertTrue(response.data['proforma_file_url'].startswith(f'http://{host}/'))
+        self.assertEqual(request_detail_cache.stats()['hits'], 1)
+
+    def test_writes_invalidate_request_detail(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+        
+        RequestItem.objects.create(
+            request=self.request, description='Item', quantity=1, unit_price=Decimal('100.00')
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['items']), 1)
+        
+        PurchaseOrder.objects.create(request=self.request, total_amount=Decimal('100.00'))
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.data['purchase_order'])
+        self.assertEqual(request_detail_cache.stats()['misses'], 3)
+
+    def test_purchase_order_detail_is_cached_until_request_changes(self):
+        purchase_order = PurchaseOrder.objects.create(
+            request=self.request, total_amount=Decimal('100.00'), vendor_name='Vendor'
+        )
+        url = reverse('purchaseorder-detail', kwargs={'pk': purchase_order.pk})
+        self.client.force_authenticate(user=self.finance_user)
+        
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['request_title'], 'Test Request')
+        
+        self.request.title = 'Renamed'
+        self.request.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data['request_title'], 'Renamed')
+        self.assertEqual(purchase_order_detail_cache.stats(), {'hits': 1, 'misses': 2, 'hit_ratio': 1 / 3})
+
+    def test_stats_command(self):
+        self.client.force_authenticate(user=self.user)
+        self.client.get(self.url)
+        self.client.get(self.url)
+        
+        out = StringIO()
+        call_command('response_cache_stats', '--reset', stdout=out)
+        self.assertIn('purchase-request: 1 hits, 1 misses, hit ratio 50.0%', out.getvalue())
+        self.assertEqual(request_detail_cache.stats()['hits'], 0)
+
+
+class PurchaseRequestSearchTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            role='staff'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            password='testpass123',
+            role='staff'
+        )
+        self.laptops = PurchaseRequest.objects.create(
+            title='Laptops for onboarding',
+            description='New hires',
+            total_amount=Decimal('3000.00'),
+            created_by=self.user
+        )
+        self.furniture = PurchaseRequest.objects.create(
+            title='Office furniture',
+            description='Second floor',
+            total_amount=Decimal('800.00'),
+            created_by=self.user
+        )
+        RequestItem.objects.create(
+            request=self.furniture,
+            description='Standing desk',
+            quantity=2,
+            unit_price=Decimal('400.00')
+        )
+        PurchaseRequest.objects.create(
+            title='Laptops for sales',
+            description='Field team',
+            total_amount=Decimal('1500.00'),
+            created_by=self.other_user
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def _search(self, query):
+        response = self.client.get(reverse('purchaserequest-list'), {'q': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['id'] for row in response.data['results']}
+
+    def test_matches_title_within_role_scope(self):
+        self.assertEqual(self._search('laptops'), {str(self.laptops.id)})
+
+    def test_matches_item_description_and_prefix(self):
+        self.assertEqual(self._search('desk'), {str(self.furniture.id)})
+        self.assertEqual(self._search('stand'), {str(self.furniture.id)})
+
+    def test_terms_match_as_prefixes_on_every_engine(self):
+        self.assertEqual(self._search('lapt onboard'), {str(self.laptops.id)})
+        self.assertEqual(self._search('furn'), {str(self.furniture.id)})
+        self.assertEqual(self._search('aptops'), set())
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._search('office laptops'), set())
+
+    def test_vendor_name_is_indexed_on_metadata_write(self):
+        self.assertEqual(self._search('acme'), set())
+        ProformaMetadata.objects.create(request=self.laptops, vendor_name='Acme Supplies')
+        self.assertEqual(self._search('acme'), {str(self.laptops.id)})
+
+    def test_document_follows_item_delete(self):
+        RequestItem.objects.filter(request=self.furniture).get().delete()
+        self.assertEqual(self._search('desk'), set())
+
+    def test_deleting_request_removes_document(self):
+        self.furniture.delete()
+        self.assertEqual(self._search('furniture'), set())
+
+    def test_query_syntax_is_treated_as_text(self):
+        for query in ['"', 'laptops OR', 'NEAR(', '-*', 'desk:']:
+            self._search(query)
+
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 rowids are SQLite-specific')
+class SearchIndexVacuumTest(TransactionTestCase):
+    def test_index_survives_vacuum_after_deletes(self):
+        user = User.objects.create_user(username='testuser', role='staff')
+        requests = [
+            PurchaseRequest.objects.create(
+                title=f'Order {word}', description='Supplies', total_amount=Decimal('10.00'), created_by=user
+            )
+            for word in ['alpha', 'bravo', 'charlie', 'delta']
+        ]
+        requests[0].delete()
+        requests[2].delete()
+        with connection.cursor() as cursor:
+            cursor.execute('VACUUM')
+        
+        matches = RequestSearchDocument.objects.matching('delta').values_list('request_id', flat=True)
+        self.assertEqual(list(matches), [requests[3].id])
+
+
+class WorkflowTimelineTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123',
+            role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1',
+            password='testpass123',
+            role='approver_level_1',
+            approver_level=1
+        )
+        self.approver_l2 = User.objects.create_user(
+            username='approver2',
+            password='testpass123',
+            role='approver_level_2',
+            approver_level=2
+        )
+        self.finance_user = User.objects.create_user(
+            username='finance',
+            password='testpass123',
+            role='finance'
+        )
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('purchaserequest-list'), {
+            'title': 'Laptops',
+            'description': 'New hires',
+            'total_amount': '3000.00'
+        }, format='json')
+        self.request = PurchaseRequest.objects.get(pk=response.data['id'])
+
+    def _as(self, user, method, name, data=None, **kwargs):
+        self.client.force_authenticate(user=user)
+        url = reverse(f'purchaserequest-{name}', kwargs={'pk': self.request.pk})
+        response = getattr(self.client, method)(url, data or {}, **kwargs)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return response
+
+    def _timeline(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.get(reverse('purchaserequest-timeline', kwargs={'pk': self.request.pk}))
+
+    def test_full_lifecycle_is_recorded_in_order(self):
+        self._as(self.approver_l1, 'post', 'request-clarification', {'message': 'Which model?'}, format='json')
+        self._as(self.user, 'post', 'respond-to-clarification', {'response': 'ThinkPad'}, format='json')
+        self._as(self.approver_l1, 'patch', 'approve', {'comment': 'Fine'}, format='json')
+        self._as(self.approver_l2, 'patch', 'approve', format='json')
+        self._as(self.finance_user, 'patch', 'update-payment-status', {'payment_status': 'paid'})
+        with mock.patch('apps.documents.tasks.process_receipt_validation.delay', return_value=mock.Mock(id='task-1')):
+            self._as(self.user, 'post', 'upload-receipt', {
+                'receipt': SimpleUploadedFile('receipt.pdf', b'%PDF-1.4', content_type='application/pdf')
+            })
+        
+        with self.assertNumQueries(1):
+            response = self._timeline(self.user)
+        
+        self.assertEqual([event['event_type'] for event in response.data], [
+            'created', 'clarification_requested', 'clarification_responded',
+            'approved', 'approved', 'payment_updated', 'receipt_uploaded',
+        ])
+        created, clarification, answer, first, second, payment, receipt = response.data
+        self.assertEqual(created['actor_username'], 'testuser')
+        self.assertEqual(created['payload']['total_amount'], '3000.00')
+        # Overwritten fields on the request survive in the log
+        self.assertEqual(clarification['payload']['message'], 'Which model?')
+        self.assertEqual(clarification['payload']['status'], 'need_info')
+        self.assertEqual(answer['payload']['response'], 'ThinkPad')
+        self.assertEqual(first['payload'], {
+            'status': 'pending', 'current_level': 2, 'payment_status': 'pending',
+            'approval_level': 1, 'comment': 'Fine'
+        })
+        self.assertEqual(second['payload']['status'], 'approved')
+        self.assertEqual(payment['payload']['previous_payment_status'], 'pending')
+        self.assertEqual(payment['payload']['payment_status'], 'paid')
+        self.assertIn('receipt.pdf', receipt['payload']['file'])
+
+    def test_timeline_follows_role_visibility(self):
+        other_user = User.objects.create_user(username='other', password='testpass123', role='staff')
+        self.assertEqual(self._timeline(other_user).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self._timeline(self.approver_l1).status_code, status.HTTP_200_OK)
+        self.assertEqual(self._timeline(self.finance_user).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_malformed_id_is_not_found(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/requests/not-a-uuid/timeline/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_events_are_append_only(self):
+        event = WorkflowEvent.objects.get(request=self.request)
+        event.payload = {}
+        with self.assertRaises(ValueError):
+            event.save()
+        with self.assertRaises(ValueError):
+            event.delete()
+
+    def test_bulk_approval_writes_one_event_per_request(self):
+        self.client.force_authenticate(user=self.approver_l1)
+        self.client.post(reverse('purchaserequest-bulk-approve'), {'ids': [str(self.request.pk)]}, format='json')
+        event = WorkflowEvent.objects.get(request=self.request, event_type='approved')
+        self.assertEqual(event.actor, self.approver_l1)
+        self.assertTrue(event.payload['bulk'])
+
+
+
+class AsyncReadViewTest(APITestCase):
+    def setUp(self):
+        self.staff_user = User.objects.create_user(
+            username='staff', password='testpass123', role='staff'
+        )
+        self.other_staff = User.objects.create_user(
+            username='other', password='testpass123', role='staff'
+        )
+        self.approver_l1 = User.objects.create_user(
+            username='approver1', password='testpass123', role='approver_level_1', approver_level=1
+        )
+        self.purchase_request = PurchaseRequest.objects.create(
+            title='Laptop',
+            description='Description',
+            total_amount=Decimal('100.00'),
+            created_by=self.staff_user
+        )
+        RequestItem.objects.create(
+            request=self.purchase_request, description='Laptop', quantity=1, unit_price=Decimal('100.00')
+        )
+        self.detail_url = reverse('async-request-detail', kwargs={'pk': self.purchase_request.pk})
+        cache.clear()
+
+    def _get(self, url, user=None, **headers):
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+        return self.client.get(url, **headers)
+
+    def _drf_get(self, url, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(url)
+        self.client.force_authenticate(user=None)
+        return response
+
+    def test_detail_matches_drf_view(self):
+        response = self._get(self.detail_url, self.staff_user)
+        drf_response = self._drf_get(
+            reverse('purchaserequest-detail', kwargs={'pk': self.purchase_request.pk}), self.staff_user
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), drf_response.json())
+        self.assertEqual(response['ETag'], drf_response['ETag'])
+
+    def test_detail_answers_304_for_current_etag(self):
+        etag = self._get(self.detail_url, self.staff_user)['ETag']
+
+        response = self._get(self.detail_url, self.staff_user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_is_served_from_cache_on_repeat(self):
+        self._get(self.detail_url, self.staff_user)
+        request_detail_cache.reset_stats()
+
+        self._get(self.detail_url, self.staff_user)
+        self.assertEqual(request_detail_cache.stats()['hits'], 1)
+
+    def test_detail_is_scoped_like_drf_view(self):
+        self.assertEqual(self._get(self.detail_url, self.other_staff).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self._get(self.detail_url, self.approver_l1).status_code, status.HTTP_200_OK)
+
+    def test_requires_a_valid_token(self):
+        self.assertEqual(self._get(self.detail_url).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self._get(self.detail_url, HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_dashboard_matches_drf_view(self):
+        for user in [self.staff_user, self.approver_l1]:
+            response = self._get(reverse('async-request-dashboard'), user)
+            drf_response = self._drf_get(reverse('purchaserequest-dashboard'), user)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.json(), drf_response.json())
+
+    def test_async_views_are_coroutines(self):
+        from asyncio import iscoroutinefunction
+        from apps.requests import async_views
+        from apps.po.async_views import purchase_order_detail
+
+        for view in [async_views.request_detail, async_views.dashboard, purchase_order_detail]:
+            self.assertTrue(iscoroutinefunction(view))
+
+    def test_asgi_settings_keep_every_middleware_async(self):
+        import importlib
+        from django.core.handlers.asgi import ASGIHandler
+
+        database = {'DB_NAME': 'x', 'DB_USER': 'x', 'DB_PASSWORD': 'x', 'DB_HOST': 'x', 'DB_PORT': '5432'}
+        with mock.patch.dict('os.environ', database):
+            asgi_settings = importlib.import_module('backend.settings.asgi')
+
+        # With DEBUG on, Django logs every sync-only middleware it has to wrap in a thread
+        with override_settings(DEBUG=True, MIDDLEWARE=asgi_settings.MIDDLEWARE):
+            with self.assertNoLogs('django.request', level='DEBUG'):
+                ASGIHandler()
+        with override_settings(DEBUG=True), self.assertLogs('django.request', level='DEBUG') as logs:
+            ASGIHandler()
+        self.assertIn('WhiteNoiseMiddleware', ' '.join(logs.output))
+
+
+class ReadEndpointBenchmarkTest(LiveServerTestCase):
+    def test_reports_throughput_and_latency_per_endpoint(self):
+        staff_user = User.objects.create_user(username='staff', password='testpass123', role='staff')
+        PurchaseRequest.objects.create(
+            title='Laptop', description='Description', total_amount=Decimal('100.00'), created_by=staff_user
+        )
+        out = StringIO()
+        call_command(
+            'benchmark_read_endpoints', '--url', self.live_server_url,
+            '--username', 'staff', '--password', 'testpass123',
+            '--concurrency', '1', '--requests', '3', stdout=out
+        )
+
+        output = out.getvalue()
+        self.assertEqual(output.count('p99'), 4)
+        self.assertEqual(output.count('200: 3'), 4)
+
+    def test_compares_deployments_across_a_concurrency_sweep(self):
+        staff_user = User.objects.create_user(username='staff', password='testpass123', role='staff')
+        PurchaseRequest.objects.create(
+            title='Laptop', description='Description', total_amount=Decimal('100.00'), created_by=staff_user
+        )
+        out = StringIO()
+        call_command(
+            'benchmark_read_endpoints', '--url', self.live_server_url, '--url', self.live_server_url + '/',
+            '--username', 'staff', '--password', 'testpass123',
+            '--concurrency', '1', '--concurrency', '2', '--requests', '2', stdout=out
+        )
+
+        output = out.getvalue()
+        self.assertEqual(output.count('p99'), 16)
+        self.assertIn('relative to the first URL:', output)
+        self.assertEqual(output.count('x, '), 0)
+        self.assertEqual(output.count('dashboard, async view x2: '), 3)
@@ -9,6 +9,8 @@ export const ApprovalHistory: React.FC = () => {
   const [requests, setRequests] = useState<PurchaseRequest[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [next, setNext] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const { user } = useAuth();
   const [searchParams] = useSearchParams();
   const actionFilter = searchParams.get('action');
@@ -29,8 +31,9 @@ export const ApprovalHistory: React.FC = () => {
   useEffect(() => {
     const loadHistory = async () => {
       try {
-        const data = await requestService.getMyApprovals();
-        setRequests(data);
+        const page = await requestService.getMyApprovals();
+        setRequests(page.results);
+        setNext(page.next);
       } catch (err: any) {
         setError(err.response?.data?.detail || 'Failed to load approval history');
       } finally {
@@ -40,6 +43,19 @@ export const ApprovalHistory: React.FC = () => {
     loadHistory();
   }, []);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const page = await requestService.getMyApprovals(next);
+      setRequests(current => [...current, ...page.results]);
+      setNext(page.next);
+    } catch (err: any) {
+      setError(err.response?.data?.detail || 'Failed to load approval history');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="space-y-4 sm:space-y-6">
@@ -184,6 +200,18 @@ export const ApprovalHistory: React.FC = () => {
           </div>
         </div>
       )}
+
+      {next && (
+        <div className="text-center px-4 sm:px-0">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="btn-secondary w-full sm:w-auto disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        </div>
+      )}
     </div>
   );
 };
@@ -156,33 +156,33 @@ export const Dashboard: React.FC = () => {
           <div className="grid grid-cols-2 lg:grid-cols-4 gap-4 sm:gap-6">
             <StatCard
               title="Pending"
-              value={stats.pending_requests.length}
+              value={stats.pending_requests}
               icon={ClockIcon}
               color="bg-gradient-to-br from-orange-500 to-orange-600"
               href="/requests?status=pending"
-              priority={stats.pending_requests.length > 0}
+              priority={stats.pending_requests > 0}
             />
             <StatCard
               title="Approved"
-              value={stats.approved_requests.length}
+              value={stats.approved_requests}
               icon={CheckCircleIcon}
               color="bg-gradient-to-br from-green-500 to-green-600"
               href="/requests?status=approved"
             />
             <StatCard
               title="Rejected"
-              value={stats.rejected_requests.length}
+              value={stats.rejected_requests}
               icon={ExclamationTriangleIcon}
               color="bg-gradient-to-br from-red-500 to-red-600"
               href="/requests?status=rejected"
             />
             <StatCard
               title="Receipts Due"
-              value={stats.receipts_pending.length}
+              value={stats.receipts_pending}
               icon={ReceiptPercentIcon}
               color="bg-gradient-to-br from-purple-500 to-purple-600"
               href="/requests?receipts_pending=true"
-              priority={stats.receipts_pending.length > 0}
+              priority={stats.receipts_pending > 0}
             />
           </div>
 
@@ -203,22 +203,22 @@ export const Dashboard: React.FC = () => {
           <div className="grid grid-cols-1 sm:grid-cols-3 gap-4 sm:gap-6">
             <StatCard
               title="Awaiting Approval"
-              value={stats.waiting_for_approval.length}
+              value={stats.waiting_for_approval}
               icon={ClipboardDocumentCheckIcon}
               color="bg-gradient-to-br from-orange-500 to-orange-600"
               href="/approvals"
-              priority={stats.waiting_for_approval.length > 0}
+              priority={stats.waiting_for_approval > 0}
             />
             <StatCard
               title="Approved by Me"
-              value={stats.approved_by_me.length}
+              value={stats.approved_by_me}
               icon={CheckCircleIcon}
               color="bg-gradient-to-br from-green-500 to-green-600"
               href="/approvals/history?action=approved"
             />
             <StatCard
               title="Rejected by Me"
-              value={stats.rejected_by_me.length}
+              value={stats.rejected_by_me}
               icon={ExclamationTriangleIcon}
               color="bg-gradient-to-br from-red-500 to-red-600"
               href="/approvals/history?action=rejected"
@@ -243,30 +243,30 @@ export const Dashboard: React.FC = () => {
           <div className="grid grid-cols-2 lg:grid-cols-4 gap-4 sm:gap-6">
             <StatCard
               title="Review Needed"
-              value={stats.awaiting_finance_review.length}
+              value={stats.awaiting_finance_review}
               icon={BanknotesIcon}
               color="bg-gradient-to-br from-blue-500 to-blue-600"
               href="/finance?status=awaiting_review"
-              priority={stats.awaiting_finance_review.length > 0}
+              priority={stats.awaiting_finance_review > 0}
             />
             <StatCard
               title="Missing Receipts"
-              value={stats.missing_receipts.length}
+              value={stats.missing_receipts}
               icon={ReceiptPercentIcon}
               color="bg-gradient-to-br from-red-500 to-red-600"
               href="/finance?missing_receipts=true"
-              priority={stats.missing_receipts.length > 0}
+              priority={stats.missing_receipts > 0}
             />
             <StatCard
               title="Paid"
-              value={stats.paid_requests.length}
+              value={stats.paid_requests}
               icon={CheckCircleIcon}
               color="bg-gradient-to-br from-green-500 to-green-600"
               href="/finance?status=paid"
             />
             <StatCard
               title="On Hold"
-              value={stats.on_hold_requests.length}
+              value={stats.on_hold_requests}
               icon={ExclamationTriangleIcon}
               color="bg-gradient-to-br from-yellow-500 to-yellow-600"
               href="/finance?status=on_hold"
@@ -1,79 +1,52 @@
 // services/dashboard.ts
 import api from './api';
-import type { PurchaseRequest } from '../types';
+import type { PurchaseRequestSummary } from '../types';
 
 interface StaffDashboardStats {
-  pending_requests: PurchaseRequest[];
-  approved_requests: PurchaseRequest[];
-  rejected_requests: PurchaseRequest[];
-  receipts_pending: PurchaseRequest[];
+  pending_requests: number;
+  approved_requests: number;
+  rejected_requests: number;
+  receipts_pending: number;
 }
 
 interface ApproverDashboardStats {
-  waiting_for_approval: PurchaseRequest[];
-  approved_by_me: PurchaseRequest[];
-  rejected_by_me: PurchaseRequest[];
+  waiting_for_approval: number;
+  approved_by_me: number;
+  rejected_by_me: number;
 }
 
 interface FinanceDashboardStats {
-  awaiting_finance_review: PurchaseRequest[];
-  paid_requests: PurchaseRequest[];
-  on_hold_requests: PurchaseRequest[];
-  missing_receipts: PurchaseRequest[];
+  awaiting_finance_review: number;
+  paid_requests: number;
+  on_hold_requests: number;
+  missing_receipts: number;
 }
 
+interface DashboardResponse<T> {
+  role: string;
+  counts: T;
+  recent: PurchaseRequestSummary[];
+}
+
+// Counts are aggregated server-side for the current user's role
+const getDashboard = async <T>(): Promise<DashboardResponse<T>> => {
+  const response = await api.get('/requests/dashboard/');
+  return response.data;
+};
+
 export const dashboardService = {
   async getStaffStats(): Promise<StaffDashboardStats> {
-    const response = await api.get('/requests/');
-    const requests = response.data.results || response.data;
-    
-    return {
-      pending_requests: requests.filter((r: PurchaseRequest) => r.status === 'pending'),
-      approved_requests: requests.filter((r: PurchaseRequest) => r.status === 'approved'),
-      rejected_requests: requests.filter((r: PurchaseRequest) => r.status === 'rejected'),
-      receipts_pending: requests.filter((r: PurchaseRequest) => 
-        r.payment_status === 'paid' && !r.receipt_submitted && r.receipt_required
-      )
-    };
+    const data = await getDashboard<StaffDashboardStats>();
+    return data.counts;
   },
 
   async getApproverStats(): Promise<ApproverDashboardStats> {
-    const [pendingResponse, historyResponse] = await Promise.all([
-      api.get('/requests/'),
-      api.get('/requests/my_approvals/')
-    ]);
-    
-    const pendingRequests = pendingResponse.data.results || pendingResponse.data;
-    const myApprovals = historyResponse.data.results || historyResponse.data;
-    
-    return {
-      waiting_for_approval: pendingRequests,
-      approved_by_me: myApprovals.filter((r: PurchaseRequest) => 
-        r.approvals.some(a => a.action === 'approved')
-      ),
-      rejected_by_me: myApprovals.filter((r: PurchaseRequest) => 
-        r.approvals.some(a => a.action === 'rejected')
-      )
-    };
+    const data = await getDashboard<ApproverDashboardStats>();
+    return data.counts;
   },
 
   async getFinanceStats(): Promise<FinanceDashboardStats> {
-    const response = await api.get('/requests/');
-    const requests = response.data.results || response.data;
-    
-    return {
-      awaiting_finance_review: requests.filter((r: PurchaseRequest) => 
-        r.status === 'approved' && r.payment_status === 'pending'
-      ),
-      paid_requests: requests.filter((r: PurchaseRequest) => 
-        r.payment_status === 'paid'
-      ),
-      on_hold_requests: requests.filter((r: PurchaseRequest) => 
-        r.payment_status === 'on_hold'
-      ),
-      missing_receipts: requests.filter((r: PurchaseRequest) => 
-        r.payment_status === 'paid' && !r.receipt_submitted && r.receipt_required
-      )
-    };
+    const data = await getDashboard<FinanceDashboardStats>();
+    return data.counts;
   }
 };
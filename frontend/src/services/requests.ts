@@ -1,13 +1,19 @@
 import api from './api';
-import type { PurchaseRequest } from '../types';
+import type { BulkApprovalResponse, ClaimResponse, CursorPage, PurchaseRequest, PurchaseRequestSummary, WorkflowEvent } from '../types';
 
 export const requestService = {
   async getRequests(): Promise<PurchaseRequest[]> {
-    const response = await api.get('/requests/');
+    // List routes default to the summary projection; these pages render nested data
+    const response = await api.get('/requests/', { params: { view: 'full' } });
     // Handle both paginated and non-paginated responses
     return response.data.results || response.data;
   },
 
+  async getRequestSummaries(): Promise<PurchaseRequestSummary[]> {
+    const response = await api.get('/requests/', { params: { view: 'summary' } });
+    return response.data.results || response.data;
+  },
+
   async getRequest(id: string): Promise<PurchaseRequest> {
     const response = await api.get(`/requests/${id}/`);
     return response.data;
@@ -35,10 +41,37 @@ export const requestService = {
     await api.patch(`/requests/${id}/reject/`, data);
   },
 
-  async getMyApprovals(): Promise<PurchaseRequest[]> {
-    const response = await api.get('/requests/my_approvals/');
-    // Handle both paginated and non-paginated responses
-    return response.data.results || response.data;
+  async bulkApproveRequests(ids: string[], comment?: string): Promise<BulkApprovalResponse> {
+    const response = await api.post('/requests/bulk_approve/', { ids, comment });
+    return response.data;
+  },
+
+  async bulkRejectRequests(ids: string[], comment?: string): Promise<BulkApprovalResponse> {
+    const response = await api.post('/requests/bulk_reject/', { ids, comment });
+    return response.data;
+  },
+
+  async claimRequests(count?: number): Promise<ClaimResponse> {
+    const response = await api.post('/requests/claim/', { count });
+    return response.data;
+  },
+
+  async releaseClaims(ids?: string[]): Promise<{ released: number }> {
+    const response = await api.post('/requests/release/', { ids });
+    return response.data;
+  },
+
+  async getTimeline(id: string): Promise<WorkflowEvent[]> {
+    const response = await api.get(`/requests/${id}/timeline/`);
+    return response.data;
+  },
+
+  async getMyApprovals(next?: string | null): Promise<CursorPage<PurchaseRequest>> {
+    // Follow the cursor URL from the previous page; it already carries the query params
+    const response = next
+      ? await api.get(next)
+      : await api.get('/requests/my_approvals/', { params: { view: 'full' } });
+    return response.data;
   },
 
   // New methods for enhanced workflow
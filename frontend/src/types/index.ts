@@ -82,6 +82,63 @@ export interface PurchaseRequest {
   receipt_metadata?: ReceiptMetadata;
   purchase_order?: PurchaseOrder;
 }
+export interface PurchaseRequestSummary {
+  id: string;
+  title: string;
+  total_amount: string;
+  status: RequestStatus;
+  current_approval_level: number;
+  payment_status: PaymentStatus;
+  receipt_required: boolean;
+  receipt_submitted: boolean;
+  created_by_username: string;
+  created_at: string;
+  updated_at: string;
+}
+
+export type WorkflowEventType =
+  | 'created'
+  | 'approved'
+  | 'rejected'
+  | 'clarification_requested'
+  | 'clarification_responded'
+  | 'payment_updated'
+  | 'receipt_uploaded';
+
+export interface WorkflowEvent {
+  id: number;
+  event_type: WorkflowEventType;
+  actor: string | null;
+  actor_username: string | null;
+  payload: Record<string, unknown>;
+  created_at: string;
+}
+
+export interface BulkApprovalResult {
+  id: string;
+  success: boolean;
+  error?: string;
+  approval_id?: string;
+  request_status?: RequestStatus;
+  current_level?: number;
+}
+
+export interface BulkApprovalResponse {
+  processed: number;
+  failed: number;
+  results: BulkApprovalResult[];
+}
+
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+export interface ClaimResponse {
+  lease_seconds: number;
+  results: PurchaseRequestSummary[];
+}
 export interface ReceiptMetadata {
   id: string;
   vendor_name: string;